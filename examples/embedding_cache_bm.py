@@ -0,0 +1,59 @@
+"""Benchmark of the embedding cache: re-ingesting a document set of which only a few nodes changed.
+
+The embedding service is simulated by a model that sleeps `latency` seconds per batch, so the batches requested
+concurrently show up in the wall time the way remote calls do.
+
+Usage: python examples/embedding_cache_bm.py --nodes 2000 --changed 0.05
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import fire
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+
+from metagpt.logs import logger
+from metagpt.rag.embeddings import CachedEmbedding, EmbeddingCache
+
+
+class RemoteEmbedding(MockEmbedding):
+    latency: float = 0.05
+    batches: int = 0
+
+    def _get_text_embeddings(self, texts):
+        time.sleep(self.latency)
+        self.batches += 1
+        return [[float(len(i))] * self.embed_dim for i in texts]
+
+
+def embed(embed_model, nodes) -> float:
+    start = time.perf_counter()
+    embed_model([n.copy() for n in nodes])
+    return time.perf_counter() - start
+
+
+def main(nodes: int = 2000, changed: float = 0.05, latency: float = 0.05, concurrency: int = 4):
+    docs = [TextNode(text=f"chunk {i} " * 20) for i in range(nodes)]
+    edited = [TextNode(text=f"edited {n.text}") if i % int(1 / changed) == 0 else n for i, n in enumerate(docs)]
+
+    plain = RemoteEmbedding(embed_dim=256, latency=latency)
+    seconds = embed(plain, docs) + embed(plain, edited)
+    logger.info(f"uncached: {seconds:.2f}s, {plain.batches} batches")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(Path(tmp) / "embedding_cache.db")
+        remote = RemoteEmbedding(embed_dim=256, latency=latency)
+        cached = CachedEmbedding(remote, cache=cache, max_concurrency=concurrency)
+        cold = embed(cached, docs)
+        cold_batches = remote.batches
+        warm = embed(cached, edited)
+        logger.info(
+            f"cached: cold {cold:.2f}s, {cold_batches} batches; "
+            f"re-ingest {warm:.2f}s, {remote.batches - cold_batches} batches, hit rate {cached.hits / nodes:.0%}"
+        )
+        cache.close()
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
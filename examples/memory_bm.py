@@ -0,0 +1,73 @@
+"""Memory benchmark: the memory and add/iterate throughput of `Memory` with large message histories.
+
+Compares messages holding interned routing strings with messages holding per-message copies of the same strings, as
+they did before. Only the routing fields are shared, the content and the memory indexes are stored per message.
+
+Usage: python examples/memory_bm.py --sizes 10000,100000,1000000
+"""
+import gc
+import resource
+import time
+import tracemalloc
+
+import fire
+
+from metagpt.actions import UserRequirement
+from metagpt.logs import logger
+from metagpt.memory import Memory
+from metagpt.schema import Message
+
+ROLES = ["Alice", "Bob", "Carol", "Dave"]
+
+
+def new_message(i: int, plain: bool) -> Message:
+    msg = Message(
+        content=f"content {i}",
+        role="assistant",
+        cause_by=UserRequirement,
+        sent_from=ROLES[i % len(ROLES)],
+        send_to={ROLES[(i + 1) % len(ROLES)], ROLES[(i + 2) % len(ROLES)]},
+    )
+    if plain:
+        # private copies of the interned routing strings
+        msg.__dict__["send_to"] = {"".join(list(i)) for i in msg.send_to}
+        for k in ["role", "cause_by", "sent_from"]:
+            msg.__dict__[k] = "".join(list(msg.__dict__[k]))
+    return msg
+
+
+def run(size: int, plain: bool) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    memory = Memory()
+    start = time.perf_counter()
+    for i in range(size):
+        memory.add(new_message(i, plain))
+    add_seconds = time.perf_counter() - start
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    count = sum(1 for i in memory.get() if i.send_to)
+    iterate_seconds = time.perf_counter() - start
+    assert count == size
+    return {
+        "layout": "plain" if plain else "interned",
+        "size": size,
+        "MB": round(used / 2**20, 1),
+        "bytes/msg": round(used / size),
+        "add msg/s": round(size / add_seconds),
+        "iterate msg/s": round(size / iterate_seconds),
+        "max RSS MB": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(sizes: str = "10000,100000,1000000"):
+    sizes = [int(i) for i in str(sizes).split(",")] if isinstance(sizes, (str, int)) else list(sizes)
+    for size in sizes:
+        for plain in [False, True]:
+            logger.info(run(size, plain))
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
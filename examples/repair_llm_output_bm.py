@@ -0,0 +1,91 @@
+"""Benchmark of the llm output repair: the single-pass `repair_llm_output_with_report` against the chain of
+`_repair_llm_raw_output` and `repair_json_format` calls.
+
+The corpus is built from the markdown documents in `tests/data/output_parser`: their sections are dumped as the json
+output of an ActionNode, scaled up to code-bearing sizes and damaged the way open-source llms do. The fix rate is the
+share of outputs whose content parses to the original sections after the repair.
+
+Usage: python examples/repair_llm_output_bm.py --scale 50 --rounds 20
+"""
+import json
+import time
+
+import fire
+
+from metagpt.const import TEST_DATA_PATH
+from metagpt.logs import logger
+from metagpt.utils.common import OutputParser
+from metagpt.utils.custom_decoder import CustomDecoder
+from metagpt.utils.repair_llm_raw_output import (
+    RepairType,
+    _repair_llm_raw_output,
+    extract_content_from_output,
+    repair_json_format,
+    repair_llm_output_with_report,
+)
+
+REQ_KEY = "[/CONTENT]"
+
+
+def damage(text: str, keys: list[str]) -> dict:
+    return {
+        "clean": text,
+        "lower case keys": text.replace(keys[0], keys[0].lower()).replace(keys[-1], keys[-1].upper()),
+        "missing slash": text.replace(REQ_KEY, "[CONTENT]"),
+        "missing end tag": text.replace(REQ_KEY, ""),
+        "extra bracket": text.replace("}\n" + REQ_KEY, "}]\n" + REQ_KEY),
+        "comments": text.replace('",\n', '",  # a comment\n', 3),
+    }
+
+
+def load_corpus(scale: int) -> list:
+    corpus = []
+    for filename in sorted((TEST_DATA_PATH / "output_parser").glob("*.md")):
+        blocks = OutputParser.parse_blocks(filename.read_text())
+        blocks = {k: "\n".join([v] * scale) for k, v in blocks.items()}
+        text = f"Sure, here it is:\n[CONTENT]\n{json.dumps(blocks, indent=4)}\n{REQ_KEY}\nHope it helps."
+        for name, output in damage(text, list(blocks)).items():
+            corpus.append((name, output, list(blocks), blocks))
+    return corpus
+
+
+def chain(output: str, keys: list) -> str:
+    for key in keys + [REQ_KEY]:
+        output = _repair_llm_raw_output(output, key)
+    output = extract_content_from_output(output, right_key=REQ_KEY)
+    return repair_json_format(output)
+
+
+def single_pass(output: str, keys: list) -> str:
+    output, _ = repair_llm_output_with_report(output, keys + [REQ_KEY])
+    output = extract_content_from_output(output, right_key=REQ_KEY)
+    output, _ = repair_llm_output_with_report(output, [None], repair_type=RepairType.JSON)
+    return output
+
+
+def is_fixed(output: str, expected: dict) -> bool:
+    try:
+        return CustomDecoder(strict=False).decode(output) == expected
+    except Exception:
+        return False
+
+
+def main(scale: int = 50, rounds: int = 20):
+    corpus = load_corpus(scale)
+    size = sum(len(i[1]) for i in corpus)
+    logger.info(f"{len(corpus)} outputs, {size / 2**20:.2f} MB")
+    for name, repair in [("chain", chain), ("single pass", single_pass)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = [repair(output, keys) for _, output, keys, _ in corpus]
+        seconds = (time.perf_counter() - start) / rounds
+        fixed = [is_fixed(r, c[3]) for r, c in zip(results, corpus)]
+        failed = sorted({c[0] for c, ok in zip(corpus, fixed) if not ok})
+        logger.info(
+            f"{name}: {size / 2**20 / seconds:.1f} MB/s, fix rate {sum(fixed)}/{len(fixed)}"
+            + (f", failed: {failed}" if failed else "")
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
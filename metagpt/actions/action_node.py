@@ -8,10 +8,13 @@
 NOTE: You should use typing.List instead of list to do type annotation. Because in the markdown extraction process,
   we can use typing to extract the type of the node, but we cannot use built-in list to extract.
 """
+import asyncio
+import contextlib
 import json
 import typing
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
 from pydantic import BaseModel, Field, create_model, model_validator
 from tenacity import retry, stop_after_attempt, wait_random_exponential
@@ -19,10 +22,11 @@ from tenacity import retry, stop_after_attempt, wait_random_exponential
 from metagpt.actions.action_outcls_registry import register_action_outcls
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.llm import BaseLLM
-from metagpt.logs import logger
+from metagpt.logs import LLM_STREAM_CONSUMER, logger
 from metagpt.provider.postprocess.llm_output_postprocess import llm_output_postprocess
 from metagpt.utils.common import OutputParser, general_after_log
 from metagpt.utils.human_interaction import HumanInteraction
+from metagpt.utils.stream_output_parser import StreamOutputParser
 
 
 class ReviewMode(Enum):
@@ -120,9 +124,23 @@ def dict_to_markdown(d, prefix="- ", kv_sep="\n", postfix="\n"):
     return markdown_str
 
 
+@lru_cache(maxsize=256)
+def get_model_json_schema(model_class: Type[BaseModel]) -> dict:
+    """Return the json schema of a generated output class, which is the same for every fill."""
+    return model_class.model_json_schema()
+
+
+def _copy_mapping(mapping: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the dicts of a nested mapping, the (type, field) values are shared."""
+    return {k: _copy_mapping(v) if isinstance(v, dict) else v for k, v in mapping.items()}
+
+
 class ActionNode:
     """ActionNode is a tree of nodes."""
 
+    # Changing any of these invalidates the compiled prompts, mappings and classes of the node and its ancestors
+    _STRUCTURE_ATTRS = frozenset({"key", "expected_type", "instruction", "example", "children"})
+
     schema: str  # raw/json/markdown, default: ""
 
     # Action Context
@@ -166,6 +184,27 @@ class ActionNode:
         self.schema = schema
         self.prevs = []
         self.nexts = []
+        self._compiled: dict[tuple, Any] = {}
+        self._compiled_signature: tuple = ()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ActionNode._STRUCTURE_ATTRS:
+            self.__dict__["_version"] = self.__dict__.get("_version", 0) + 1
+
+    def _structure_signature(self) -> tuple:
+        """Identify the current structure of the node tree, to tell whether the compiled results are still valid."""
+        return id(self), self._version, tuple(i._structure_signature() for i in self.children.values())
+
+    def _get_compiled(self, key: tuple, compile_func: Callable[[], Any]) -> Any:
+        """Return the result of `compile_func` compiled with the current structure, compile it if not yet."""
+        signature = self._structure_signature()
+        if signature != self._compiled_signature:
+            self._compiled = {}
+            self._compiled_signature = signature
+        if key not in self._compiled:
+            self._compiled[key] = compile_func()
+        return self._compiled[key]
 
     def __str__(self):
         return (
@@ -206,7 +245,12 @@ class ActionNode:
     def _get_children_mapping(self, exclude=None) -> Dict[str, Any]:
         """获得子ActionNode的字典，以key索引，支持多级结构。"""
         exclude = exclude or []
+        mapping = self._get_compiled(
+            ("children_mapping", tuple(exclude)), lambda: self._compile_children_mapping(exclude=exclude)
+        )
+        return _copy_mapping(mapping)  # the cached mapping stays intact if the caller modifies it
 
+    def _compile_children_mapping(self, exclude: list) -> Dict[str, Any]:
         def _get_mapping(node: "ActionNode") -> Dict[str, Any]:
             mapping = {}
             for key, child in node.children.items():
@@ -271,14 +315,18 @@ class ActionNode:
 
     def create_class(self, mode: str = "auto", class_name: str = None, exclude=None):
         class_name = class_name if class_name else f"{self.key}_AN"
-        mapping = self.get_mapping(mode=mode, exclude=exclude)
-        return self.create_model_class(class_name, mapping)
+        return self._get_compiled(
+            ("class", mode, class_name, tuple(exclude or [])),
+            lambda: self.create_model_class(class_name, self.get_mapping(mode=mode, exclude=exclude)),
+        )
 
     def _create_children_class(self, exclude=None):
         """使用object内有的字段直接生成model_class"""
         class_name = f"{self.key}_AN"
-        mapping = self._get_children_mapping(exclude=exclude)
-        return self.create_model_class(class_name, mapping)
+        return self._get_compiled(
+            ("children_class", tuple(exclude or [])),
+            lambda: self.create_model_class(class_name, self._get_children_mapping(exclude=exclude)),
+        )
 
     def to_dict(self, format_func=None, mode="auto", exclude=None) -> Dict:
         """将当前节点与子节点都按照node: format的格式组织成字典"""
@@ -357,7 +405,10 @@ class ActionNode:
     def compile_instruction(self, schema="markdown", mode="children", tag="", exclude=None) -> str:
         """compile to raw/json/markdown template with all/root/children nodes"""
         format_func = lambda i: f"{i.expected_type}  # {i.instruction}"
-        return self._compile_f(schema, mode, tag, format_func, kv_sep=": ", exclude=exclude)
+        return self._get_compiled(
+            ("instruction", schema, mode, tag, tuple(exclude or [])),
+            lambda: self._compile_f(schema, mode, tag, format_func, kv_sep=": ", exclude=exclude),
+        )
 
     def compile_example(self, schema="json", mode="children", tag="", exclude=None) -> str:
         """compile to raw/json/markdown examples with all/root/children nodes"""
@@ -365,7 +416,10 @@ class ActionNode:
         # 这里不能使用f-string，因为转译为str后再json.dumps会额外加上引号，无法作为有效的example
         # 错误示例："File list": "['main.py', 'const.py', 'game.py']", 注意这里值不是list，而是str
         format_func = lambda i: i.example
-        return self._compile_f(schema, mode, tag, format_func, kv_sep="\n", exclude=exclude)
+        return self._get_compiled(
+            ("example", schema, mode, tag, tuple(exclude or [])),
+            lambda: self._compile_f(schema, mode, tag, format_func, kv_sep="\n", exclude=exclude),
+        )
 
     def compile(self, context, schema="json", mode="children", template=SIMPLE_TEMPLATE, exclude=[]) -> str:
         """
@@ -422,15 +476,28 @@ class ActionNode:
         system_msgs: Optional[list[str]] = None,
         schema="markdown",  # compatible to original format
         timeout=USE_CONFIG_TIMEOUT,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ) -> (str, BaseModel):
-        """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
-        logger.debug(f"llm raw output:\n{content}")
+        """Use ActionOutput to wrap the output of aask
+
+        If `on_field` is given, the output is streamed and `on_field` is called with the key and the validated value of
+        each field as soon as it is complete.
+        """
         output_class = self.create_model_class(output_class_name, output_data_mapping)
+        if on_field:
+            parser = StreamOutputParser(output_class, output_data_mapping, schema=schema, on_field=on_field)
+            token = LLM_STREAM_CONSUMER.set(parser.feed)
+            try:
+                content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout, stream=True)
+            finally:
+                LLM_STREAM_CONSUMER.reset(token)
+        else:
+            content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+        logger.debug(f"llm raw output:\n{content}")
 
         if schema == "json":
             parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+                output=content, schema=get_model_json_schema(output_class), req_key=f"[/{TAG}]"
             )
         else:  # using markdown parser
             parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
@@ -454,14 +521,20 @@ class ActionNode:
         self.set_recursive("context", context)
 
     async def simple_fill(
-        self, schema, mode, images: Optional[Union[str, list[str]]] = None, timeout=USE_CONFIG_TIMEOUT, exclude=None
+        self,
+        schema,
+        mode,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        exclude=None,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ):
         prompt = self.compile(context=self.context, schema=schema, mode=mode, exclude=exclude)
         if schema != "raw":
             mapping = self.get_mapping(mode, exclude=exclude)
             class_name = f"{self.key}_AN"
             content, scontent = await self._aask_v1(
-                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout
+                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout, on_field=on_field
             )
             self.content = content
             self.instruct_content = scontent
@@ -481,6 +554,8 @@ class ActionNode:
         images: Optional[Union[str, list[str]]] = None,
         timeout=USE_CONFIG_TIMEOUT,
         exclude=[],
+        max_concurrency: Optional[int] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ):
         """Fill the node(s) with mode.
 
@@ -496,10 +571,14 @@ class ActionNode:
          - root: fill root's node and gather output
         :param strgy: simple/complex
          - simple: run only once
-         - complex: run each node
+         - complex: run each node, the children are filled concurrently
         :param images: the list of image url or base64 for gpt4-v
         :param timeout: Timeout for llm invocation.
         :param exclude: The keys of ActionNode to exclude.
+        :param max_concurrency: Max number of children of this node filled at the same time in complex strategy. The
+            requests of an llm are limited to `llm.config.max_concurrency` in all cases.
+        :param on_field: Called with the key and the value of each output field as soon as it is streamed, before
+            the generation finishes. Setting it turns on streaming.
         :return: self
         """
         self.set_llm(llm)
@@ -508,14 +587,24 @@ class ActionNode:
             schema = self.schema
 
         if strgy == "simple":
-            return await self.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+            return await self.simple_fill(
+                schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, on_field=on_field
+            )
         elif strgy == "complex":
             # 这里隐式假设了拥有children
+            children = [i for i in self.children.values() if not (exclude and i.key in exclude)]
+            # the children of all nodes filled at the same time share the semaphore of the llm
+            semaphore = asyncio.Semaphore(max(1, max_concurrency)) if max_concurrency else contextlib.nullcontext()
+
+            async def _fill_child(child: "ActionNode") -> "ActionNode":
+                async with semaphore, self.llm.semaphore:
+                    return await child.simple_fill(
+                        schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, on_field=on_field
+                    )
+
+            # gather keeps the declaration order of children, so the merged fields are in the same order as before
             tmp = {}
-            for _, i in self.children.items():
-                if exclude and i.key in exclude:
-                    continue
-                child = await i.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+            for child in await asyncio.gather(*[_fill_child(i) for i in children]):
                 tmp.update(child.instruct_content.model_dump())
             cls = self._create_children_class()
             self.instruct_content = cls(**tmp)
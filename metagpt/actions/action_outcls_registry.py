@@ -3,11 +3,56 @@
 # @Desc   : registry to store Dynamic Model from ActionNode.create_model_class to keep it as same Class
 #           with same class name and mapping
 
-from functools import wraps
+from functools import lru_cache, wraps
+from typing import Any
+
+from pydantic.fields import FieldInfo
 
 action_outcls_registry = dict()
 
 
+@lru_cache(maxsize=1024)
+def _cached_type_key(type_v) -> str:
+    # eliminate typing influence
+    return str(type_v).replace("typing.List", "list").replace("typing.Dict", "dict")
+
+
+def _type_key(type_v) -> str:
+    try:
+        return _cached_type_key(type_v)
+    except TypeError:  # unhashable type arguments
+        return _cached_type_key.__wrapped__(type_v)
+
+
+def _value_key(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+# Every public attribute of `FieldInfo`, e.g. default, alias, description, examples, title and json_schema_extra
+_FIELD_INFO_ATTRS = tuple(i for i in FieldInfo.__slots__ if not i.startswith("_") and i != "annotation")
+
+
+def _field_key(field_value: Any) -> tuple:
+    """Hashable key of a `(type, FieldInfo or default)` mapping value"""
+    type_v, field_info = field_value
+    if isinstance(field_info, FieldInfo):
+        # faster than `repr(field_info)`, which formats the possibly long example in `default` every time
+        return (_type_key(type_v), *(_value_key(getattr(field_info, i)) for i in _FIELD_INFO_ATTRS))
+    return _type_key(type_v), _value_key(field_info)
+
+
+def mapping_key(mapping: dict) -> tuple:
+    """Structural key of a mapping, the same for mappings with the same fields in any order"""
+    return tuple(
+        (k, mapping_key(v) if isinstance(v, dict) else _field_key(v))
+        for k, v in sorted(mapping.items(), key=lambda i: i[0])
+    )
+
+
 def register_action_outcls(func):
     """
     Due to `create_model` return different Class even they have same class name and mapping.
@@ -23,14 +68,9 @@ def register_action_outcls(func):
         arr = list(args) + list(kwargs.values())
         """
         outcls_id example
-            "<class 'metagpt.actions.action_node.ActionNode'>_test_{'field': (str, Ellipsis)}"
+            ("<class 'metagpt.actions.action_node.ActionNode'>", 'test', (('field', ('<class 'str'>', Ellipsis)),))
         """
-        for idx, item in enumerate(arr):
-            if isinstance(item, dict):
-                arr[idx] = dict(sorted(item.items()))
-        outcls_id = "_".join([str(i) for i in arr])
-        # eliminate typing influence
-        outcls_id = outcls_id.replace("typing.List", "list").replace("typing.Dict", "dict")
+        outcls_id = tuple(mapping_key(i) if isinstance(i, dict) else str(i) for i in arr)
 
         if outcls_id in action_outcls_registry:
             return action_outcls_registry[outcls_id]
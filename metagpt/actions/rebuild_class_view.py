@@ -8,6 +8,7 @@
     Implement RFC197, https://deepwisdom.feishu.cn/wiki/VyK0wfq56ivuvjklMKJcmHQknGt
 """
 
+import os
 from pathlib import Path
 from typing import Optional, Set, Tuple
 
@@ -49,22 +50,43 @@ class RebuildClassView(Action):
             format (str): The format for the prompt schema.
         """
         graph_repo_pathname = self.context.git_repo.workdir / GRAPH_REPO_FILE_REPO / self.context.git_repo.workdir.name
-        self.graph_db = await DiGraphRepository.load_from(str(graph_repo_pathname.with_suffix(".json")))
-        repo_parser = RepoParser(base_directory=Path(self.i_context))
+        graph_repo_filename = graph_repo_pathname.with_suffix(".json")
+        # The symbol cache records what the graph repository already holds, so they are rebuilt together, and the cache
+        # is saved only after the graph repository is.
+        symbol_cache_filename = graph_repo_pathname.with_suffix(".symbols.json")
+        if not graph_repo_filename.exists():
+            symbol_cache_filename.unlink(missing_ok=True)
+        self.graph_db = await DiGraphRepository.load_from(str(graph_repo_filename))
+        repo_parser = RepoParser(
+            base_directory=Path(self.i_context),
+            cache_path=symbol_cache_filename,
+            max_workers=os.cpu_count() or 1,
+            autosave_cache=False,
+        )
         # use pylint
         class_views, relationship_views, package_root = await repo_parser.rebuild_class_views(path=Path(self.i_context))
-        await GraphRepository.update_graph_db_with_class_views(self.graph_db, class_views)
-        await GraphRepository.update_graph_db_with_class_relationship_views(self.graph_db, relationship_views)
-        await GraphRepository.rebuild_composition_relationship(self.graph_db)
-        # use ast
+        # use ast, only the changed files are updated
         direction, diff_path = self._diff_path(path_root=Path(self.i_context).resolve(), package_root=package_root)
         symbols = repo_parser.generate_symbols()
+        changed_files = set(repo_parser.changed_files)
+        # Align to the same root directory in accordance with `class_views`.
+        stale_files = [
+            self._align_root(i, direction, diff_path) for i in [*repo_parser.changed_files, *repo_parser.removed_files]
+        ]
+        # The triples of the changed and removed files, e.g. `a.py`, `a.py:A` and `a.py:A:run`, are inserted again below
+        await self.graph_db.delete_namespaces(stale_files)
+        if repo_parser.class_views_changed:
+            await GraphRepository.update_graph_db_with_class_views(self.graph_db, class_views)
+            await GraphRepository.update_graph_db_with_class_relationship_views(self.graph_db, relationship_views)
+            await GraphRepository.rebuild_composition_relationship(self.graph_db)
         for file_info in symbols:
-            # Align to the same root directory in accordance with `class_views`.
+            if file_info.file not in changed_files:
+                continue
             file_info.file = self._align_root(file_info.file, direction, diff_path)
             await GraphRepository.update_graph_db_with_file_info(self.graph_db, file_info)
         await self._create_mermaid_class_views()
         await self.graph_db.save()
+        repo_parser.save_cache()
 
     async def _create_mermaid_class_views(self) -> str:
         """Creates a Mermaid class diagram using data from the `graph_db` graph repository.
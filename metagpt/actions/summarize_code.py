@@ -103,8 +103,7 @@ class SummarizeCode(Action):
         task_doc = await self.repo.docs.task.get(filename=task_pathname.name)
         src_file_repo = self.repo.with_src_path(self.context.src_workspace).srcs
         code_blocks = []
-        for filename in self.i_context.codes_filenames:
-            code_doc = await src_file_repo.get(filename)
+        for code_doc in await src_file_repo.get_many(self.i_context.codes_filenames):
             code_block = f"```python\n{code_doc.content}\n```\n-----"
             code_blocks.append(code_block)
         format_example = FORMAT_EXAMPLE
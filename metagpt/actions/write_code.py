@@ -178,6 +178,8 @@ class WriteCode(Action):
             old_files = old_file_repo.all_files
             # Get the union of the files in the src and old workspaces
             union_files_list = list(set(src_files) | set(old_files))
+            src_filenames = [i for i in union_files_list if i != exclude]
+            src_docs = dict(zip(src_filenames, await src_file_repo.get_many(src_filenames)))
             for filename in union_files_list:
                 # Exclude the current file from the all code snippets
                 if filename == exclude:
@@ -193,7 +195,7 @@ class WriteCode(Action):
                     codes.insert(0, f"-----Now, {filename} to be rewritten\n```{doc.content}```\n=====")
                 # The code snippets are generated from the src workspace
                 else:
-                    doc = await src_file_repo.get(filename=filename)
+                    doc = src_docs.get(filename)
                     # If the file does not exist in the src workspace, skip it
                     if not doc:
                         continue
@@ -201,11 +203,9 @@ class WriteCode(Action):
 
         # Normal scenario
         else:
-            for filename in code_filenames:
-                # Exclude the current file to get the code snippets for generating the current file
-                if filename == exclude:
-                    continue
-                doc = await src_file_repo.get(filename=filename)
+            # Exclude the current file to get the code snippets for generating the current file
+            filenames = [i for i in code_filenames if i != exclude]
+            for filename, doc in zip(filenames, await src_file_repo.get_many(filenames)):
                 if not doc:
                     continue
                 codes.append(f"----- {filename}\n```{doc.content}```")
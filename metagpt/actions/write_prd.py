@@ -160,6 +160,7 @@ class WritePRD(Action):
         pathname = self.repo.workdir / COMPETITIVE_ANALYSIS_FILE_REPO / Path(prd_doc.filename).stem
         pathname.parent.mkdir(parents=True, exist_ok=True)
         await mermaid_to_file(self.config.mermaid.engine, quadrant_chart, pathname)
+        self.repo.git_repo.invalidate()  # written without FileRepository
 
     async def _rename_workspace(self, prd):
         if not self.project_name:
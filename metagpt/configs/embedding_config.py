@@ -11,6 +11,7 @@ class EmbeddingType(Enum):
     AZURE = "azure"
     GEMINI = "gemini"
     OLLAMA = "ollama"
+    LOCAL = "local"
 
 
 class EmbeddingConfig(YamlModel):
@@ -35,6 +36,14 @@ class EmbeddingConfig(YamlModel):
     base_url: "YOU_BASE_URL"
     model: "YOU_MODEL"
     dimensions: "YOUR_MODEL_DIMENSIONS"
+
+    api_type: "local"
+    model: "hashing"  # or the directory of an ONNX sentence-embedding model with its tokenizer.json
+    dimensions: "YOUR_MODEL_DIMENSIONS"  # for the hashing model only
+
+    cache: true
+    cache_path: "~/.metagpt/embedding_cache.db"
+    max_concurrency: 4
     """
 
     api_type: Optional[EmbeddingType] = None
@@ -46,6 +55,10 @@ class EmbeddingConfig(YamlModel):
     embed_batch_size: Optional[int] = None
     dimensions: Optional[int] = None  # output dimension of embedding model
 
+    cache: bool = False  # reuse the embeddings of texts seen before from an on-disk cache
+    cache_path: Optional[str] = None  # sqlite file, defaults to ~/.metagpt/embedding_cache.db
+    max_concurrency: int = 4  # max number of embedding batches requested at the same time
+
     @field_validator("api_type", mode="before")
     @classmethod
     def check_api_type(cls, v):
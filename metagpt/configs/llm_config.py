@@ -10,6 +10,7 @@ from typing import Optional
 
 from pydantic import field_validator
 
+from metagpt.configs.response_cache_config import ResponseCacheConfig
 from metagpt.const import CONFIG_ROOT, LLM_API_TIMEOUT, METAGPT_ROOT
 from metagpt.utils.yaml_model import YamlModel
 
@@ -93,6 +94,12 @@ class LLMConfig(YamlModel):
     # For Messages Control
     use_system_prompt: bool = True
 
+    # Max number of concurrent requests, e.g. of a complex ActionNode fill. Keep it under the provider's rate limit.
+    max_concurrency: int = 8
+
+    # Response cache, disabled if not set
+    response_cache: Optional[ResponseCacheConfig] = None
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : response_cache_config.py
+"""
+from enum import Enum
+from typing import Optional
+
+from metagpt.configs.redis_config import RedisConfig
+from metagpt.utils.yaml_model import YamlModel
+
+
+class ResponseCacheType(Enum):
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+    REDIS = "redis"
+
+
+class ResponseCacheConfig(YamlModel):
+    """Config for the LLM response cache.
+
+    Examples:
+    ---------
+    api_type: "memory"
+    max_size: 1024
+
+    api_type: "sqlite"
+    path: "~/.metagpt/llm_response_cache.db"
+    ttl: 604800
+
+    api_type: "redis"
+    redis:
+      host: "YOUR_HOST"
+      port: 6379
+      password: "YOUR_PASSWORD"
+      db: "0"
+    """
+
+    api_type: ResponseCacheType = ResponseCacheType.MEMORY
+    path: Optional[str] = None  # sqlite file, defaults to ~/.metagpt/llm_response_cache.db
+    ttl: int = 0  # seconds, 0 means never expire
+    max_size: int = 1024  # max entries kept by memory and sqlite backends, 0 means unlimited
+    redis: Optional[RedisConfig] = None
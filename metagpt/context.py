@@ -9,12 +9,12 @@ import os
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from metagpt.config2 import Config
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.provider.base_llm import BaseLLM
-from metagpt.provider.llm_provider_registry import create_llm_instance
+from metagpt.provider.llm_provider_registry import LLMInstanceCache
 from metagpt.utils.cost_manager import (
     CostManager,
     FireworksCostManager,
@@ -70,6 +70,7 @@ class Context(BaseModel):
     cost_manager: CostManager = CostManager()
 
     _llm: Optional[BaseLLM] = None
+    _llm_cache: LLMInstanceCache = PrivateAttr(default_factory=LLMInstanceCache)
 
     def new_environ(self):
         """Return a new os.environ object"""
@@ -88,20 +89,23 @@ class Context(BaseModel):
             return self.cost_manager
 
     def llm(self) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
-        # if self._llm is None:
-        self._llm = create_llm_instance(self.config.llm)
-        if self._llm.cost_manager is None:
-            self._llm.cost_manager = self._select_costmanager(self.config.llm)
+        """Return a LLM instance sharing the cached provider client of `config.llm`"""
+        self._llm = self.llm_with_cost_manager_from_llm_config(self.config.llm)
         return self._llm
 
     def llm_with_cost_manager_from_llm_config(self, llm_config: LLMConfig) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
-        # if self._llm is None:
-        llm = create_llm_instance(llm_config)
-        if llm.cost_manager is None:
-            llm.cost_manager = self._select_costmanager(llm_config)
-        return llm
+        """Return a LLM instance sharing the cached provider client of `llm_config`"""
+
+        def _set_cost_manager(llm: BaseLLM):
+            if llm.cost_manager is None:
+                llm.cost_manager = self._select_costmanager(llm_config)
+
+        return self._llm_cache.get(llm_config, cost_manager=self.cost_manager, on_create=_set_cost_manager)
+
+    async def close_llm(self):
+        """Close the cached provider clients, the next `llm()` call will create new ones"""
+        self._llm = None
+        await self._llm_cache.aclose()
 
     def serialize(self) -> Dict[str, Any]:
         """Serialize the object's attributes into a dictionary.
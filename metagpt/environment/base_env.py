@@ -3,14 +3,26 @@
 # @Desc   : base env of executing environment
 
 import asyncio
+import json
 from abc import abstractmethod
+from collections import deque
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, TextIO, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    model_validator,
+)
+from pydantic_core import core_schema
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -20,7 +32,7 @@ from metagpt.environment.api.env_api import (
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
 from metagpt.logs import logger
 from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.utils.common import get_function_schema, is_coroutine_func
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -50,6 +62,63 @@ def mark_as_writeable(func):
     return func
 
 
+class EnvHistory:
+    """Bounded record of the latest published messages, kept for debugging.
+
+    It is serialized as the list of its records, one per message, and can be loaded from the `"\n{message}"` joined
+    text of earlier versions, one record per line. `str` returns that text.
+    """
+
+    DEFAULT_MAXLEN = 1000
+
+    def __init__(self, records: Union[str, Iterable[str]] = (), maxlen: Optional[int] = DEFAULT_MAXLEN):
+        self.records: deque[str] = deque(maxlen=maxlen)
+        self._length = 0  # len(str(self)), kept up to date by `append`
+        if isinstance(records, str):
+            records = records.removeprefix("\n").split("\n") if records else []
+        for record in records:
+            self.append(record)
+
+    def append(self, record: str):
+        if self.records.maxlen == 0:
+            return
+        if len(self.records) == self.records.maxlen:
+            self._length -= len(self.records[0]) + 1
+        self.records.append(record)
+        self._length += len(record) + 1
+
+    def __str__(self) -> str:
+        return "".join(f"\n{i}" for i in self.records)
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, EnvHistory):
+            return self.records == other.records
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    @classmethod
+    def _validate(cls, value: Any) -> "EnvHistory":
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (str, list)):
+            return cls(value)
+        raise ValueError(f"Invalid history: {value!r}")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler) -> core_schema.CoreSchema:
+        serialization = core_schema.plain_serializer_function_ser_schema(
+            lambda value: list(value.records), return_schema=core_schema.list_schema(core_schema.str_schema())
+        )
+        return core_schema.no_info_plain_validator_function(cls._validate, serialization=serialization)
+
+
 class ExtEnv(BaseModel):
     """External Env to integrate actual game environment"""
 
@@ -131,8 +200,17 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    history: EnvHistory = Field(default_factory=EnvHistory)  # For debug, the latest messages only
+    # If set, every message is appended to this file as a json string per line
+    history_path: Optional[Path] = Field(default=None, exclude=True)
     context: Context = Field(default_factory=Context, exclude=True)
+    # If true, `run` only runs the roles woken up by new messages instead of every role in every round
+    event_driven: bool = False
+
+    _ready_roles: dict["Role", None] = PrivateAttr(default_factory=dict)  # ordered set of the roles to run
+    _history_writer: Optional[TextIO] = PrivateAttr(default=None)
+    # Inverted index of `member_addrs`, maps an address to the ordered set of the roles subscribed to it
+    _addr_index: dict[str, dict["Role", None]] = PrivateAttr(default_factory=dict)
 
     def reset(
         self,
@@ -160,6 +238,7 @@ class Environment(ExtEnv):
         self.roles[role.profile] = role
         role.set_env(self)
         role.context = self.context
+        self.wake_role(role)
 
     def add_roles(self, roles: Iterable["Role"]):
         """增加一批在当前环境的角色
@@ -171,6 +250,7 @@ class Environment(ExtEnv):
         for role in roles:  # setup system message with roles
             role.context = self.context
             role.set_env(self)
+            self.wake_role(role)
 
     def publish_message(self, message: Message, peekable: bool = True) -> bool:
         """
@@ -181,23 +261,54 @@ class Environment(ExtEnv):
         route the message to the message recipient is a problem addressed by the transport framework designed
         in RFC 113.
         """
-        logger.debug(f"publish_message: {message.dump()}")
-        found = False
+        logger.opt(lazy=True).debug("publish_message: {}", message.dump)
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
-        if not found:
+        recipients = self._get_recipients(message)
+        for role in recipients:
+            role.put_message(message)
+            if role.is_interested(message):
+                self.wake_role(role)
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self._record_history(message)
 
         return True
 
+    def _get_recipients(self, message: Message) -> Iterable["Role"]:
+        """Look up the roles subscribed to any address in `message.send_to`, see `utils.common.is_send_to`."""
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            return list(self.member_addrs)
+        if len(message.send_to) == 1:
+            return list(self._addr_index.get(next(iter(message.send_to)), ()))
+        recipients = {}
+        for addr in message.send_to:
+            recipients.update(self._addr_index.get(addr, {}))
+        return list(recipients)
+
+    def _record_history(self, message: Message):
+        record = str(message)
+        self.history.append(record)
+        if self.history_path:
+            writer = self._history_writer
+            if writer is None or writer.name != str(self.history_path):
+                if writer:
+                    writer.close()
+                self.history_path.parent.mkdir(parents=True, exist_ok=True)
+                writer = self._history_writer = open(self.history_path, "a", encoding="utf-8", buffering=1)
+            writer.write(json.dumps(record, ensure_ascii=False) + "\n")  # line buffered, flushed per message
+
+    def close_history(self):
+        """Close the `history_path` file, it is reopened by the next published message."""
+        if self._history_writer:
+            self._history_writer.close()
+            self._history_writer = None
+
     async def run(self, k=1):
         """处理一次所有信息的运行
         Process all Role runs at once
         """
+        if self.event_driven:
+            return await self._run_ready_roles(k)
         for _ in range(k):
             futures = []
             for role in self.roles.values():
@@ -207,6 +318,31 @@ class Environment(ExtEnv):
             await asyncio.gather(*futures)
             logger.debug(f"is idle: {self.is_idle}")
 
+    async def _run_ready_roles(self, k=1):
+        """Run only the roles that have been woken up since the last round.
+
+        A role is woken up by a message it is interested in, other messages stay in its buffer until then. Roles with
+        `run_every_round` set run in every round. Each round takes a snapshot of the ready set and ends when all of them
+        have run, so messages published during a round are handled in the next one, the same as the round-robin `run`.
+        """
+        for _ in range(k):
+            if not self._ready_roles:
+                # Messages may have been put into a role's buffer directly, without `publish_message`
+                for role in self.roles.values():
+                    if not role.rc.msg_buffer.empty():
+                        self.wake_role(role)
+            ready = self._ready_roles
+            self._ready_roles = {}
+            ready.update((r, None) for r in self.roles.values() if r.run_every_round)
+            if not ready:
+                break
+            await asyncio.gather(*[role.run() for role in ready])
+            logger.debug(f"ran {len(ready)} of {len(self.roles)} roles, {len(self._ready_roles)} woken up")
+
+    def wake_role(self, role: "Role"):
+        """Mark the role as ready to run in the next event-driven round"""
+        self._ready_roles[role] = None
+
     def get_roles(self) -> dict[str, "Role"]:
         """获得环境内的所有角色
         Process all Role runs at once
@@ -225,6 +361,9 @@ class Environment(ExtEnv):
     @property
     def is_idle(self):
         """If true, all actions have been executed."""
+        if self.event_driven:
+            # Idle roles are not run, so their stale `rc.news` and unwatched buffered messages do not count
+            return not self._ready_roles and all(r.is_idle for r in self.roles.values() if r.run_every_round)
         for r in self.roles.values():
             if not r.is_idle:
                 return False
@@ -236,9 +375,19 @@ class Environment(ExtEnv):
 
     def set_addresses(self, obj, addresses):
         """Set the addresses of the object"""
+        for addr in self.member_addrs.get(obj, ()):
+            subscribers = self._addr_index.get(addr)
+            if subscribers is None:
+                continue
+            subscribers.pop(obj, None)
+            if not subscribers:
+                del self._addr_index[addr]
         self.member_addrs[obj] = addresses
+        for addr in addresses:
+            self._addr_index.setdefault(addr, {})[obj] = None
 
     def archive(self, auto_archive=True):
+        self.close_history()
         if auto_archive and self.context.git_repo:
             self.context.git_repo.archive()
 
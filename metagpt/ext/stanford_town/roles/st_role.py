@@ -16,7 +16,7 @@ import time
 from datetime import datetime, timedelta
 from operator import itemgetter
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, ClassVar, Optional
 
 from pydantic import ConfigDict, Field, field_validator, model_validator
 
@@ -80,6 +80,7 @@ class STRole(Role):
     profile: str = Field(default="STMember")
 
     rc: STRoleContext = Field(default_factory=STRoleContext)
+    run_every_round: ClassVar[bool] = True  # `_react` is executed in every step, see `_observe`
 
     sim_code: str = Field(default="new_sim")
     step: int = Field(default=0)
@@ -187,11 +188,9 @@ class STRole(Role):
         news = []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = news if ignore_memory else [n for n in news if not self.rc.memory.contains(n)]
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if self.is_interested(n)]
 
         if len(self.rc.news) == 1 and self.rc.news[0].cause_by == any_to_str(UserRequirement):
             logger.warning(f"Role: {self.name} add inner voice: {self.rc.news[0].content}")
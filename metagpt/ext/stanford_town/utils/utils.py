@@ -8,12 +8,14 @@ import json
 import os
 import shutil
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Union
 
 from openai import OpenAI
 
 from metagpt.config2 import config
+from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.logs import logger
 
 
@@ -47,16 +49,26 @@ def read_csv_to_list(curr_file: str, header=False, strip_trail=True):
         return analysis_list[0], analysis_list[1:]
 
 
+@lru_cache(maxsize=1)
+def get_local_embedding():
+    from metagpt.rag.factories.embedding import get_rag_embedding
+
+    return get_rag_embedding(EmbeddingType.LOCAL)
+
+
 def get_embedding(text, model: str = "text-embedding-ada-002"):
     text = text.replace("\n", " ")
     embedding = None
     if not text:
         text = "this is blank"
+    if config.embedding.api_type == EmbeddingType.LOCAL:
+        return get_local_embedding().get_text_embedding(text)
     for idx in range(3):
         try:
             embedding = (
                 OpenAI(api_key=config.llm.api_key).embeddings.create(input=[text], model=model).data[0].embedding
             )
+            break
         except Exception as exp:
             logger.info(f"get_embedding failed, exp: {exp}, will retry.")
             time.sleep(5)
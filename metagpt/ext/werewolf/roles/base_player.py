@@ -16,6 +16,7 @@ from metagpt.ext.werewolf.actions import (
 from metagpt.ext.werewolf.schema import RoleExperience, WwMessage
 from metagpt.logs import logger
 from metagpt.roles import Role
+from metagpt.schema import Message
 from metagpt.utils.common import any_to_str
 
 
@@ -51,6 +52,9 @@ class BasePlayer(Role):
             self.addresses = {any_to_str(self), self.name, self.profile} if self.name else {any_to_str(self)}
         return self
 
+    def is_interested(self, message: Message) -> bool:
+        return message.cause_by in self.rc.watch or self.profile in message.send_to
+
     async def _observe(self, ignore_memory=False) -> int:
         if self.status != RoleState.ALIVE:
             # 死者不再参与游戏
@@ -58,16 +62,14 @@ class BasePlayer(Role):
         news = []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = news if ignore_memory else [n for n in news if not self.rc.memory.contains(n)]
         for m in news:
             if len(m.restricted_to) and self.profile not in m.restricted_to and self.name not in m.restricted_to:
                 # if the msg is not send to the whole audience ("") nor this role (self.profile or self.name),
                 # then this role should not be able to receive it and record it into its memory
                 continue
             self.rc.memory.add(m)
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.profile in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if self.is_interested(n)]
 
         # TODO to delete
         # await super()._observe()
@@ -20,6 +20,7 @@ from metagpt.ext.werewolf.actions.moderator_actions import (
 from metagpt.ext.werewolf.roles.base_player import BasePlayer
 from metagpt.ext.werewolf.schema import WwMessage
 from metagpt.logs import logger
+from metagpt.schema import Message
 from metagpt.utils.common import any_to_str
 
 
@@ -137,24 +138,26 @@ class Moderator(BasePlayer):
             with open(DEFAULT_WORKSPACE_ROOT / "werewolf_transcript.txt", "w") as f:
                 f.write(self.get_all_memories())
 
+    def is_interested(self, message: Message) -> bool:
+        # add `MESSAGE_ROUTE_TO_ALL in message.send_to` make it to run `ParseSpeak`
+        return (
+            message.cause_by in self.rc.watch
+            or self.profile in message.send_to
+            or MESSAGE_ROUTE_TO_ALL in message.send_to
+        )
+
     async def _observe(self, ignore_memory=False) -> int:
         news = []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = news if ignore_memory else [n for n in news if not self.rc.memory.contains(n)]
         for m in news:
             if len(m.restricted_to) and self.profile not in m.restricted_to and self.name not in m.restricted_to:
                 # if the msg is not send to the whole audience ("") nor this role (self.profile or self.name),
                 # then this role should not be able to receive it and record it into its memory
                 continue
             self.rc.memory.add(m)
-        # add `MESSAGE_ROUTE_TO_ALL in n.send_to` make it to run `ParseSpeak`
-        self.rc.news = [
-            n
-            for n in news
-            if (n.cause_by in self.rc.watch or self.profile in n.send_to or MESSAGE_ROUTE_TO_ALL in n.send_to)
-            and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if self.is_interested(n)]
         return len(self.rc.news)
 
     async def _think(self):
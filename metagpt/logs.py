@@ -7,7 +7,9 @@
 """
 
 import sys
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Callable, Optional
 
 from loguru import logger as _logger
 
@@ -33,8 +35,14 @@ def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None
 
 logger = define_log_level()
 
+# Receives the streamed LLM chunks of the current task besides the stream log, e.g. an incremental output parser
+LLM_STREAM_CONSUMER: ContextVar[Optional[Callable[[str], None]]] = ContextVar("llm_stream_consumer", default=None)
+
 
 def log_llm_stream(msg):
+    consumer = LLM_STREAM_CONSUMER.get()
+    if consumer:
+        consumer(msg)
     _llm_stream_log(msg)
 
 
@@ -4,7 +4,7 @@
 @Desc   : the implement of Long-term memory
 """
 
-from typing import Optional
+from typing import Iterable, Optional
 
 from pydantic import ConfigDict, Field
 
@@ -47,6 +47,14 @@ class LongTermMemory(Memory):
                 # and ignore adding messages from recover repeatedly
                 self.memory_storage.add(message)
 
+    def add_batch(self, messages: Iterable[Message]):
+        watched = []
+        for message in messages:
+            super().add(message)
+            if message.cause_by in self.rc.watch and not self.msg_from_recover:
+                watched.append(message)
+        self.memory_storage.add_batch(watched)
+
     async def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """
         find news (previously unseen messages) from the the most recent k memories, from all memories when k=0
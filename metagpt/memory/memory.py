@@ -9,7 +9,7 @@
 from collections import defaultdict
 from typing import DefaultDict, Iterable, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
@@ -23,23 +23,58 @@ class Memory(BaseModel):
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
 
+    # Runtime-only indexes, rebuilt from `storage` on demand and never serialized.
+    # `_messages` maps a message key to the stored message in insertion order, serving both as the dedup set and as
+    # the ordered id index; the secondary indexes map an attribute value to an ordered {key: message} bucket.
+    _messages: dict[str, Message] = PrivateAttr(default_factory=dict)
+    _role_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _sent_from_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _send_to_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _indexed_size: int = PrivateAttr(default=0)
+
+    def __eq__(self, other) -> bool:
+        """Compare fields only, the runtime indexes are derived from `storage`."""
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
+        self._sync_index()
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        key = self._key(message)
+        if key in self._messages:
             return
         self.storage.append(message)
         if message.cause_by:
             self.index[message.cause_by].append(message)
+        self._index_message(key, message)
+        self._indexed_size = len(self.storage)
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
             self.add(message)
 
+    def contains(self, message: Message) -> bool:
+        """Return True if the message has already been stored"""
+        self._sync_index()
+        return self._key(message) in self._messages
+
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        self._sync_index()
+        return list(self._role_index.get(role, {}).values())
+
+    def get_by_sent_from(self, sent_from) -> list[Message]:
+        """Return all messages sent from a specified role"""
+        self._sync_index()
+        return list(self._sent_from_index.get(any_to_str(sent_from), {}).values())
+
+    def get_by_send_to(self, send_to) -> list[Message]:
+        """Return all messages addressed to a specified address"""
+        self._sync_index()
+        return list(self._send_to_index.get(any_to_str(send_to), {}).values())
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
@@ -47,26 +82,43 @@ class Memory(BaseModel):
 
     def delete_newest(self) -> "Message":
         """delete the newest message from the storage"""
+        self._sync_index()
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+            self._remove_from_indexes(newest_msg)
         else:
             newest_msg = None
         return newest_msg
 
     def delete(self, message: Message):
         """Delete the specified message from storage, while updating the index"""
+        self._sync_index()
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        stored = self._messages.get(self._key(message))
+        if stored is None:
+            raise ValueError(f"{message} is not in memory")
+        # Messages are mostly deleted right after being observed, so look for the stored object from the newest end.
+        for i in range(len(self.storage) - 1, -1, -1):
+            if self.storage[i] is stored:
+                del self.storage[i]
+                break
+        self._remove_from_indexes(stored)
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._reset_index()
+
+    def rebuild_index(self):
+        """Rebuild the index from storage, e.g. after storage is loaded without the index"""
+        self.index = defaultdict(list)
+        for message in self.storage:
+            if message.cause_by:
+                self.index[message.cause_by].append(message)
+        self._reset_index()
+        self._sync_index()
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -82,13 +134,12 @@ class Memory(BaseModel):
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        self._sync_index()
+        if k:
+            already_observed = {self._key(i) for i in self.storage[-k:]}
+        else:
+            already_observed = self._messages
+        return [i for i in observed if self._key(i) not in already_observed]
 
     def get_by_action(self, action) -> list[Message]:
         """Return all messages triggered by a specified Action"""
@@ -104,3 +155,57 @@ class Memory(BaseModel):
                 continue
             rsp += self.index[action]
         return rsp
+
+    def _key(self, message: Message) -> str:
+        """Return the dedup key of a message: its id, or its full content when ids are ignored."""
+        if self.ignore_id:
+            return message.model_dump_json(exclude={"id"}, warnings=False)
+        return message.id
+
+    def _index_message(self, key: str, message: Message):
+        self._messages[key] = message
+        self._role_index[message.role][key] = message
+        self._sent_from_index[message.sent_from][key] = message
+        for addr in message.send_to:
+            self._send_to_index[addr][key] = message
+
+    def _remove_from_indexes(self, message: Message):
+        key = self._key(message)
+        if self._messages.get(key) is message:
+            del self._messages[key]
+            for index, values in (
+                (self._role_index, [message.role]),
+                (self._sent_from_index, [message.sent_from]),
+                (self._send_to_index, message.send_to),
+            ):
+                for value in values:
+                    bucket = index.get(value)
+                    if bucket is None:
+                        continue
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del index[value]
+        if message.cause_by and message.cause_by in self.index:
+            bucket = self.index[message.cause_by]
+            for i in range(len(bucket) - 1, -1, -1):
+                if bucket[i] is message:
+                    del bucket[i]
+                    break
+        self._indexed_size = len(self.storage)
+
+    def _reset_index(self):
+        self._messages = {}
+        self._role_index = defaultdict(dict)
+        self._sent_from_index = defaultdict(dict)
+        self._send_to_index = defaultdict(dict)
+        self._indexed_size = 0
+
+    def _sync_index(self):
+        """Rebuild the runtime indexes if `storage` was populated without going through `add`, e.g. deserialization
+        or subclasses that append to `storage` directly."""
+        if self._indexed_size == len(self.storage):
+            return
+        self._reset_index()
+        for message in self.storage:
+            self._index_message(self._key(message), message)
+        self._indexed_size = len(self.storage)
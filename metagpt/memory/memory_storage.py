@@ -41,15 +41,17 @@ class MemoryStorage(object):
         self.role_mem_path.mkdir(parents=True, exist_ok=True)
         self.cache_dir = self.role_mem_path
 
+        # the dimensions of the config apply to the configured model, not to an embedding passed in
+        retriever_config = FAISSRetrieverConfig(dimensions=getattr(self.embedding, "dimensions", None) or 0)
         if self.role_mem_path.joinpath("default__vector_store.json").exists():
             self.faiss_engine = SimpleEngine.from_index(
                 index_config=FAISSIndexConfig(persist_path=self.cache_dir),
-                retriever_configs=[FAISSRetrieverConfig()],
+                retriever_configs=[retriever_config],
                 embed_model=self.embedding,
             )
         else:
             self.faiss_engine = SimpleEngine.from_objs(
-                objs=[], retriever_configs=[FAISSRetrieverConfig()], embed_model=self.embedding
+                objs=[], retriever_configs=[retriever_config], embed_model=self.embedding
             )
         self._initialized = True
 
@@ -58,6 +60,13 @@ class MemoryStorage(object):
         self.faiss_engine.add_objs([message])
         logger.info(f"Role {self.role_id}'s memory_storage add a message")
 
+    def add_batch(self, messages: list[Message]):
+        """add messages into memory storage, embedding them in batches"""
+        if not messages:
+            return
+        self.faiss_engine.add_objs(messages)
+        logger.info(f"Role {self.role_id}'s memory_storage add {len(messages)} messages")
+
     async def search_similar(self, message: Message, k=4) -> list[Message]:
         """search for similar messages"""
         # filter the result which score is smaller than the threshold
@@ -8,7 +8,11 @@
 """
 from __future__ import annotations
 
+import asyncio
+import functools
+import inspect
 import json
+import weakref
 from abc import ABC, abstractmethod
 from typing import Optional, Union
 
@@ -24,10 +28,49 @@ from tenacity import (
 
 from metagpt.configs.llm_config import LLMConfig
 from metagpt.const import LLM_API_TIMEOUT, USE_CONFIG_TIMEOUT
-from metagpt.logs import logger
+from metagpt.logs import log_llm_stream, logger
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
+from metagpt.utils.response_cache import (
+    BaseResponseCache,
+    get_response_cache,
+    response_cache_key,
+)
+
+
+def cache_response(func):
+    """Serve an LLM call from `LLMConfig.response_cache` if an identical request has been answered before.
+
+    The key is the normalized hash of (model, messages, temperature, tools), where `tools` covers all the extra
+    request kwargs except `stream` and `timeout`. Cache hits cost no tokens and are not added to the cost manager.
+    """
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(self: "BaseLLM", messages, *args, **kwargs):
+        cache = self.response_cache
+        if cache is None:
+            return await func(self, messages, *args, **kwargs)
+
+        tools = {k: v for k, v in kwargs.items() if k not in ("stream", "timeout")} or None
+        key = response_cache_key(self.model or self.config.model, messages, self.config.temperature, tools)
+        value = await cache.get(key)
+        if value is not None:
+            rsp = json.loads(value)
+            bound = signature.bind(self, messages, *args, **kwargs)
+            bound.apply_defaults()
+            if bound.arguments.get("stream", False) and isinstance(rsp, str):
+                log_llm_stream(rsp)
+                log_llm_stream("\n")
+            return rsp
+
+        rsp = await func(self, messages, *args, **kwargs)
+        await cache.set(key, json.dumps(rsp, ensure_ascii=False))
+        return rsp
+
+    return wrapper
 
 
 class BaseLLM(ABC):
@@ -47,6 +90,27 @@ class BaseLLM(ABC):
     def __init__(self, config: LLMConfig):
         pass
 
+    @property
+    def response_cache(self) -> Optional[BaseResponseCache]:
+        """The response cache configured by `LLMConfig.response_cache`, None if disabled"""
+        if not self.config or not self.config.response_cache:
+            return None
+        return get_response_cache(self.config.response_cache)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Limit of the concurrent requests of this LLM in the running loop, shared by all its callers.
+
+        The size is `LLMConfig.max_concurrency`. A semaphore is bound to the loop it is used in, so each loop gets its
+        own.
+        """
+        semaphores = self.__dict__.setdefault("_semaphores", weakref.WeakKeyDictionary())
+        loop = asyncio.get_running_loop()
+        semaphore = semaphores.get(loop)
+        if semaphore is None:
+            semaphore = semaphores[loop] = asyncio.Semaphore(max(1, self.config.max_concurrency))
+        return semaphore
+
     def _user_msg(self, msg: str, images: Optional[Union[str, list[str]]] = None) -> dict[str, Union[str, dict]]:
         if images:
             # as gpt-4v, chat with image
@@ -187,6 +251,7 @@ class BaseLLM(ABC):
     async def _achat_completion_stream(self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT) -> str:
         """_achat_completion_stream implemented by inherited class"""
 
+    @cache_response
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_random_exponential(min=1, max=60),
@@ -5,8 +5,14 @@
 @Author  : alexanderwu
 @File    : llm_provider_registry.py
 """
+import copy
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
 from metagpt.configs.llm_config import LLMConfig, LLMType
+from metagpt.logs import logger
 from metagpt.provider.base_llm import BaseLLM
+from metagpt.utils.cost_manager import CostManager
 
 
 class LLMProviderRegistry:
@@ -44,5 +50,71 @@ def create_llm_instance(config: LLMConfig) -> BaseLLM:
     return llm
 
 
+class LLMInstanceCache:
+    """Keep warm provider instances keyed by `LLMConfig` and cost manager and hand out shallow copies of them.
+
+    A copy shares the provider client (and therefore its HTTP connection pool) with the warm instance, while
+    per-owner attributes such as `config`, `system_prompt`, `cost_manager` and the concurrency semaphores stay
+    independent.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        # The cost manager is kept with the instance so that the id in its key is not reused
+        self._instances: OrderedDict[str, Tuple[BaseLLM, Optional[CostManager]]] = OrderedDict()
+
+    @staticmethod
+    def key(config: LLMConfig, cost_manager: Optional[CostManager] = None) -> str:
+        return f"{config.model_dump_json()}#{id(cost_manager)}"
+
+    def get(
+        self,
+        config: LLMConfig,
+        cost_manager: Optional[CostManager] = None,
+        on_create: Optional[Callable[[BaseLLM], None]] = None,
+    ) -> BaseLLM:
+        """Return a new LLM object backed by the cached provider instance for `config` and `cost_manager`."""
+        key = self.key(config, cost_manager)
+        entry = self._instances.get(key)
+        if entry is None:
+            warm = create_llm_instance(config)
+            if on_create:
+                on_create(warm)
+            self._instances[key] = (warm, cost_manager)
+            while len(self._instances) > self.maxsize:
+                self._instances.popitem(last=False)
+        else:
+            warm = entry[0]
+            self._instances.move_to_end(key)
+        llm = copy.copy(warm)
+        llm.config = warm.config.model_copy()
+        llm.__dict__.pop("_semaphores", None)
+        return llm
+
+    def evict(self, config: LLMConfig, cost_manager: Optional[CostManager] = None) -> Optional[BaseLLM]:
+        """Drop the cached instance of `config`, copies already handed out keep working."""
+        entry = self._instances.pop(self.key(config, cost_manager), None)
+        return entry[0] if entry else None
+
+    def clear(self):
+        self._instances.clear()
+
+    async def aclose(self):
+        """Close the provider clients of all cached instances and empty the cache."""
+        instances = list(self._instances.values())
+        self._instances.clear()
+        for llm, _ in instances:
+            close = getattr(llm.aclient, "close", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as e:
+                logger.warning(f"close {llm.__class__.__name__} client failed: {e}")
+
+    def __len__(self):
+        return len(self._instances)
+
+
 # Registry instance
 LLM_REGISTRY = LLMProviderRegistry()
@@ -0,0 +1,6 @@
+"""Embeddings init."""
+
+from metagpt.rag.embeddings.cached import CachedEmbedding, EmbeddingCache, get_embedding_cache, wrap_embedding
+from metagpt.rag.embeddings.local import LocalEmbedding
+
+__all__ = ["CachedEmbedding", "EmbeddingCache", "get_embedding_cache", "wrap_embedding", "LocalEmbedding"]
@@ -0,0 +1,218 @@
+"""Embedding cache and batched embedding of texts.
+
+Ingestion embeds every node again, although most of them are unchanged between runs. `CachedEmbedding` wraps any
+LlamaIndex embedding: a batch is deduplicated, the texts embedded before are read from an `EmbeddingCache` keyed by
+the model and the hash of the text, and only the rest are sent to the model, in batches of its `embed_batch_size`
+requested concurrently.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+from metagpt.configs.embedding_config import EmbeddingConfig
+from metagpt.const import CONFIG_ROOT
+
+SQLITE_MAX_VARIABLES = 900  # below the default limit of sqlite < 3.32
+
+
+def embedding_cache_key(text: str) -> str:
+    """Return the hash a text is cached by."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_model_key(embed_model: BaseEmbedding) -> str:
+    """Return the name the embeddings of a model are cached under, the same model with other dimensions differs."""
+    key = f"{type(embed_model).__name__}:{embed_model.model_name}"
+    dimensions = getattr(embed_model, "dimensions", None)
+    return f"{key}:{dimensions}" if dimensions else key
+
+
+class EmbeddingCache:
+    """On-disk store of float32 embeddings keyed by model and text hash, shared by threads and processes."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding (model TEXT, key TEXT, vector BLOB, PRIMARY KEY (model, key))"
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, keys: list[str]) -> dict[str, Embedding]:
+        """Return the cached embeddings of the keys found."""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[i : i + SQLITE_MAX_VARIABLES]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embedding WHERE model = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                )
+                found.update((key, np.frombuffer(vector, dtype=np.float32).tolist()) for key, vector in rows)
+        return found
+
+    def set_many(self, model: str, items: dict[str, Embedding]):
+        """Store the embeddings of the keys."""
+        rows = [(model, key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embedding (model, key, vector) VALUES (?, ?, ?)", rows)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embedding")
+
+    def close(self):
+        self._conn.close()
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Embed texts with `embed_model`, reusing the embeddings of the texts seen before.
+
+    Queries are passed through uncached, they rarely repeat.
+    """
+
+    max_concurrency: int = Field(default=4, gt=0, description="Max number of batches requested at the same time.")
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: Optional[EmbeddingCache] = PrivateAttr(default=None)
+    _model_key: str = PrivateAttr()
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    def __init__(self, embed_model: BaseEmbedding, cache: Optional[EmbeddingCache] = None, **kwargs: Any):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            callback_manager=embed_model.callback_manager,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._cache = cache
+        self._model_key = embedding_model_key(embed_model)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def embed_model(self) -> BaseEmbedding:
+        """The embedding model called on cache misses."""
+        return self._embed_model
+
+    @property
+    def dimensions(self) -> Optional[int]:
+        """The output dimension of the embedding model, if known."""
+        return getattr(self._embed_model, "dimensions", None)
+
+    @property
+    def hits(self) -> int:
+        """The number of texts read from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """The number of texts sent to the embedding model."""
+        return self._misses
+
+    def get_text_embedding_batch(self, texts: list[str], show_progress: bool = False, **kwargs: Any) -> list[Embedding]:
+        keys, cached, missing = self._lookup(texts)
+        batches = self._batch(missing)
+        if len(batches) > 1 and self.max_concurrency > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                results = list(executor.map(self.embed_model.get_text_embedding_batch, batches))
+        else:
+            results = [self.embed_model.get_text_embedding_batch(i) for i in batches]
+        return self._merge(keys, cached, missing, results)
+
+    async def aget_text_embedding_batch(self, texts: list[str], show_progress: bool = False) -> list[Embedding]:
+        keys, cached, missing = self._lookup(texts)
+        batches = self._batch(missing)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _embed(batch: list[str]) -> list[Embedding]:
+            async with semaphore:
+                return await self.embed_model.aget_text_embedding_batch(batch)
+
+        results = await asyncio.gather(*[_embed(i) for i in batches])
+        return self._merge(keys, cached, missing, results)
+
+    def _lookup(self, texts: list[str]) -> tuple[list[str], dict[str, Embedding], dict[str, str]]:
+        """Return the key of each text, the cached embeddings and the unique texts missing from the cache by key."""
+        keys = [embedding_cache_key(i) for i in texts]
+        unique = dict(zip(keys, texts))
+        cached = self._cache.get_many(self._model_key, list(unique)) if self._cache else {}
+        missing = {k: v for k, v in unique.items() if k not in cached}
+        self._hits += len(texts) - len(missing)
+        self._misses += len(missing)
+        return keys, cached, missing
+
+    def _batch(self, missing: dict[str, str]) -> list[list[str]]:
+        texts = list(missing.values())
+        return [texts[i : i + self.embed_batch_size] for i in range(0, len(texts), self.embed_batch_size)]
+
+    def _merge(
+        self,
+        keys: list[str],
+        cached: dict[str, Embedding],
+        missing: dict[str, str],
+        results: list[list[Embedding]],
+    ) -> list[Embedding]:
+        embedded = dict(zip(missing, (e for embeddings in results for e in embeddings)))
+        if self._cache and embedded:
+            self._cache.set_many(self._model_key, embedded)
+        cached.update(embedded)
+        return [cached[k] for k in keys]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self.get_text_embedding_batch([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self.aget_text_embedding_batch([text]))[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return self.get_text_embedding_batch(texts)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return await self.aget_text_embedding_batch(texts)
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self.embed_model.get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await self.embed_model.aget_query_embedding(query)
+
+
+_EMBEDDING_CACHES: dict[Path, EmbeddingCache] = {}
+
+
+def get_embedding_cache(path: Optional[str] = None) -> EmbeddingCache:
+    """Return the shared cache stored at `path`, defaults to ~/.metagpt/embedding_cache.db."""
+    path = Path(path or CONFIG_ROOT / "embedding_cache.db").expanduser().resolve()
+    cache = _EMBEDDING_CACHES.get(path)
+    if cache is None:
+        cache = _EMBEDDING_CACHES[path] = EmbeddingCache(path)
+    return cache
+
+
+def wrap_embedding(embed_model: BaseEmbedding, config: EmbeddingConfig) -> BaseEmbedding:
+    """Wrap `embed_model` with the cache and concurrency of `config`, return it as is if the cache is disabled."""
+    if not config.cache or isinstance(embed_model, CachedEmbedding):
+        return embed_model
+    if config.cache_path is not None and not isinstance(config.cache_path, (str, Path)):
+        raise TypeError(f"Expect the embedding cache_path to be a str or a Path, got {type(config.cache_path)}")
+    return CachedEmbedding(
+        embed_model, cache=get_embedding_cache(config.cache_path), max_concurrency=config.max_concurrency
+    )
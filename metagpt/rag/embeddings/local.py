@@ -0,0 +1,143 @@
+"""Embedding computed on the local CPU, without network.
+
+Two models are supported:
+- `hashing`, the default: the words and character trigrams of a text are hashed into a signed bag of features. It
+  needs nothing but numpy and captures lexical similarity, enough for tests, offline runs and deduplication.
+- A directory holding a sentence-embedding model exported to ONNX, `model.onnx` next to its `tokenizer.json`, as
+  exported by `optimum` or sentence-transformers. The token states are mean-pooled, unless the model outputs pooled
+  sentence embeddings already. Needs `onnxruntime` and `tokenizers`.
+
+A batch is split across a thread pool, onnxruntime releases the GIL while running the model.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+HASHING_MODEL = "hashing"
+DEFAULT_HASHING_DIMENSIONS = 512
+ONNX_MODEL_FILENAME = "model.onnx"
+ONNX_TOKENIZER_FILENAME = "tokenizer.json"
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=2**16)
+def _hash_feature(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+def _features(text: str) -> list[str]:
+    """Return the words and the character trigrams of the words of a text."""
+    features = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        features.append(word)
+        padded = f"<{word}>"
+        features.extend(f"#{padded[i : i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+class LocalEmbedding(BaseEmbedding):
+    """Embed texts on the local CPU with the hashing model or an ONNX sentence-embedding model."""
+
+    model_name: str = Field(default=HASHING_MODEL, description="`hashing`, or the directory of an ONNX model.")
+    dimensions: Optional[int] = Field(default=None, description="The output dimension, read from ONNX models.")
+    max_length: int = Field(default=256, gt=0, description="The max number of tokens of a text for ONNX models.")
+    num_workers: int = Field(
+        default_factory=lambda: min(4, os.cpu_count() or 1), gt=0, description="The threads embedding a batch."
+    )
+
+    _session: Any = PrivateAttr(default=None)
+    _tokenizer: Any = PrivateAttr(default=None)
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        if self.model_name == HASHING_MODEL:
+            self.dimensions = self.dimensions or DEFAULT_HASHING_DIMENSIONS
+        else:
+            self._load_onnx(Path(self.model_name).expanduser())
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalEmbedding"
+
+    def _load_onnx(self, model_dir: Path):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("ONNX local embedding needs `pip install onnxruntime tokenizers`") from e
+
+        self._session = onnxruntime.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILENAME), providers=["CPUExecutionProvider"]
+        )
+        self._tokenizer = Tokenizer.from_file(str(model_dir / ONNX_TOKENIZER_FILENAME))
+        self._tokenizer.enable_padding()
+        self._tokenizer.enable_truncation(max_length=self.max_length)
+        dimensions = self._session.get_outputs()[0].shape[-1]
+        if not isinstance(dimensions, int):  # a symbolic dimension, embed a text to find it
+            dimensions = self._embed_onnx(["dimensions"]).shape[-1]
+        self.dimensions = dimensions
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._get_text_embeddings([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        size = -(-len(texts) // self.num_workers)  # ceil
+        chunks = [texts[i : i + size] for i in range(0, len(texts), size)]
+        if len(chunks) <= 1:
+            return self._embed(texts).tolist()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="local_embedding")
+        return np.concatenate(list(self._executor.map(self._embed, chunks))).tolist()
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return await asyncio.to_thread(self._get_text_embeddings, texts)
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        """Return the l2-normalized embeddings of the texts as rows."""
+        vectors = self._embed_onnx(texts) if self._session else self._embed_hashing(texts)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _embed_hashing(self, texts: list[str]) -> np.ndarray:
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            features = _features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(_hash_feature(i) for i in features)
+        hashes = np.asarray(hashes, dtype=np.int64)
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(vectors, (np.asarray(rows, dtype=np.int64), hashes % self.dimensions), signs)
+        return vectors
+
+    def _embed_onnx(self, texts: list[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+        if "token_type_ids" in {i.name for i in self._session.get_inputs()}:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self._session.run(None, feeds)[0]
+        if hidden.ndim == 2:  # pooled by the model
+            return hidden
+        weights = mask[..., None].astype(hidden.dtype)
+        return (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
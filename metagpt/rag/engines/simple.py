@@ -30,6 +30,7 @@ from llama_index.core.schema import (
 )
 
 from metagpt.config2 import config
+from metagpt.rag.embeddings import wrap_embedding
 from metagpt.rag.factories import (
     get_index,
     get_rag_embedding,
@@ -37,9 +38,14 @@ from metagpt.rag.factories import (
     get_rankers,
     get_retriever,
 )
+from metagpt.rag.ingestion import IngestionManifest, IngestionPlan
 from metagpt.rag.interface import NoEmbedding, RAGObject
 from metagpt.rag.parsers import OmniParse
-from metagpt.rag.retrievers.base import ModifiableRAGRetriever, PersistableRAGRetriever
+from metagpt.rag.retrievers.base import (
+    DeletableRAGRetriever,
+    ModifiableRAGRetriever,
+    PersistableRAGRetriever,
+)
 from metagpt.rag.retrievers.hybrid_retriever import SimpleHybridRetriever
 from metagpt.rag.schema import (
     BaseIndexConfig,
@@ -100,7 +106,8 @@ class SimpleEngine(RetrieverQueryEngine):
             transformations: Parse documents to nodes. Default [SentenceSplitter].
             embed_model: Parse nodes to embedding. Must supported by llama index. Default OpenAIEmbedding.
             llm: Must supported by llama index. Default OpenAI.
-            retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
+            retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever,
+                set by a HybridRetrieverConfig among them.
             ranker_configs: Configuration for rankers.
         """
         if not input_dir and not input_files:
@@ -141,7 +148,8 @@ class SimpleEngine(RetrieverQueryEngine):
             transformations: Parse documents to nodes. Default [SentenceSplitter].
             embed_model: Parse nodes to embedding. Must supported by llama index. Default OpenAIEmbedding.
             llm: Must supported by llama index. Default OpenAI.
-            retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
+            retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever,
+                set by a HybridRetrieverConfig among them.
             ranker_configs: Configuration for rankers.
         """
         objs = objs or []
@@ -210,6 +218,63 @@ class SimpleEngine(RetrieverQueryEngine):
         nodes = [ObjectNode(text=obj.rag_key(), metadata=ObjectNode.get_obj_metadata(obj)) for obj in objs]
         self._save_nodes(nodes)
 
+    def delete_nodes(self, node_ids: list[str]):
+        """Delete nodes from retriever. retriever must has delete_nodes func."""
+        self._ensure_retriever_deletable()
+
+        self.retriever.delete_nodes(node_ids)
+
+    def sync_docs(
+        self,
+        persist_dir: Union[str, os.PathLike],
+        input_dir: str = None,
+        input_files: list[str] = None,
+        batch_size: int = 16,
+    ) -> IngestionPlan:
+        """Ingest the new and changed docs incrementally, and remove the nodes of the deleted ones.
+
+        The ingested files are recorded in a manifest in `persist_dir`, and the retriever is persisted there after
+        each batch of `batch_size` files, so an interrupted ingestion resumes from its last batch. Load the engine
+        with `from_index` from `persist_dir` before syncing again.
+
+        Must provide either `input_dir` or `input_files`, retriever must be modifiable, deletable and persistable.
+
+        Returns:
+            The files ingested, removed and unchanged.
+        """
+        if not input_dir and not input_files:
+            raise ValueError("Must provide either `input_dir` or `input_files`.")
+        self._ensure_retriever_modifiable()
+        self._ensure_retriever_persistable()
+        persist_dir = str(persist_dir)
+
+        files = input_files or [str(i) for i in SimpleDirectoryReader(input_dir=input_dir).input_files]
+        manifest = IngestionManifest.load(persist_dir)
+        plan = manifest.plan(files)
+        if plan.stale_node_ids:
+            self.delete_nodes(plan.stale_node_ids)
+        if plan.stale_node_ids or plan.removed:
+            manifest.remove(plan.removed)
+            self._persist(persist_dir)
+            manifest.save()
+
+        file_extractor = self._get_file_extractor()
+        for i in range(0, len(plan.files), batch_size):
+            batch = plan.files[i : i + batch_size]
+            documents = SimpleDirectoryReader(input_files=batch, file_extractor=file_extractor).load_data()
+            self._fix_document_metadata(documents)
+            nodes = run_transformations(documents, transformations=self._transformations)
+
+            node_ids = {key: [] for key in batch}
+            for node in nodes:
+                node_ids[node.metadata["file_path"]].append(node.node_id)
+            manifest.begin(node_ids)
+            self._save_nodes(nodes)
+            self._persist(persist_dir)
+            manifest.commit(batch)
+
+        return plan
+
     def persist(self, persist_dir: Union[str, os.PathLike], **kwargs):
         """Persist."""
         self._ensure_retriever_persistable()
@@ -261,6 +326,9 @@ class SimpleEngine(RetrieverQueryEngine):
     def _ensure_retriever_modifiable(self):
         self._ensure_retriever_of_type(ModifiableRAGRetriever)
 
+    def _ensure_retriever_deletable(self):
+        self._ensure_retriever_of_type(DeletableRAGRetriever)
+
     def _ensure_retriever_persistable(self):
         self._ensure_retriever_of_type(PersistableRAGRetriever)
 
@@ -305,7 +373,7 @@ class SimpleEngine(RetrieverQueryEngine):
         if configs and all(isinstance(c, NoEmbedding) for c in configs):
             return MockEmbedding(embed_dim=1)
 
-        return embed_model or get_rag_embedding()
+        return wrap_embedding(embed_model, config.embedding) if embed_model else get_rag_embedding()
 
     @staticmethod
     def _default_transformations():
@@ -12,6 +12,8 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from metagpt.config2 import config
 from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.configs.llm_config import LLMType
+from metagpt.rag.embeddings.cached import wrap_embedding
+from metagpt.rag.embeddings.local import LocalEmbedding
 from metagpt.rag.factories.base import GenericFactory
 
 
@@ -24,6 +26,7 @@ class RAGEmbeddingFactory(GenericFactory):
             EmbeddingType.AZURE: self._create_azure,
             EmbeddingType.GEMINI: self._create_gemini,
             EmbeddingType.OLLAMA: self._create_ollama,
+            EmbeddingType.LOCAL: self._create_local,
             # For backward compatibility
             LLMType.OPENAI: self._create_openai,
             LLMType.AZURE: self._create_azure,
@@ -31,8 +34,8 @@ class RAGEmbeddingFactory(GenericFactory):
         super().__init__(creators)
 
     def get_rag_embedding(self, key: EmbeddingType = None) -> BaseEmbedding:
-        """Key is EmbeddingType."""
-        return super().get_instance(key or self._resolve_embedding_type())
+        """Key is EmbeddingType. The embedding is wrapped with a cache if `config.embedding.cache` is enabled."""
+        return wrap_embedding(super().get_instance(key or self._resolve_embedding_type()), config.embedding)
 
     def _resolve_embedding_type(self) -> EmbeddingType | LLMType:
         """Resolves the embedding type.
@@ -88,6 +91,13 @@ class RAGEmbeddingFactory(GenericFactory):
 
         return OllamaEmbedding(**params)
 
+    def _create_local(self) -> LocalEmbedding:
+        params = dict(dimensions=config.embedding.dimensions)
+
+        self._try_set_model_and_batch_size(params)
+
+        return LocalEmbedding(**params)
+
     def _try_set_model_and_batch_size(self, params: dict):
         """Set the model_name and embed_batch_size only when they are specified."""
         if config.embedding.model:
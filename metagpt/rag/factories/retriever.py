@@ -27,6 +27,7 @@ from metagpt.rag.schema import (
     ElasticsearchKeywordRetrieverConfig,
     ElasticsearchRetrieverConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
 
 
@@ -62,14 +63,19 @@ class RetrieverFactory(ConfigBasedFactory):
     def get_retriever(self, configs: list[BaseRetrieverConfig] = None, **kwargs) -> RAGRetriever:
         """Creates and returns a retriever instance based on the provided configurations.
 
-        If multiple retrievers, using SimpleHybridRetriever.
+        If multiple retrievers, using SimpleHybridRetriever, which combines their results as set by the
+        `HybridRetrieverConfig` among the configs, if any.
         """
+        hybrid_config = next((i for i in configs or [] if isinstance(i, HybridRetrieverConfig)), None)
+        configs = [i for i in configs or [] if not isinstance(i, HybridRetrieverConfig)]
         if not configs:
             return self._create_default(**kwargs)
 
         retrievers = super().get_instances(configs, **kwargs)
+        if len(retrievers) == 1:
+            return retrievers[0]
 
-        return SimpleHybridRetriever(*retrievers) if len(retrievers) > 1 else retrievers[0]
+        return SimpleHybridRetriever(*retrievers, **(hybrid_config or HybridRetrieverConfig()).model_dump())
 
     def _create_default(self, **kwargs) -> RAGRetriever:
         index = self._extract_index(None, **kwargs) or self._build_default_index(**kwargs)
@@ -116,6 +122,10 @@ class RetrieverFactory(ConfigBasedFactory):
 
     @get_or_build_index
     def _build_faiss_index(self, config: FAISSRetrieverConfig, **kwargs) -> VectorStoreIndex:
+        if not config.dimensions:
+            config.dimensions = getattr(self._extract_embed_model(config, **kwargs), "dimensions", None) or 0
+        if not config.dimensions:
+            raise ValueError("The embedding model does not tell its dimensions, set them in FAISSRetrieverConfig")
         vector_store = FaissVectorStore(faiss_index=faiss.IndexFlatL2(config.dimensions))
 
         return self._build_index_from_vector_store(config, vector_store, **kwargs)
@@ -0,0 +1,127 @@
+"""Manifest of the files ingested into a persisted RAG index.
+
+The manifest records the mtime, size, content hash and node ids of each ingested file, so that ingesting a directory
+again only parses, splits and embeds the new and changed files, and removes the nodes of the deleted ones.
+
+The files are stat-ed and hashed when planned, before they are parsed, so a file changed during the ingestion is seen
+as changed by the next one. It is written ahead: the node ids of a batch of files are recorded as pending before the
+nodes are added, and the batch is marked done once the index is persisted. After a crash, the nodes of the pending
+files are deleted, in case the index was persisted with them, and the files are ingested again.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+INGESTION_MANIFEST_FILENAME = "ingestion_manifest.json"
+
+
+def file_hash(path: Union[str, Path]) -> str:
+    """Return the sha256 of the content of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileRecord(BaseModel):
+    """An ingested file."""
+
+    mtime: float
+    size: int
+    hash: str
+    node_ids: list[str] = Field(default_factory=list)
+    done: bool = False  # False while the nodes may be only partly in the persisted index
+
+
+class IngestionPlan(BaseModel):
+    """The changes between the files on disk and the manifest."""
+
+    files: list[str] = Field(default_factory=list, description="The new or changed files to ingest.")
+    stale_node_ids: list[str] = Field(
+        default_factory=list, description="The nodes of the changed, deleted and pending files to remove first."
+    )
+    removed: list[str] = Field(default_factory=list, description="The files deleted since the last ingestion.")
+    unchanged: list[str] = Field(default_factory=list)
+
+
+class IngestionManifest(BaseModel):
+    """The ingested files by resolved path, saved as json next to the persisted index."""
+
+    files: dict[str, FileRecord] = Field(default_factory=dict)
+
+    _path: Optional[Path] = PrivateAttr(default=None)
+    _planned: dict[str, FileRecord] = PrivateAttr(default_factory=dict)  # the files to ingest, as they were planned
+
+    @classmethod
+    def load(cls, persist_dir: Union[str, Path]) -> "IngestionManifest":
+        """Load the manifest of a persist directory, empty if there is none."""
+        path = Path(persist_dir) / INGESTION_MANIFEST_FILENAME
+        manifest = cls.model_validate_json(path.read_text()) if path.exists() else cls()
+        manifest._path = path
+        return manifest
+
+    def save(self):
+        """Replace the saved manifest atomically, so that a crash leaves the previous one."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(self.model_dump_json())
+        os.replace(tmp, self._path)
+
+    def plan(self, files: list[Union[str, Path]]) -> IngestionPlan:
+        """Compare the files with the manifest, hashing only the files whose mtime or size changed.
+
+        The files to ingest are hashed now, before they are read to be parsed, and recorded so by `begin`.
+        """
+        plan = IngestionPlan()
+        seen = set()
+        self._planned = {}
+        for file in files:
+            key = str(Path(file).resolve())
+            seen.add(key)
+            record = self.files.get(key)
+            stat = os.stat(key)
+            digest = None
+            if record and record.done:
+                if record.mtime == stat.st_mtime and record.size == stat.st_size:
+                    plan.unchanged.append(key)
+                    continue
+                digest = file_hash(key)
+                if record.hash == digest:  # touched only
+                    record.mtime, record.size = stat.st_mtime, stat.st_size
+                    plan.unchanged.append(key)
+                    continue
+            if record:
+                plan.stale_node_ids.extend(record.node_ids)
+            plan.files.append(key)
+            self._planned[key] = FileRecord(mtime=stat.st_mtime, size=stat.st_size, hash=digest or file_hash(key))
+        for key in [i for i in self.files if i not in seen]:
+            plan.stale_node_ids.extend(self.files[key].node_ids)
+            plan.removed.append(key)
+        return plan
+
+    def begin(self, nodes_by_file: dict[str, list[str]]):
+        """Record the node ids of files about to be added, as pending, with the stat and hash taken by `plan`."""
+        for key, node_ids in nodes_by_file.items():
+            record = self._planned.pop(key, None)
+            if record is None:
+                stat = os.stat(key)
+                record = FileRecord(mtime=stat.st_mtime, size=stat.st_size, hash=file_hash(key))
+            record.node_ids = node_ids
+            self.files[key] = record
+        self.save()
+
+    def commit(self, keys: list[str]):
+        """Mark files as ingested, once their nodes are persisted."""
+        for key in keys:
+            self.files[key].done = True
+        self.save()
+
+    def remove(self, keys: list[str]):
+        for key in keys:
+            self.files.pop(key, None)
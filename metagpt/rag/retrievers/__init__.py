@@ -1,5 +1,5 @@
 """Retrievers init."""
 
-from metagpt.rag.retrievers.hybrid_retriever import SimpleHybridRetriever
+from metagpt.rag.retrievers.hybrid_retriever import FusionMode, SimpleHybridRetriever
 
-__all__ = ["SimpleHybridRetriever"]
+__all__ = ["SimpleHybridRetriever", "FusionMode"]
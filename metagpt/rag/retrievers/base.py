@@ -2,6 +2,7 @@
 
 from abc import abstractmethod
 
+from llama_index.core import VectorStoreIndex
 from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.schema import BaseNode, NodeWithScore, QueryType
 
@@ -33,6 +34,20 @@ class ModifiableRAGRetriever(RAGRetriever):
         """To support add docs, must inplement this func"""
 
 
+class DeletableRAGRetriever(RAGRetriever):
+    """Support deletion."""
+
+    @classmethod
+    def __subclasshook__(cls, C):
+        if cls is DeletableRAGRetriever:
+            return check_methods(C, "delete_nodes")
+        return NotImplemented
+
+    @abstractmethod
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """To support delete nodes, must inplement this func"""
+
+
 class PersistableRAGRetriever(RAGRetriever):
     """Support persistent."""
 
@@ -45,3 +60,18 @@ class PersistableRAGRetriever(RAGRetriever):
     @abstractmethod
     def persist(self, persist_dir: str, **kwargs) -> None:
         """To support persist, must inplement this func"""
+
+
+def delete_index_nodes(index: VectorStoreIndex, node_ids: list[str]) -> None:
+    """Remove nodes from the index struct and the docstore of an index.
+
+    LlamaIndex vector indices only delete by ref_doc_id, and not at all for some vector stores. The vectors of the
+    nodes stay in the vector store, but no longer map to a node.
+    """
+    ids = set(node_ids)
+    index_struct = index.index_struct
+    for vector_id in [k for k, v in index_struct.nodes_dict.items() if v in ids]:
+        del index_struct.nodes_dict[vector_id]
+    for node_id in ids:
+        index.docstore.delete_document(node_id, raise_error=False)
+    index.storage_context.index_store.add_index_struct(index_struct)
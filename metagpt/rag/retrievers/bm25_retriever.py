@@ -1,16 +1,205 @@
 """BM25 retriever."""
-from typing import Callable, Optional
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional, Union
 
+import numpy as np
 from llama_index.core import VectorStoreIndex
 from llama_index.core.callbacks.base import CallbackManager
 from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
-from llama_index.core.schema import BaseNode, IndexNode
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, IndexNode, NodeWithScore, QueryBundle
 from llama_index.retrievers.bm25 import BM25Retriever
-from rank_bm25 import BM25Okapi
+from llama_index.retrievers.bm25.base import tokenize_remove_stopwords
+
+from metagpt.logs import logger
+from metagpt.rag.retrievers.base import delete_index_nodes
+
+BM25_PERSIST_FILENAME = "bm25.npz"
+
+
+class IncrementalBM25:
+    """Okapi BM25 over an inverted index that is updated in place, with the same scores as `rank_bm25.BM25Okapi`.
+
+    Each document gets a slot. The postings of a term are growing arrays of (slot, term frequency), and the document
+    frequencies, lengths and the idf are updated on add and delete, so adding a document only costs its own terms.
+    Deleted slots stay in the postings and are masked out of the scores until `compact`.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._term_ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._posting_slots: list[array] = []
+        self._posting_tfs: list[array] = []
+        self._df = array("i")  # the number of live documents of each term
+        self._doc_len = array("i")
+        self._alive = array("b")
+        self._total_len = 0
+        self._num_docs = 0
+        self._idf: Optional[np.ndarray] = None  # computed on demand, reset by any change
+
+    def __len__(self) -> int:
+        return self._num_docs
+
+    @property
+    def num_slots(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, tokens: list[str]) -> int:
+        """Add a tokenized document, return its slot."""
+        slot = len(self._doc_len)
+        for term, tf in Counter(tokens).items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._terms)
+                self._terms.append(term)
+                self._posting_slots.append(array("i"))
+                self._posting_tfs.append(array("i"))
+                self._df.append(0)
+            self._posting_slots[term_id].append(slot)
+            self._posting_tfs[term_id].append(tf)
+            self._df[term_id] += 1
+        self._doc_len.append(len(tokens))
+        self._alive.append(1)
+        self._total_len += len(tokens)
+        self._num_docs += 1
+        self._idf = None
+        return slot
+
+    def delete(self, slot: int, tokens: list[str]):
+        """Delete the document in the slot, `tokens` are the tokens it was added with."""
+        if not self._alive[slot]:
+            return
+        self._alive[slot] = 0
+        for term in set(tokens):
+            term_id = self._term_ids.get(term)
+            if term_id is not None:
+                self._df[term_id] -= 1
+        self._total_len -= self._doc_len[slot]
+        self._num_docs -= 1
+        self._idf = None
+
+    def get_scores(self, query: list[str]) -> np.ndarray:
+        """Return the score of each slot, the deleted slots score -inf."""
+        scores = np.zeros(self.num_slots)
+        if not self._num_docs:
+            scores[:] = -np.inf
+            return scores
+        idf = self._get_idf()
+        doc_len = np.frombuffer(self._doc_len, dtype=np.int32)
+        avgdl = self._total_len / self._num_docs
+        for term in query:
+            term_id = self._term_ids.get(term)
+            if term_id is None or not self._df[term_id]:
+                continue
+            slots = np.frombuffer(self._posting_slots[term_id], dtype=np.int32)
+            tf = np.frombuffer(self._posting_tfs[term_id], dtype=np.int32).astype(np.float64)
+            norm = self.k1 * (1 - self.b + self.b * doc_len[slots] / avgdl)
+            scores[slots] += idf[term_id] * (tf * (self.k1 + 1) / (tf + norm))
+        scores[np.frombuffer(self._alive, dtype=np.int8) == 0] = -np.inf
+        return scores
+
+    def _get_idf(self) -> np.ndarray:
+        if self._idf is None:
+            df = np.frombuffer(self._df, dtype=np.int32).astype(np.float64)
+            present = df > 0
+            idf = np.log(self._num_docs - df + 0.5) - np.log(df + 0.5)
+            idf[~present] = 0
+            average_idf = idf[present].mean() if present.any() else 0.0
+            # the same floor as BM25Okapi for the terms in more than half of the documents
+            idf[present & (idf < 0)] = self.epsilon * average_idf
+            self._idf = idf
+        return self._idf
+
+    def compact(self) -> np.ndarray:
+        """Drop the deleted slots, return the old slot of each new slot."""
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        old_slots = np.flatnonzero(alive)
+        new_slots = np.cumsum(alive, dtype=np.int64) - 1
+        for term_id in range(len(self._terms)):
+            slots = np.frombuffer(self._posting_slots[term_id], dtype=np.int32)
+            keep = alive[slots]
+            self._posting_slots[term_id] = array("i", new_slots[slots[keep]].astype(np.int32).tobytes())
+            self._posting_tfs[term_id] = array(
+                "i", np.frombuffer(self._posting_tfs[term_id], dtype=np.int32)[keep].tobytes()
+            )
+        self._doc_len = array("i", np.frombuffer(self._doc_len, dtype=np.int32)[old_slots].tobytes())
+        self._alive = array("b", b"\x01" * len(old_slots))
+        return old_slots
+
+    def save(self, pathname: Union[str, Path], keys: list[str] = None):
+        """Save the index as an uncompressed `.npz` file, `keys` identify the documents of the slots."""
+        lengths = [len(i) for i in self._posting_slots]
+        arrays = {
+            "params": np.array([self.k1, self.b, self.epsilon]),
+            "posting_offsets": np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]),
+            "posting_slots": np.concatenate([np.frombuffer(i, dtype=np.int32) for i in self._posting_slots] or [[]]),
+            "posting_tfs": np.concatenate([np.frombuffer(i, dtype=np.int32) for i in self._posting_tfs] or [[]]),
+            "df": np.array(self._df, dtype=np.int32),
+            "doc_len": np.array(self._doc_len, dtype=np.int32),
+            "alive": np.array(self._alive, dtype=np.int8),
+        }
+        arrays.update(_encode_strings("terms", self._terms))
+        arrays.update(_encode_strings("keys", keys or []))
+        pathname = Path(pathname)
+        pathname.parent.mkdir(parents=True, exist_ok=True)
+        tmp_pathname = pathname.with_name(pathname.name + ".tmp")
+        with open(tmp_pathname, "wb") as writer:
+            np.savez(writer, **arrays)
+        tmp_pathname.replace(pathname)
+
+    @classmethod
+    def load(cls, pathname: Union[str, Path]) -> tuple["IncrementalBM25", list[str]]:
+        """Load an index saved by `save`, return it with the keys of its slots."""
+        with np.load(pathname) as data:
+            k1, b, epsilon = data["params"].tolist()
+            bm25 = cls(k1=k1, b=b, epsilon=epsilon)
+            bm25._terms = _decode_strings("terms", data)
+            bm25._term_ids = {term: i for i, term in enumerate(bm25._terms)}
+            offsets = data["posting_offsets"].tolist()
+            slots = data["posting_slots"].astype(np.int32)
+            tfs = data["posting_tfs"].astype(np.int32)
+            bm25._posting_slots = [array("i", slots[s:e].tobytes()) for s, e in zip(offsets, offsets[1:])]
+            bm25._posting_tfs = [array("i", tfs[s:e].tobytes()) for s, e in zip(offsets, offsets[1:])]
+            bm25._df = array("i", data["df"].astype(np.int32).tobytes())
+            bm25._doc_len = array("i", data["doc_len"].astype(np.int32).tobytes())
+            bm25._alive = array("b", data["alive"].astype(np.int8).tobytes())
+            alive = data["alive"].astype(bool)
+            bm25._total_len = int(data["doc_len"][alive].sum())
+            bm25._num_docs = int(alive.sum())
+            keys = _decode_strings("keys", data)
+        return bm25, keys
+
+
+def _encode_strings(name: str, values: list[str]) -> dict[str, np.ndarray]:
+    encoded = [i.encode("utf-8") for i in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(i) for i in encoded], out=offsets[1:])
+    return {name: np.frombuffer(b"".join(encoded), dtype=np.uint8), f"{name}_offsets": offsets}
+
+
+def _decode_strings(name: str, data) -> list[str]:
+    raw = data[name].tobytes()
+    offsets = data[f"{name}_offsets"].tolist()
+    return [raw[s:e].decode("utf-8") for s, e in zip(offsets, offsets[1:])]
+
+
+def _node_key(node: BaseNode) -> str:
+    """The key of a node in the persisted index, its content hash is included so that an edited node is not matched"""
+    return f"{node.node_id}\n{node.hash}"
 
 
 class DynamicBM25Retriever(BM25Retriever):
-    """BM25 retriever."""
+    """BM25 retriever.
+
+    The corpus is kept in an `IncrementalBM25` index instead of a `BM25Okapi` rebuilt on every change, so adding
+    nodes only tokenizes the new ones. `persist` saves the index next to the vector index, and a retriever created
+    with the same `persist_path` and nodes loads it instead of tokenizing the corpus again.
+    """
 
     def __init__(
         self,
@@ -22,28 +211,82 @@ class DynamicBM25Retriever(BM25Retriever):
         object_map: Optional[dict] = None,
         verbose: bool = False,
         index: VectorStoreIndex = None,
+        persist_path: Optional[Union[str, Path]] = None,
     ) -> None:
-        super().__init__(
-            nodes=nodes,
-            tokenizer=tokenizer,
-            similarity_top_k=similarity_top_k,
-            callback_manager=callback_manager,
-            object_map=object_map,
-            objects=objects,
-            verbose=verbose,
+        # BM25Retriever.__init__ would build a BM25Okapi over the corpus
+        BaseRetriever.__init__(
+            self, callback_manager=callback_manager, object_map=object_map, objects=objects, verbose=verbose
         )
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
         self._index = index
+        self._nodes: list[BaseNode] = []  # by slot, the deleted nodes stay until compacted
+        self._slots: dict[str, int] = {}
+        self.bm25 = IncrementalBM25()
+        if not (persist_path and self._load(Path(persist_path) / BM25_PERSIST_FILENAME, nodes)):
+            self._add(nodes)
 
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
         """Support add nodes."""
-        self._nodes.extend(nodes)
-        self._corpus = [self._tokenizer(node.get_content()) for node in self._nodes]
-        self.bm25 = BM25Okapi(self._corpus)
+        self._add(nodes)
 
         if self._index:
             self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Delete nodes by id, the index is compacted once half of its slots are deleted."""
+        for node_id in node_ids:
+            slot = self._slots.pop(node_id, None)
+            if slot is not None:
+                self.bm25.delete(slot, self._tokenizer(self._nodes[slot].get_content()))
+        if self.bm25.num_slots > 2 * len(self.bm25):
+            self._compact()
+
+        if self._index:
+            delete_index_nodes(self._index, node_ids)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
         if self._index:
             self._index.storage_context.persist(persist_dir)
+        if self.bm25.num_slots > len(self.bm25):
+            self._compact()
+        self.bm25.save(Path(persist_dir) / BM25_PERSIST_FILENAME, keys=[_node_key(i) for i in self._nodes])
+
+    def _add(self, nodes: list[BaseNode]):
+        for node in nodes:
+            old_slot = self._slots.get(node.node_id)
+            if old_slot is not None:  # replace the node
+                self.bm25.delete(old_slot, self._tokenizer(self._nodes[old_slot].get_content()))
+            self._slots[node.node_id] = self.bm25.add(self._tokenizer(node.get_content()))
+            self._nodes.append(node)
+
+    def _compact(self):
+        self._nodes = [self._nodes[i] for i in self.bm25.compact().tolist()]
+        self._slots = {node.node_id: i for i, node in enumerate(self._nodes)}
+
+    def _load(self, pathname: Path, nodes: list[BaseNode]) -> bool:
+        if not pathname.exists():
+            return False
+        bm25, keys = IncrementalBM25.load(pathname)
+        if keys != [_node_key(i) for i in nodes]:
+            logger.warning(f"{pathname} does not match the nodes, rebuild it")
+            return False
+        self.bm25 = bm25
+        self._nodes = list(nodes)
+        self._slots = {node.node_id: i for i, node in enumerate(self._nodes)}
+        return True
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.custom_embedding_strs or query_bundle.embedding:
+            logger.warning("BM25Retriever does not support embeddings, skipping...")
+
+        scores = self.bm25.get_scores(self._tokenizer(query_bundle.query_str))
+        top_k = min(self._similarity_top_k, len(self.bm25))
+        if top_k <= 0:
+            return []
+        # the top k in a stable order, as sorting all the scored nodes does
+        threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        candidates = np.flatnonzero(scores >= threshold)
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+        return [NodeWithScore(node=self._nodes[i], score=float(scores[i])) for i in ranked.tolist()]
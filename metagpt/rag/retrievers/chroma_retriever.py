@@ -11,6 +11,11 @@ class ChromaRetriever(VectorIndexRetriever):
         """Support add nodes."""
         self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support delete nodes."""
+        if node_ids:
+            self._vector_store.client.delete(ids=list(node_ids))
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist.
 
@@ -1,16 +1,67 @@
 """FAISS retriever."""
 
+import faiss
+import numpy as np
 from llama_index.core.retrievers import VectorIndexRetriever
-from llama_index.core.schema import BaseNode
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryResult
+
+from metagpt.rag.retrievers.base import delete_index_nodes
 
 
 class FAISSRetriever(VectorIndexRetriever):
-    """FAISS retriever."""
+    """FAISS retriever.
+
+    FAISS can not delete vectors without renumbering the rest, so the vectors of deleted nodes stay in the FAISS index
+    and are skipped when querying, which asks for as many more results as there are deleted vectors. A flat index is
+    rebuilt from the live vectors once half of its vectors are deleted.
+    """
 
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
         """Support add nodes."""
         self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support delete nodes."""
+        delete_index_nodes(self._index, node_ids)
+        num_deleted = self._num_deleted()
+        if num_deleted and 2 * num_deleted >= self._vector_store.client.ntotal:
+            self._compact()
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
         self._index.storage_context.persist(persist_dir)
+
+    def _build_vector_store_query(self, query_bundle_with_embeddings: QueryBundle) -> VectorStoreQuery:
+        query = super()._build_vector_store_query(query_bundle_with_embeddings)
+        query.similarity_top_k += self._num_deleted()
+        return query
+
+    def _build_node_list_from_query_result(self, query_result: VectorStoreQueryResult) -> list[NodeWithScore]:
+        if self._num_deleted() and query_result.nodes is None and query_result.ids is not None:
+            nodes_dict = self._index.index_struct.nodes_dict
+            similarities = query_result.similarities or [None] * len(query_result.ids)
+            kept = [(i, s) for i, s in zip(query_result.ids, similarities) if i in nodes_dict]
+            kept = kept[: self._similarity_top_k]
+            query_result = VectorStoreQueryResult(
+                ids=[i for i, _ in kept],
+                similarities=[s for _, s in kept] if query_result.similarities is not None else None,
+            )
+        return super()._build_node_list_from_query_result(query_result)
+
+    def _compact(self):
+        """Rebuild the FAISS index from the vectors of the live nodes, renumbering them in order."""
+        faiss_index = self._vector_store.client
+        if not isinstance(faiss_index, faiss.IndexFlat):  # other indices may not reconstruct their vectors
+            return
+        index_struct = self._index.index_struct
+        live = sorted(index_struct.nodes_dict.items(), key=lambda i: int(i[0]))
+        vectors = faiss_index.reconstruct_n(0, faiss_index.ntotal)[[int(i) for i, _ in live]]
+        faiss_index.reset()
+        if len(vectors):
+            faiss_index.add(np.ascontiguousarray(vectors))
+        index_struct.nodes_dict = {str(i): node_id for i, (_, node_id) in enumerate(live)}
+        self._index.storage_context.index_store.add_index_struct(index_struct)
+
+    def _num_deleted(self) -> int:
+        return max(self._vector_store.client.ntotal - len(self._index.index_struct.nodes_dict), 0)
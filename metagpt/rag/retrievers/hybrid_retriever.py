@@ -1,47 +1,120 @@
 """Hybrid retriever."""
 
+import asyncio
 import copy
+from enum import Enum
+from typing import Optional
 
-from llama_index.core.schema import BaseNode, QueryType
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryType
 
-from metagpt.rag.retrievers.base import RAGRetriever
+from metagpt.logs import logger
+from metagpt.rag.retrievers.base import DeletableRAGRetriever, RAGRetriever
+
+
+class FusionMode(str, Enum):
+    """How SimpleHybridRetriever combines the results of its retrievers."""
+
+    CONCAT = "concat"  # in the order of the retrievers, the first occurrence of a node wins
+    RECIPROCAL_RANK = "reciprocal_rank"  # sum of weight / (rrf_k + rank) over the retrievers
+    WEIGHTED_SCORE = "weighted_score"  # sum of weight * min-max normalized score over the retrievers
 
 
 class SimpleHybridRetriever(RAGRetriever):
-    """A composite retriever that aggregates search results from multiple retrievers."""
+    """A composite retriever that aggregates search results from multiple retrievers.
 
-    def __init__(self, *retrievers):
+    The retrievers are queried concurrently, so the latency of a query is the latency of the slowest retriever.
+
+    Args:
+        retrievers: The retrievers to query.
+        mode: How to combine the results, see `FusionMode`.
+        weights: The weight of each retriever in the score fusion, defaults to 1 for each.
+        timeout: The seconds to wait for each retriever, a retriever timing out contributes no results.
+        rrf_k: The rank constant of reciprocal-rank fusion.
+    """
+
+    def __init__(
+        self,
+        *retrievers,
+        mode: FusionMode = FusionMode.CONCAT,
+        weights: Optional[list[float]] = None,
+        timeout: Optional[float] = None,
+        rrf_k: int = 60,
+    ):
         self.retrievers: list[RAGRetriever] = retrievers
+        self.mode = FusionMode(mode)
+        self.weights = list(weights) if weights else [1.0] * len(retrievers)
+        if len(self.weights) != len(retrievers):
+            raise ValueError(f"Expect {len(retrievers)} weights, got {len(self.weights)}")
+        self.timeout = timeout
+        self.rrf_k = rrf_k
         super().__init__()
 
     async def _aretrieve(self, query: QueryType, **kwargs):
         """Asynchronously retrieves and aggregates search results from all configured retrievers.
 
-        This method queries each retriever in the `retrievers` list with the given query and
-        additional keyword arguments. It then combines the results, ensuring that each node is
+        This method queries all the retrievers in the `retrievers` list concurrently with the given query and
+        additional keyword arguments. It then combines the results according to `mode`, ensuring that each node is
         unique, based on the node's ID.
         """
-        all_nodes = []
-        for retriever in self.retrievers:
-            # Prevent retriever changing query
-            query_copy = copy.deepcopy(query)
-            nodes = await retriever.aretrieve(query_copy, **kwargs)
-            all_nodes.extend(nodes)
+        results = await asyncio.gather(*[self._retrieve_one(r, query, **kwargs) for r in self.retrievers])
+        if self.mode == FusionMode.RECIPROCAL_RANK:
+            return self._fuse(results, self._reciprocal_rank_scores)
+        if self.mode == FusionMode.WEIGHTED_SCORE:
+            return self._fuse(results, self._normalized_scores)
 
         # combine all nodes
         result = []
         node_ids = set()
-        for n in all_nodes:
+        for n in (n for nodes in results for n in nodes):
             if n.node.node_id not in node_ids:
                 result.append(n)
                 node_ids.add(n.node.node_id)
         return result
 
+    async def _retrieve_one(self, retriever: RAGRetriever, query: QueryType, **kwargs) -> list[NodeWithScore]:
+        # Prevent retriever changing query, the retrievers replace the attributes of a query bundle, never mutate them
+        query_copy = copy.copy(query)
+        try:
+            return await asyncio.wait_for(retriever.aretrieve(query_copy, **kwargs), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{type(retriever).__name__} timed out after {self.timeout}s, skip its results")
+            return []
+
+    def _fuse(self, results: list[list[NodeWithScore]], score_func) -> list[NodeWithScore]:
+        nodes: dict[str, BaseNode] = {}
+        scores: dict[str, float] = {}
+        for nodes_with_score, weight in zip(results, self.weights):
+            for n, score in zip(nodes_with_score, score_func(nodes_with_score)):
+                node_id = n.node.node_id
+                nodes.setdefault(node_id, n.node)
+                scores[node_id] = scores.get(node_id, 0.0) + weight * score
+        ranked = sorted(scores, key=scores.get, reverse=True)  # stable, ties keep the order of the retrievers
+        return [NodeWithScore(node=nodes[i], score=scores[i]) for i in ranked]
+
+    def _reciprocal_rank_scores(self, nodes: list[NodeWithScore]) -> list[float]:
+        return [1.0 / (self.rrf_k + rank) for rank in range(1, len(nodes) + 1)]
+
+    @staticmethod
+    def _normalized_scores(nodes: list[NodeWithScore]) -> list[float]:
+        scores = [n.score or 0.0 for n in nodes]
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        return [(i - low) / (high - low) for i in scores]
+
     def add_nodes(self, nodes: list[BaseNode]) -> None:
         """Support add nodes."""
         for r in self.retrievers:
             r.add_nodes(nodes)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support delete nodes, from the retrievers that support it."""
+        for r in self.retrievers:
+            if isinstance(r, DeletableRAGRetriever):
+                r.delete_nodes(node_ids, **kwargs)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
         for r in self.retrievers:
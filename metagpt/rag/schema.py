@@ -14,6 +14,7 @@ from metagpt.config2 import config
 from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.logs import logger
 from metagpt.rag.interface import RAGObject
+from metagpt.rag.retrievers.hybrid_retriever import FusionMode
 
 
 class BaseRetrieverConfig(BaseModel):
@@ -44,7 +45,8 @@ class FAISSRetrieverConfig(IndexRetrieverConfig):
 
     @model_validator(mode="after")
     def check_dimensions(self):
-        if self.dimensions == 0:
+        # the local embedding knows its dimensions, RetrieverFactory reads them from the embedding instance
+        if self.dimensions == 0 and config.embedding.api_type != EmbeddingType.LOCAL:
             self.dimensions = config.embedding.dimensions or self._embedding_type_to_dimensions.get(
                 config.embedding.api_type, 1536
             )
@@ -59,6 +61,10 @@ class FAISSRetrieverConfig(IndexRetrieverConfig):
 class BM25RetrieverConfig(IndexRetrieverConfig):
     """Config for BM25-based retrievers."""
 
+    persist_path: Optional[Union[str, Path]] = Field(
+        default=None, description="The directory of the persisted BM25 index to load, rebuilt if it does not match."
+    )
+
     _no_embedding: bool = PrivateAttr(default=True)
 
 
@@ -101,6 +107,22 @@ class ElasticsearchKeywordRetrieverConfig(ElasticsearchRetrieverConfig):
     )
 
 
+class HybridRetrieverConfig(BaseModel):
+    """Config for combining the results of several retrievers, see SimpleHybridRetriever.
+
+    Pass it along with the retriever configs, it applies when there is more than one retriever.
+    """
+
+    mode: FusionMode = Field(default=FusionMode.CONCAT, description="How to combine the results of the retrievers.")
+    weights: Optional[list[float]] = Field(
+        default=None, description="The weight of each retriever in the order of their configs, defaults to 1 for each."
+    )
+    timeout: Optional[float] = Field(default=None, description="The seconds to wait for each retriever.")
+    rrf_k: int = Field(default=60, description="The rank constant of reciprocal-rank fusion.")
+
+    _no_embedding: bool = PrivateAttr(default=True)
+
+
 class BaseRankerConfig(BaseModel):
     """Common config for rankers.
 
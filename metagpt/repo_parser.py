@@ -12,14 +12,18 @@ This script is designed to create a symbols repository from the provided source
 from __future__ import annotations
 
 import ast
+import hashlib
 import json
+import os
 import re
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 from metagpt.const import AGGREGATION, COMPOSITION, GENERALIZATION
 from metagpt.logs import logger
@@ -27,6 +31,10 @@ from metagpt.utils.common import any_to_str, aread, remove_white_spaces
 from metagpt.utils.exceptions import handle_exception
 
 
+# Starting the worker processes costs more than parsing a few files
+PARALLEL_PARSE_MIN_FILES = 32
+
+
 class RepoFileInfo(BaseModel):
     """
     Repository data element that represents information about a file.
@@ -419,15 +427,98 @@ class DotClassMethod(BaseModel):
         return attrs
 
 
+class RepoFileCacheItem(BaseModel):
+    """
+    Cached symbols of a file, valid as long as the file content is unchanged.
+
+    Attributes:
+        mtime_ns (int): The modification time of the file when it was parsed.
+        size (int): The size of the file when it was parsed.
+        digest (str): The sha256 of the file content, checked when only the modification time changed.
+        info (RepoFileInfo): The symbols of the file.
+    """
+
+    mtime_ns: int
+    size: int
+    digest: str
+    info: RepoFileInfo
+
+    @field_validator("info", mode="after")
+    @classmethod
+    def load_page_info(cls, info: RepoFileInfo) -> RepoFileInfo:
+        """`RepoFileInfo.page_info` is untyped, restores its `CodeBlockInfo` items loaded from json."""
+        info.page_info = [CodeBlockInfo.model_validate(i) if isinstance(i, dict) else i for i in info.page_info]
+        return info
+
+
+class ClassViewCache(BaseModel):
+    """
+    Cached result of `RepoParser.rebuild_class_views`, valid as long as no Python file of the directory is changed.
+
+    Attributes:
+        signature (str): The hash of the paths, sizes and modification times of all the Python files.
+        class_views (List[DotClassInfo]): The parsed classes.
+        relationship_views (List[DotClassRelationship]): The parsed class relationships.
+        package_root (str): The package root returned by `RepoParser._repair_namespaces`.
+    """
+
+    signature: str
+    class_views: List[DotClassInfo] = Field(default_factory=list)
+    relationship_views: List[DotClassRelationship] = Field(default_factory=list)
+    package_root: str = ""
+
+
+class RepoSymbolCache(BaseModel):
+    """
+    Persistent parsing results of a repository, see `RepoParser.cache_path`.
+
+    Attributes:
+        files (Dict[str, RepoFileCacheItem]): The cached symbols by file path relative to the base directory.
+        class_views (Dict[str, ClassViewCache]): The cached class views by the directory path.
+    """
+
+    files: Dict[str, RepoFileCacheItem] = Field(default_factory=dict)
+    class_views: Dict[str, ClassViewCache] = Field(default_factory=dict)
+
+
 class RepoParser(BaseModel):
     """
     Tool to build a symbols repository from a project directory.
 
     Attributes:
         base_directory (Path): The base directory of the project.
+        cache_path (Optional[Path]): The file to persist the parsing results in. If set, only the files changed since
+            the last run are parsed again.
+        max_workers (int): The number of processes to parse files in parallel, files are parsed in the current
+            process if less than 2.
+        autosave_cache (bool): Whether `generate_symbols` and `rebuild_class_views` save the cache. Set it to False
+            to call `save_cache` once the results are stored elsewhere, e.g. in a graph repository.
     """
 
     base_directory: Path = Field(default=None)
+    cache_path: Optional[Path] = None
+    max_workers: int = 0
+    autosave_cache: bool = True
+
+    _cache: Optional[RepoSymbolCache] = PrivateAttr(default=None)
+    _changed_files: List[str] = PrivateAttr(default_factory=list)
+    _removed_files: List[str] = PrivateAttr(default_factory=list)
+    _class_views_changed: bool = PrivateAttr(default=True)
+
+    @property
+    def changed_files(self) -> List[str]:
+        """Files added or modified since the cached run, relative to the base directory, set by `generate_symbols`."""
+        return self._changed_files
+
+    @property
+    def removed_files(self) -> List[str]:
+        """Files removed since the cached run, relative to the base directory, set by `generate_symbols`."""
+        return self._removed_files
+
+    @property
+    def class_views_changed(self) -> bool:
+        """False if the last `rebuild_class_views` returned the cached result."""
+        return self._class_views_changed
 
     @classmethod
     @handle_exception(exception_type=Exception, default_return=[])
@@ -443,6 +534,20 @@ class RepoParser(BaseModel):
         """
         return ast.parse(file_path.read_text()).body
 
+    @classmethod
+    @handle_exception(exception_type=Exception, default_return=[])
+    def _parse_code(cls, code: str) -> list:
+        """
+        Parses the source code of a Python file.
+
+        Args:
+            code (str): The source code to be parsed.
+
+        Returns:
+            list: A list containing the parsed symbols from the code.
+        """
+        return ast.parse(code).body
+
     def extract_class_and_function_info(self, tree, file_path) -> RepoFileInfo:
         """
         Extracts class, function, and global variable information from the Abstract Syntax Tree (AST).
@@ -484,13 +589,91 @@ class RepoParser(BaseModel):
         extensions = ["*.py"]
         for ext in extensions:
             matching_files += directory.rglob(ext)
-        for path in matching_files:
-            tree = self._parse_file(path)
-            file_info = self.extract_class_and_function_info(tree, path)
-            files_classes.append(file_info)
 
+        cache = self._load_cache()
+        cached_files = cache.files
+        cache.files = {}
+        items = {}
+        for path in matching_files:
+            filename = str(path.relative_to(directory))
+            items[filename] = self._get_cached_file(path, cached_files.get(filename))
+        self._changed_files = [k for k, v in items.items() if v is None]
+        parsed = self._parse_files([directory / i for i in self._changed_files])
+        for filename, item in zip(self._changed_files, parsed):
+            items[filename] = item
+        for filename, item in items.items():
+            cache.files[filename] = item
+            # callers may modify the returned objects, e.g. `RebuildClassView` aligns `file` to another root
+            files_classes.append(item.info.model_copy(deep=True))
+        self._removed_files = [i for i in cached_files if i not in cache.files]
+
+        if self.autosave_cache and (self._changed_files or self._removed_files):
+            self.save_cache()
         return files_classes
 
+    def _parse_files(self, paths: List[Path]) -> List[RepoFileCacheItem]:
+        """Parses the files in order, spreads them over `max_workers` processes if there are enough of them."""
+        parse = partial(type(self)._parse_file_item, self.base_directory)
+        if self.max_workers < 2 or len(paths) < PARALLEL_PARSE_MIN_FILES:
+            return [parse(i) for i in paths]
+        chunksize = max(1, len(paths) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(parse, paths, chunksize=chunksize))
+
+    @classmethod
+    def _parse_file_item(cls, base_directory: Path, path: Path) -> RepoFileCacheItem:
+        """Parses a file into a cache item, runs in the worker processes and so takes no `RepoParser` state."""
+        code = cls._read_code(path)
+        stat = path.stat()
+        tree = cls._parse_code(code) if code is not None else []
+        return RepoFileCacheItem(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=hashlib.sha256((code or "").encode("utf-8")).hexdigest(),
+            info=cls(base_directory=base_directory).extract_class_and_function_info(tree, path),
+        )
+
+    @staticmethod
+    @handle_exception(exception_type=Exception, default_return=None)
+    def _read_code(path: Path) -> str | None:
+        return path.read_text()
+
+    def _get_cached_file(self, path: Path, item: Optional[RepoFileCacheItem]) -> Optional[RepoFileCacheItem]:
+        """Returns the cached item if the file is unchanged. The content is hashed only if the modification time
+        changed, e.g. after a git checkout."""
+        if not item:
+            return None
+        stat = path.stat()
+        if item.mtime_ns == stat.st_mtime_ns and item.size == stat.st_size:
+            return item
+        if item.size != stat.st_size:
+            return None
+        code = self._read_code(path)
+        if code is None or hashlib.sha256(code.encode("utf-8")).hexdigest() != item.digest:
+            return None
+        item.mtime_ns = stat.st_mtime_ns
+        return item
+
+    def _load_cache(self) -> RepoSymbolCache:
+        if self._cache is None:
+            self._cache = RepoSymbolCache()
+            if self.cache_path and Path(self.cache_path).exists():
+                try:
+                    self._cache = RepoSymbolCache.model_validate_json(Path(self.cache_path).read_text(encoding="utf-8"))
+                except ValueError as e:
+                    logger.warning(f"Ignore the invalid symbol cache {self.cache_path}: {e}")
+        return self._cache
+
+    def save_cache(self):
+        """Replaces the saved cache atomically with the parsing results so far."""
+        if not self.cache_path or self._cache is None:
+            return
+        cache_path = Path(self.cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        tmp.write_text(self._cache.model_dump_json(), encoding="utf-8")
+        os.replace(tmp, cache_path)
+
     def generate_json_structure(self, output_path: Path):
         """
         Generates a JSON file documenting the repository structure.
@@ -725,6 +908,16 @@ class RepoParser(BaseModel):
         init_file = path / "__init__.py"
         if not init_file.exists():
             raise ValueError("Failed to import module __init__ with error:No module named __init__.")
+        # pyreverse resolves the classes across modules, so it runs over the whole directory, or not at all if no
+        # Python file is changed since the cached run.
+        cache = self._load_cache()
+        signature = self._get_class_views_signature(path)
+        cached = cache.class_views.get(str(path.resolve()))
+        if cached and cached.signature == signature:
+            self._class_views_changed = False
+            return cached.class_views, cached.relationship_views, cached.package_root
+        self._class_views_changed = True
+
         command = f"pyreverse {str(path)} -o dot"
         output_dir = path / "__dot__"
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -740,8 +933,25 @@ class RepoParser(BaseModel):
         )
         class_view_pathname.unlink(missing_ok=True)
         packages_pathname.unlink(missing_ok=True)
+        cache.class_views[str(path.resolve())] = ClassViewCache(
+            signature=signature,
+            class_views=class_views,
+            relationship_views=relationship_views,
+            package_root=package_root,
+        )
+        if self.autosave_cache:
+            self.save_cache()
         return class_views, relationship_views, package_root
 
+    @staticmethod
+    def _get_class_views_signature(path: Path) -> str:
+        """Returns the hash of the paths, sizes and modification times of the Python files in the directory."""
+        items = []
+        for i in sorted(path.rglob("*.py")):
+            stat = i.stat()
+            items.append(f"{i.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()
+
     @staticmethod
     async def _parse_classes(class_view_pathname: Path) -> List[DotClassInfo]:
         """
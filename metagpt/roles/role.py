@@ -23,7 +23,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import TYPE_CHECKING, Iterable, Optional, Set, Type, Union
+from typing import TYPE_CHECKING, ClassVar, Iterable, Optional, Set, Type, Union
 
 from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
 
@@ -153,6 +153,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     # builtin variables
     recovered: bool = False  # to tag if a recovered role
     latest_observed_msg: Optional[Message] = None  # record the latest observed message when interrupted
+    # If true, an event-driven `Environment` runs the role in every round instead of waking it up by `is_interested`
+    run_every_round: ClassVar[bool] = False
 
     __hash__ = object.__hash__  # support Role as hashable type in `Environment.members`
 
@@ -426,13 +428,12 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             news = [self.latest_observed_msg] if self.latest_observed_msg else []
         if not news:
             news = self.rc.msg_buffer.pop_all()
+        # Messages already in memory have been processed before.
+        unseen = news if ignore_memory else [n for n in news if not self.rc.memory.contains(n)]
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if self.is_interested(n)]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
         # Design Rules:
@@ -443,6 +444,14 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             logger.debug(f"{self._setting} observed: {news_text}")
         return len(self.rc.news)
 
+    def is_interested(self, message: Message) -> bool:
+        """Return True if the message is of interest to the role and will be observed as news.
+
+        Roles overriding the news filter of `_observe` override this too, an event-driven `Environment` wakes a role up
+        by it.
+        """
+        return message.cause_by in self.rc.watch or self.name in message.send_to
+
     def publish_message(self, msg):
         """If the role belongs to env, then the role's messages will be broadcast to env"""
         if not msg:
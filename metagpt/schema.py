@@ -15,12 +15,13 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
 import os.path
+import sys
 import uuid
 from abc import ABC
-from asyncio import Queue, QueueEmpty, wait_for
+from asyncio import Queue, QueueEmpty
+from functools import lru_cache
 from json import JSONDecodeError
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
@@ -186,7 +187,11 @@ class Documents(BaseModel):
 
 
 class Message(BaseModel):
-    """list[<role>: <content>]"""
+    """list[<role>: <content>]
+
+    The routing fields repeat across large histories, so `role`, `cause_by`, `sent_from` and the addresses in
+    `send_to` are interned strings.
+    """
 
     id: str = Field(default="", validate_default=True)  # According to Section 2.2.3.1.1 of RFC 135
     content: str
@@ -207,12 +212,10 @@ class Message(BaseModel):
         if ic and isinstance(ic, dict) and "class" in ic:
             if "mapping" in ic:
                 # compatible with custom-defined ActionOutput
-                mapping = actionoutput_str_to_mapping(ic["mapping"])
-                actionnode_class = import_class("ActionNode", "metagpt.actions.action_node")  # avoid circular import
-                ic_obj = actionnode_class.create_model_class(class_name=ic["class"], mapping=mapping)
+                ic_obj = _load_instruct_content_class(ic["class"], mapping=tuple(ic["mapping"].items()))
             elif "module" in ic:
                 # subclasses of BaseModel
-                ic_obj = import_class(ic["class"], ic["module"])
+                ic_obj = _load_instruct_content_class(ic["class"], module=ic["module"])
             else:
                 raise KeyError("missing required key to init Message.instruct_content from dict")
             ic = ic_obj(**ic["value"])
@@ -233,6 +236,16 @@ class Message(BaseModel):
     def check_send_to(cls, send_to: Any) -> set:
         return any_to_str_set(send_to if send_to else {MESSAGE_ROUTE_TO_ALL})
 
+    @field_validator("role", "cause_by", "sent_from", mode="after")
+    @classmethod
+    def intern_str(cls, val: str) -> str:
+        return sys.intern(val)
+
+    @field_validator("send_to", mode="after")
+    @classmethod
+    def intern_send_to(cls, send_to: set) -> set:
+        return {sys.intern(i) for i in send_to}
+
     @field_serializer("send_to", mode="plain")
     def ser_send_to(self, send_to: set) -> list:
         return list(send_to)
@@ -241,18 +254,11 @@ class Message(BaseModel):
     def ser_instruct_content(self, ic: BaseModel) -> Union[dict, None]:
         ic_dict = None
         if ic:
-            # compatible with custom-defined ActionOutput
-            schema = ic.model_json_schema()
-            ic_type = str(type(ic))
-            if "<class 'metagpt.actions.action_node" in ic_type:
-                # instruct_content from AutoNode.create_model_class, for now, it's single level structure.
-                mapping = actionoutout_schema_to_mapping(schema)
-                mapping = actionoutput_mapping_to_str(mapping)
-
-                ic_dict = {"class": schema["title"], "mapping": mapping, "value": ic.model_dump()}
+            class_name, mapping, module = _dump_instruct_content_class(type(ic))
+            if mapping is not None:
+                ic_dict = {"class": class_name, "mapping": dict(mapping), "value": ic.model_dump()}
             else:
-                # due to instruct_content can be assigned by subclasses of BaseModel
-                ic_dict = {"class": schema["title"], "module": ic.__module__, "value": ic.model_dump()}
+                ic_dict = {"class": class_name, "module": module, "value": ic.model_dump()}
         return ic_dict
 
     def __init__(self, content: str = "", **data: Any):
@@ -262,11 +268,11 @@ class Message(BaseModel):
     def __setattr__(self, key, val):
         """Override `@property.setter`, convert non-string parameters into string parameters."""
         if key == MESSAGE_ROUTE_CAUSE_BY:
-            new_val = any_to_str(val)
+            new_val = sys.intern(any_to_str(val))
         elif key == MESSAGE_ROUTE_FROM:
-            new_val = any_to_str(val)
+            new_val = sys.intern(any_to_str(val))
         elif key == MESSAGE_ROUTE_TO:
-            new_val = any_to_str_set(val)
+            new_val = {sys.intern(i) for i in any_to_str_set(val)}
         else:
             new_val = val
         super().__setattr__(key, new_val)
@@ -311,6 +317,31 @@ class Message(BaseModel):
         return None
 
 
+@lru_cache(maxsize=256)
+def _dump_instruct_content_class(ic_class: Type[BaseModel]) -> tuple:
+    """Return the (class name, mapping items, module) identifying the class of `Message.instruct_content`, so that
+    its json schema is only built once."""
+    # compatible with custom-defined ActionOutput
+    schema = ic_class.model_json_schema()
+    if "<class 'metagpt.actions.action_node" in str(ic_class):
+        # instruct_content from AutoNode.create_model_class, for now, it's single level structure.
+        mapping = actionoutout_schema_to_mapping(schema)
+        mapping = actionoutput_mapping_to_str(mapping)
+        return schema["title"], tuple(mapping.items()), None
+    # due to instruct_content can be assigned by subclasses of BaseModel
+    return schema["title"], None, ic_class.__module__
+
+
+@lru_cache(maxsize=256)
+def _load_instruct_content_class(class_name: str, mapping: tuple = None, module: str = None) -> Type[BaseModel]:
+    """Return the class of a dumped `Message.instruct_content`, `mapping` is the items of its mapping."""
+    if module:
+        return import_class(class_name, module)
+    mapping = actionoutput_str_to_mapping(dict(mapping))
+    actionnode_class = import_class("ActionNode", "metagpt.actions.action_node")  # avoid circular import
+    return actionnode_class.create_model_class(class_name=class_name, mapping=mapping)
+
+
 class UserMessage(Message):
     """便于支持OpenAI的消息
     Facilitate support for OpenAI messages
@@ -567,27 +598,22 @@ class MessageQueue(BaseModel):
         """Return true if the queue is empty."""
         return self._queue.empty()
 
+    def snapshot(self) -> List[Message]:
+        """Return the queued messages in order, the queue is drained and refilled with them without waiting."""
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except QueueEmpty:
+                break
+            self._queue.task_done()
+        for i in items:
+            self._queue.put_nowait(i)
+        return [i for i in items if i is not None]
+
     async def dump(self) -> str:
         """Convert the `MessageQueue` object to a json string."""
-        if self.empty():
-            return "[]"
-
-        lst = []
-        msgs = []
-        try:
-            while True:
-                item = await wait_for(self._queue.get(), timeout=1.0)
-                if item is None:
-                    break
-                msgs.append(item)
-                lst.append(item.dump())
-                self._queue.task_done()
-        except asyncio.TimeoutError:
-            logger.debug("Queue is empty, exiting...")
-        finally:
-            for m in msgs:
-                self._queue.put_nowait(m)
-        return json.dumps(lst, ensure_ascii=False)
+        return json.dumps([i.dump() for i in self.snapshot()], ensure_ascii=False)
 
     @staticmethod
     def load(data) -> "MessageQueue":
@@ -8,11 +8,14 @@
         Section 2.2.3.3 of RFC 135.
 """
 
+import hashlib
+import json
+import os
 import warnings
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from metagpt.actions import UserRequirement
 from metagpt.const import MESSAGE_ROUTE_TO_ALL, SERDESER_PATH
@@ -28,6 +31,8 @@ from metagpt.utils.common import (
     write_json_file,
 )
 
+MEMORY_JOURNAL_DIR = "memory"
+
 
 class Team(BaseModel):
     """
@@ -41,6 +46,10 @@ class Team(BaseModel):
     investment: float = Field(default=10.0)
     idea: str = Field(default="")
 
+    # role name -> (number of memory messages saved to the journal, the last one), for the `_checkpoint_path` only
+    _checkpoint: Dict[str, Tuple[int, Message]] = PrivateAttr(default_factory=dict)
+    _checkpoint_path: Optional[Path] = PrivateAttr(default=None)
+
     def __init__(self, context: Context = None, **data: Any):
         super(Team, self).__init__(**data)
         ctx = context or Context()
@@ -52,15 +61,54 @@ class Team(BaseModel):
             self.hire(data["roles"])
         if "env_desc" in data:
             self.env.desc = data["env_desc"]
+        if "event_driven" in data:
+            self.env.event_driven = data["event_driven"]
 
-    def serialize(self, stg_path: Path = None):
+    def serialize(self, stg_path: Path = None, compact: bool = False):
+        """Save the team to `stg_path`.
+
+        The role memories are not written to `team.json` but appended to a journal per role under `stg_path/memory`,
+        so that a checkpoint costs in proportion to the messages added since the last one. The journal of a role is
+        rewritten when its memory no longer extends what was saved, e.g. after a deletion, or when `compact` is True.
+        """
         stg_path = SERDESER_PATH.joinpath("team") if stg_path is None else stg_path
         team_info_path = stg_path.joinpath("team.json")
-        serialized_data = self.model_dump()
+        if stg_path != self._checkpoint_path:
+            self._checkpoint = {}
+        exclude = {"env": {"roles": {"__all__": {"rc": {"memory": {"storage", "index"}}}}}}
+        serialized_data = self.model_dump(exclude=exclude)
         serialized_data["context"] = self.env.context.serialize()
+        serialized_data["memory_journals"] = self._save_memory_journals(stg_path.joinpath(MEMORY_JOURNAL_DIR), compact)
+        self._checkpoint_path = stg_path
 
         write_json_file(team_info_path, serialized_data)
 
+    def _save_memory_journals(self, journal_path: Path, compact: bool = False) -> Dict[str, str]:
+        journal_path.mkdir(parents=True, exist_ok=True)
+        journals = {}
+        for name, role in self.env.roles.items():
+            storage = role.rc.memory.storage
+            filename = journal_path / _journal_filename(name)
+            count, last = self._checkpoint.get(name, (0, None))
+            extended = name in self._checkpoint and len(storage) >= count and (not count or storage[count - 1] is last)
+            if compact or not extended:
+                count = 0
+            lines = "".join(i.model_dump_json() + "\n" for i in storage[count:])
+            if not count:
+                # replace the journal atomically, so that a crash leaves the previous one
+                tmp = filename.with_suffix(".tmp")
+                tmp.write_text(lines, encoding="utf-8")
+                os.replace(tmp, filename)
+            elif lines:
+                with open(filename, "a", encoding="utf-8") as writer:
+                    writer.write(lines)
+            self._checkpoint[name] = (len(storage), storage[-1] if storage else None)
+            journals[name] = filename.name
+        for i in journal_path.glob("*.jsonl"):
+            if i.name not in journals.values():
+                i.unlink(missing_ok=True)
+        return journals
+
     @classmethod
     def deserialize(cls, stg_path: Path, context: Context = None) -> "Team":
         """stg_path = ./storage/team"""
@@ -72,9 +120,23 @@ class Team(BaseModel):
             )
 
         team_info: dict = read_json_file(team_info_path)
+        journals = team_info.pop("memory_journals", None) or {}
+        roles = (team_info.get("env") or {}).get("roles") or {}
+        for name, filename in journals.items():
+            if name in roles:
+                memory = roles[name].setdefault("rc", {}).setdefault("memory", {})
+                memory.update(_load_memory_journal(stg_path.joinpath(MEMORY_JOURNAL_DIR, filename)))
         ctx = context or Context()
         ctx.deserialize(team_info.pop("context", None))
         team = Team(**team_info, context=ctx)
+        if journals:
+            team._checkpoint_path = stg_path
+            for name in journals:
+                role = team.env.roles.get(name)
+                if role:
+                    memory = role.rc.memory
+                    memory.rebuild_index()  # index the stored objects, so that `Memory.delete` finds them
+                    team._checkpoint[name] = (len(memory.storage), memory.storage[-1] if memory.storage else None)
         return team
 
     def hire(self, roles: list[Role]):
@@ -121,7 +183,11 @@ class Team(BaseModel):
 
     @serialize_decorator
     async def run(self, n_round=3, idea="", send_to="", auto_archive=True):
-        """Run company until target round or no money"""
+        """Run company until target round or no money.
+
+        Returns the text of `env.history`, i.e. the latest `EnvHistory.DEFAULT_MAXLEN` messages only. Set
+        `env.history_path` to keep the full log of the messages in a file.
+        """
         if idea:
             self.run_project(idea=idea, send_to=send_to)
 
@@ -135,4 +201,24 @@ class Team(BaseModel):
 
             logger.debug(f"max {n_round=} left.")
         self.env.archive(auto_archive)
-        return self.env.history
+        return str(self.env.history)
+
+
+def _journal_filename(role_name: str) -> str:
+    return hashlib.blake2b(role_name.encode("utf-8"), digest_size=8).hexdigest() + ".jsonl"
+
+
+def _load_memory_journal(filename: Path) -> dict:
+    """Return the `storage` field of the memory saved in a journal, the `index` is rebuilt from it."""
+    storage = []
+    if filename.exists():
+        with open(filename, "r", encoding="utf-8") as reader:
+            for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    storage.append(json.loads(line))
+                except json.JSONDecodeError:  # a line cut short by an interrupted checkpoint
+                    logger.warning(f"Skip the broken line of {filename}: {line}")
+                    break
+    return {"storage": storage, "index": {}}
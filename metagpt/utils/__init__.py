@@ -12,6 +12,7 @@ from metagpt.utils.token_counter import (
     TOKEN_COSTS,
     count_input_tokens,
     count_output_tokens,
+    count_tokens_batch,
 )
 
 
@@ -21,4 +22,5 @@ __all__ = [
     "TOKEN_COSTS",
     "count_input_tokens",
     "count_output_tokens",
+    "count_tokens_batch",
 ]
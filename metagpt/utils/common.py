@@ -398,7 +398,7 @@ def any_to_str_set(val) -> set:
     res = set()
 
     # Check if the value is iterable, but not a string (since strings are technically iterable)
-    if isinstance(val, (dict, list, set, tuple)):
+    if isinstance(val, (dict, list, set, frozenset, tuple)):
         # Special handling for dictionaries to iterate over values
         if isinstance(val, dict):
             val = val.values()
@@ -8,52 +8,179 @@
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
+import os
 import re
 from pathlib import Path
-from typing import Set
+from typing import Callable, Dict, Optional, Set, Tuple, Union
 
+from metagpt.logs import logger
 from metagpt.utils.common import aread, awrite
 from metagpt.utils.exceptions import handle_exception
 
+DEFERRED = "deferred"
+
+_pending_files: Set["DependencyFile"] = set()  # instances with changes not written yet, written at exit at the latest
+
 
 class DependencyFile:
     """A class representing a DependencyFile for managing dependencies.
 
+    The dependencies are kept in memory and reloaded only if the file has been changed by others. `update` writes the
+    file atomically by default. `update(persist="deferred")` writes it behind after `flush_delay` seconds instead, so a
+    burst of updates costs a single write. The pending changes are written by `save` and `flush`, when the event loop
+    shuts down and at interpreter exit at the latest. Before writing, they are merged into the file if it has been
+    changed by others meanwhile.
+
     :param workdir: The working directory path for the DependencyFile.
+    :param flush_delay: Seconds to wait before writing the pending changes of `update(persist="deferred")`.
+    :param on_change: Called after the file is written or deleted.
     """
 
-    def __init__(self, workdir: Path | str):
+    def __init__(self, workdir: Path | str, flush_delay: float = 1.0, on_change: Callable[[], None] = None):
         """Initialize a DependencyFile instance.
 
         :param workdir: The working directory path for the DependencyFile.
+        :param flush_delay: Seconds to wait before writing the pending changes of `update(persist="deferred")`.
+        :param on_change: Called after the file is written or deleted.
         """
-        self._dependencies = {}
+        self._dependencies: Dict[str, list] = {}
+        self._dependents: Dict[str, Set[str]] = {}  # reverse index, dependency -> files depending on it
         self._filename = Path(workdir) / ".dependencies.json"
+        self._flush_delay = flush_delay
+        self._stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the file last loaded or written
+        self._pending: Dict[str, Optional[list]] = {}  # the persisted changes not written yet, None if deleted
+        self._flush_task: Optional[asyncio.Task] = None
+        self._on_change = on_change
 
     async def load(self):
         """Load dependencies from the file asynchronously."""
         if not self._filename.exists():
             return
         json_data = await aread(self._filename)
+        self._set_dependencies(json_data)
+
+    def _set_dependencies(self, json_data: str):
         json_data = re.sub(r"\\+", "/", json_data)  # Compatible with windows path
         self._dependencies = json.loads(json_data)
+        for key, dependencies in self._pending.items():
+            if dependencies is None:
+                self._dependencies.pop(key, None)
+            else:
+                self._dependencies[key] = dependencies
+        self._rebuild_dependents()
+        self._stamp = self._get_stamp()
+
+    async def _sync(self):
+        """Load the file if it has been changed by others since the last load or write, keeping the pending changes."""
+        stamp = self._get_stamp()
+        if stamp and stamp != self._stamp:
+            await self.load()
+
+    def _merge(self):
+        """Merge the pending changes into the file if it has been changed by others, before writing it."""
+        stamp = self._get_stamp()
+        if stamp and stamp != self._stamp:
+            self._set_dependencies(self._filename.read_text(encoding="utf-8"))
 
     @handle_exception
     async def save(self):
         """Save dependencies to the file asynchronously."""
+        self._cancel_flush()
+        self._merge()
         data = json.dumps(self._dependencies)
-        await awrite(filename=self._filename, data=data)
+        tmp_filename = self._filename.with_name(self._filename.name + ".tmp")
+        await awrite(filename=tmp_filename, data=data)
+        self._replace(tmp_filename)
+
+    def flush(self):
+        """Write the pending changes to the file, if any."""
+        self._cancel_flush()
+        if not self._pending:
+            return
+        tmp_filename = self._filename.with_name(self._filename.name + ".tmp")
+        try:
+            self._merge()
+            tmp_filename.write_text(json.dumps(self._dependencies), encoding="utf-8")
+            self._replace(tmp_filename)
+        except Exception as e:
+            logger.exception(f"Failed to write {self._filename}: {e}")
+
+    def _replace(self, tmp_filename: Path):
+        os.replace(tmp_filename, self._filename)
+        self._stamp = self._get_stamp()
+        self._pending = {}
+        _pending_files.discard(self)
+        if self._on_change:
+            self._on_change()
+
+    def _schedule_flush(self):
+        _pending_files.add(self)
+        if self._flush_task:
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            self.flush()
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self._flush_delay)
+        finally:
+            # Also reached if the task is cancelled as the loop shuts down, e.g. at the end of `asyncio.run`
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+                self.flush()
+
+    def _cancel_flush(self):
+        task, self._flush_task = self._flush_task, None
+        if task:
+            task.cancel()
+
+    def _get_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self._filename.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _rebuild_dependents(self):
+        self._dependents = {}
+        for key, dependencies in self._dependencies.items():
+            for i in dependencies:
+                self._dependents.setdefault(i, set()).add(key)
 
-    async def update(self, filename: Path | str, dependencies: Set[Path | str], persist=True):
+    def _index(self, key: str, dependencies: list):
+        for i in dependencies:
+            self._dependents.setdefault(i, set()).add(key)
+
+    def _unindex(self, key: str):
+        for i in self._dependencies.get(key, []):
+            dependents = self._dependents.get(i)
+            if dependents is None:
+                continue
+            dependents.discard(key)
+            if not dependents:
+                del self._dependents[i]
+
+    def _key(self, filename: Path | str) -> str:
+        try:
+            return Path(filename).relative_to(self._filename.parent).as_posix()
+        except ValueError:
+            return Path(filename).as_posix()
+
+    async def update(self, filename: Path | str, dependencies: Set[Path | str], persist: Union[bool, str] = True):
         """Update dependencies for a file asynchronously.
 
         :param filename: The filename or path.
         :param dependencies: The set of dependencies.
-        :param persist: Whether to persist the changes immediately.
+        :param persist: Whether to persist the changes, True to write the file immediately, "deferred" to write it
+            behind after `flush_delay` seconds.
         """
         if persist:
-            await self.load()
+            await self._sync()
 
         root = self._filename.parent
         try:
@@ -61,6 +188,7 @@ class DependencyFile:
         except ValueError:
             key = filename
         key = str(key)
+        self._unindex(key)
         if dependencies:
             relative_paths = []
             for i in dependencies:
@@ -71,34 +199,59 @@ class DependencyFile:
                 relative_paths.append(s)
 
             self._dependencies[key] = relative_paths
+            self._index(key, relative_paths)
         elif key in self._dependencies:
             del self._dependencies[key]
 
-        if persist:
+        if not persist:
+            return
+        self._pending[key] = self._dependencies.get(key)
+        if persist == DEFERRED:
+            self._schedule_flush()
+        else:
             await self.save()
 
     async def get(self, filename: Path | str, persist=True):
         """Get dependencies for a file asynchronously.
 
         :param filename: The filename or path.
-        :param persist: Whether to load dependencies from the file immediately.
+        :param persist: Whether to load dependencies changed in the file by others first.
         :return: A set of dependencies.
         """
         if persist:
-            await self.load()
+            await self._sync()
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = Path(filename).as_posix()
-        return set(self._dependencies.get(str(key), {}))
+        return set(self._dependencies.get(self._key(filename), {}))
+
+    async def get_dependents(self, filename: Path | str, persist=True) -> Set[str]:
+        """Get the files depending on a file asynchronously.
+
+        :param filename: The filename or path.
+        :param persist: Whether to load dependencies changed in the file by others first.
+        :return: A set of the files whose dependencies include `filename`.
+        """
+        if persist:
+            await self._sync()
+
+        return set(self._dependents.get(self._key(filename), set()))
 
     def delete_file(self):
-        """Delete the dependency file."""
+        """Delete the dependency file, dropping the pending changes."""
+        self._cancel_flush()
+        self._pending = {}
+        _pending_files.discard(self)
         self._filename.unlink(missing_ok=True)
+        self._stamp = None
+        if self._on_change:
+            self._on_change()
 
     @property
     def exists(self):
         """Check if the dependency file exists."""
         return self._filename.exists()
+
+
+@atexit.register
+def _flush_pending_files():
+    for i in list(_pending_files):
+        i.flush()
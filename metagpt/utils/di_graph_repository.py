@@ -12,20 +12,39 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import networkx
 
-from metagpt.utils.common import aread, awrite
+from metagpt.utils import graph_npz
+from metagpt.utils.common import aread, awrite, split_namespace
 from metagpt.utils.graph_repository import SPO, GraphRepository
 
+JSON_FORMAT = "json"
+NPZ_FORMAT = "npz"
+
 
 class DiGraphRepository(GraphRepository):
-    """Graph repository based on DiGraph."""
+    """Graph repository based on DiGraph.
+
+    A DiGraph holds at most one edge from a subject to an object, the predicate is an edge attribute. Its successor and
+    predecessor adjacencies serve as the SPO and OSP indexes, and `_pos` indexes the edges by predicate and object, so
+    that queries with any bound field run in time proportional to the output.
+
+    The repository is saved as JSON by default. With `format="npz"` it is saved in the compact binary format of
+    `metagpt.utils.graph_npz`: the first save writes a snapshot, and the following saves only append the changes made
+    since to the log of the snapshot, until the log outgrows the graph and the snapshot is rewritten.
+    """
 
     def __init__(self, name: str | Path, **kwargs):
         super().__init__(name=str(name), **kwargs)
         self._repo = networkx.DiGraph()
+        self._pos: Dict[str, Dict[str, Dict[str, None]]] = {}  # predicate -> object -> ordered set of subjects
+        self._snapshot: Optional[Path] = None  # the binary snapshot the changes are logged against
+        self._generation = 0  # the generation of `_snapshot`
+        self._journal: List[Tuple[str, str, str, str]] = []  # changes not saved to the log of `_snapshot` yet
+        self._snapshot_size = 0
+        self._log_size = 0
 
     async def insert(self, subject: str, predicate: str, object_: str):
         """Insert a new triple into the directed graph repository.
@@ -39,7 +58,61 @@ class DiGraphRepository(GraphRepository):
             await my_di_graph_repo.insert(subject="Node1", predicate="connects_to", object_="Node2")
             # Adds a directed relationship: Node1 connects_to Node2
         """
+        self._insert(subject, predicate, object_)
+
+    async def insert_many(self, triples: Iterable[SPO]):
+        """Insert a batch of triples into the directed graph repository.
+
+        Args:
+            triples (Iterable[SPO]): The triples to insert.
+        """
+        for i in triples:
+            self._insert(i.subject, i.predicate, i.object_)
+
+    def _insert(self, subject: str, predicate: str, object_: str):
+        edge = self._repo.succ.get(subject, {}).get(object_)
+        if edge is not None:
+            self._unindex(subject, edge["predicate"], object_)
         self._repo.add_edge(subject, object_, predicate=predicate)
+        self._pos.setdefault(predicate, {}).setdefault(object_, {})[subject] = None
+        if self._snapshot:
+            self._journal.append((graph_npz.INSERT, subject, predicate, object_))
+
+    def _unindex(self, subject: str, predicate: str, object_: str):
+        subjects = self._pos[predicate][object_]
+        del subjects[subject]
+        if not subjects:
+            del self._pos[predicate][object_]
+            if not self._pos[predicate]:
+                del self._pos[predicate]
+
+    def _rebuild_index(self):
+        self._pos = {}
+        for s, o, p in self._repo.edges(data="predicate"):
+            self._pos.setdefault(p, {}).setdefault(o, {})[s] = None
+
+    def _match(self, subject: str = None, predicate: str = None, object_: str = None) -> Iterator[Tuple[str, str, str]]:
+        """Yield the matching (subject, predicate, object) triples, empty values match all."""
+        if subject:
+            if object_:
+                edge = self._repo.succ.get(subject, {}).get(object_)
+                candidates = [(subject, edge["predicate"], object_)] if edge is not None else []
+            else:
+                candidates = ((subject, d["predicate"], o) for o, d in self._repo.succ.get(subject, {}).items())
+        elif predicate:
+            objects = self._pos.get(predicate, {})
+            if object_:
+                candidates = ((s, predicate, object_) for s in objects.get(object_, {}))
+            else:
+                candidates = ((s, predicate, o) for o, subjects in objects.items() for s in subjects)
+        elif object_:
+            candidates = ((s, d["predicate"], object_) for s, d in self._repo.pred.get(object_, {}).items())
+        else:
+            candidates = ((s, p, o) for s, o, p in self._repo.edges(data="predicate"))
+        for s, p, o in candidates:
+            if predicate and predicate != p:
+                continue
+            yield s, p, o
 
     async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
         """Retrieve triples from the directed graph repository based on specified criteria.
@@ -56,16 +129,18 @@ class DiGraphRepository(GraphRepository):
             selected_triples = await my_di_graph_repo.select(subject="Node1", predicate="connects_to")
             # Retrieves directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        result = []
-        for s, o, p in self._repo.edges(data="predicate"):
-            if subject and subject != s:
-                continue
-            if predicate and predicate != p:
-                continue
-            if object_ and object_ != o:
-                continue
-            result.append(SPO(subject=s, predicate=p, object_=o))
-        return result
+        return [SPO(subject=s, predicate=p, object_=o) for s, p, o in self._match(subject, predicate, object_)]
+
+    async def select_many(self, queries: Iterable[dict]) -> List[List[SPO]]:
+        """Run a batch of `select` queries.
+
+        Args:
+            queries (Iterable[dict]): The keyword arguments of each `select` call.
+
+        Returns:
+            List[List[SPO]]: The selected triples of each query, in the order of the queries.
+        """
+        return [[SPO(subject=s, predicate=p, object_=o) for s, p, o in self._match(**i)] for i in queries]
 
     async def delete(self, subject: str = None, predicate: str = None, object_: str = None) -> int:
         """Delete triples from the directed graph repository based on specified criteria.
@@ -82,38 +157,100 @@ class DiGraphRepository(GraphRepository):
             deleted_count = await my_di_graph_repo.delete(subject="Node1", predicate="connects_to")
             # Deletes directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        rows = await self.select(subject=subject, predicate=predicate, object_=object_)
-        if not rows:
-            return 0
-        for r in rows:
-            self._repo.remove_edge(r.subject, r.object_)
+        rows = list(self._match(subject, predicate, object_))
+        for s, p, o in rows:
+            self._repo.remove_edge(s, o)
+            self._unindex(s, p, o)
+            if self._snapshot:
+                self._journal.append((graph_npz.DELETE, s, p, o))
         return len(rows)
 
+    async def delete_namespaces(self, namespaces: Iterable[str]) -> int:
+        """Delete the triples of the namespaces, see `GraphRepository.delete_namespaces`."""
+        namespaces = set(namespaces)
+        subjects = [s for s, objects in self._repo.succ.items() if objects and split_namespace(s)[0] in namespaces]
+        return sum([await self.delete(subject=i) for i in subjects])
+
     def json(self) -> str:
         """Convert the directed graph repository to a JSON-formatted string."""
         m = networkx.node_link_data(self._repo)
         data = json.dumps(m)
         return data
 
-    async def save(self, path: str | Path = None):
-        """Save the directed graph repository to a JSON file.
+    async def save(self, path: str | Path = None, compact: bool = False):
+        """Save the directed graph repository to a file in the `format` given by the keyword arguments.
 
         Args:
-            path (Union[str, Path], optional): The directory path where the JSON file will be saved.
+            path (Union[str, Path], optional): The directory path where the file will be saved.
                 If not provided, the default path is taken from the 'root' key in the keyword arguments.
+            compact (bool, optional): If True, rewrite the binary snapshot instead of appending to its log.
+                Ignored by the JSON format.
         """
-        data = self.json()
-        path = path or self._kwargs.get("root")
+        path = Path(path or self._kwargs.get("root"))
         if not path.exists():
             path.mkdir(parents=True, exist_ok=True)
-        pathname = Path(path) / self.name
+        pathname = path / self.name
+        if self.format == NPZ_FORMAT:
+            self._save_npz(pathname.with_suffix(".npz"), compact=compact)
+            return
+        data = self.json()
         await awrite(filename=pathname.with_suffix(".json"), data=data, encoding="utf-8")
 
+    def _save_npz(self, pathname: Path, compact: bool = False):
+        if (
+            not compact
+            and self._snapshot == pathname
+            and pathname.exists()
+            and self._log_size + len(self._journal) <= self._snapshot_size
+        ):
+            graph_npz.append_log(pathname, self._journal, self._generation)
+            self._log_size += len(self._journal)
+        else:
+            rows = list(self._match())
+            self._generation = graph_npz.write_npz(pathname, rows)
+            self._snapshot_size = len(rows)
+            self._log_size = 0
+        self._snapshot = pathname
+        self._journal = []
+
     async def load(self, pathname: str | Path):
-        """Load a directed graph repository from a JSON file."""
+        """Load a directed graph repository from a JSON file, or from a binary snapshot and its log."""
+        pathname = Path(pathname)
+        if pathname.suffix == f".{NPZ_FORMAT}":
+            self.load_npz(pathname)
+            return
         data = await aread(filename=pathname, encoding="utf-8")
         self.load_json(data)
 
+    def load_npz(self, pathname: str | Path, mmap: bool = True):
+        """Load a binary snapshot and replay the changes logged after it.
+
+        Args:
+            pathname (Union[str, Path]): The path to the snapshot file.
+            mmap (bool, optional): If True, memory-map the snapshot arrays instead of reading them into memory.
+
+        Returns:
+            self: Returns the instance of the class with the updated _repo attribute.
+        """
+        pathname = Path(pathname)
+        self._repo = networkx.DiGraph()
+        self._repo.add_edges_from((s, o, {"predicate": p}) for s, p, o in graph_npz.read_npz(pathname, mmap=mmap))
+        self._rebuild_index()
+        self._snapshot = None
+        self._snapshot_size = self._repo.number_of_edges()
+        self._log_size = 0
+        self._generation = graph_npz.read_generation(pathname)
+        for op, s, p, o in graph_npz.read_log(pathname, self._generation):
+            if op == graph_npz.INSERT:
+                self._insert(s, p, o)
+            elif self._repo.has_edge(s, o):
+                self._repo.remove_edge(s, o)
+                self._unindex(s, p, o)
+            self._log_size += 1
+        self._snapshot = pathname
+        self._journal = []
+        return self
+
     def load_json(self, val: str):
         """
         Loads a JSON-encoded string representing a graph structure and updates
@@ -133,20 +270,25 @@ class DiGraphRepository(GraphRepository):
             return self
         m = json.loads(val)
         self._repo = networkx.node_link_graph(m)
+        self._rebuild_index()
+        self._snapshot = None
+        self._journal = []
         return self
 
     @staticmethod
     async def load_from(pathname: str | Path) -> GraphRepository:
-        """Create and load a directed graph repository from a JSON file.
+        """Create and load a directed graph repository from a JSON file or a binary `.npz` snapshot.
 
         Args:
-            pathname (Union[str, Path]): The path to the JSON file to be loaded.
+            pathname (Union[str, Path]): The path to the file to be loaded.
 
         Returns:
-            GraphRepository: A new instance of the graph repository loaded from the specified JSON file.
+            GraphRepository: A new instance of the graph repository loaded from the specified file, which is saved in
+                the same format.
         """
         pathname = Path(pathname)
-        graph = DiGraphRepository(name=pathname.stem, root=pathname.parent)
+        fmt = NPZ_FORMAT if pathname.suffix == f".{NPZ_FORMAT}" else JSON_FORMAT
+        graph = DiGraphRepository(name=pathname.stem, root=pathname.parent, format=fmt)
         if pathname.exists():
             await graph.load(pathname=pathname)
         return graph
@@ -156,11 +298,16 @@ class DiGraphRepository(GraphRepository):
         """Return the root directory path for the graph repository files."""
         return self._kwargs.get("root")
 
+    @property
+    def format(self) -> str:
+        """Return the file format of the graph repository, `json` or `npz`."""
+        return self._kwargs.get("format") or JSON_FORMAT
+
     @property
     def pathname(self) -> Path:
         """Return the path and filename to the graph repository file."""
         p = Path(self.root) / self.name
-        return p.with_suffix(".json")
+        return p.with_suffix(f".{self.format}")
 
     @property
     def repo(self):
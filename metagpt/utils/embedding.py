@@ -5,15 +5,23 @@
 @Author  : alexanderwu
 @File    : embedding.py
 """
+from llama_index.core.embeddings import BaseEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from metagpt.config2 import config
+from metagpt.configs.embedding_config import EmbeddingType
+from metagpt.rag.embeddings.cached import wrap_embedding
 
 
-def get_embedding() -> OpenAIEmbedding:
+def get_embedding() -> BaseEmbedding:
+    if config.embedding.api_type == EmbeddingType.LOCAL:
+        from metagpt.rag.factories.embedding import get_rag_embedding
+
+        return get_rag_embedding(EmbeddingType.LOCAL)
+
     llm = config.get_openai_llm()
     if llm is None:
         raise ValueError("To use OpenAIEmbedding, please ensure that config.llm.api_type is correctly set to 'openai'.")
 
     embedding = OpenAIEmbedding(api_key=llm.api_key, api_base=llm.base_url)
-    return embedding
+    return wrap_embedding(embedding, config.embedding)
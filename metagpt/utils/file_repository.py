@@ -8,17 +8,92 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import chardet
 
 from metagpt.logs import logger
 from metagpt.schema import Document
 from metagpt.utils.common import aread, awrite
+from metagpt.utils.dependency_file import DEFERRED
 from metagpt.utils.json_to_markdown import json_to_markdown
 
+DEFAULT_READ_CONCURRENCY = 8
+
+
+def _universal_newlines(content: str) -> str:
+    """Translate the line endings as `aread` does in text mode."""
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class FileContentCache:
+    """LRU cache of file contents, an entry is valid while the (mtime_ns, size) of its file is unchanged.
+
+    It is shared by the threads reading files for `FileRepository.get_many`.
+
+    :param max_size: The maximum total size in bytes of the cached files.
+    :param max_file_size: Files larger than this are not cached.
+    """
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024, max_file_size: int = 1024 * 1024):
+        self.max_size = max_size
+        self.max_file_size = max_file_size
+        self._data: OrderedDict[str, Tuple[Tuple[int, int], str]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, pathname: Path, stat: os.stat_result) -> Optional[str]:
+        key = str(pathname)
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] != (stat.st_mtime_ns, stat.st_size):
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, pathname: Path, stat: os.stat_result, content: str):
+        key = str(pathname)
+        with self._lock:
+            self._pop(key)
+            if stat.st_size > self.max_file_size:
+                return
+            self._data[key] = ((stat.st_mtime_ns, stat.st_size), content)
+            self._size += stat.st_size
+            while self._size > self.max_size:
+                self._pop(next(iter(self._data)))
+
+    def discard(self, pathname: Path):
+        with self._lock:
+            self._pop(str(pathname))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def _pop(self, key: str):
+        item = self._data.pop(key, None)
+        if item:
+            self._size -= item[0][1]
+
+    @property
+    def size(self) -> int:
+        """The total size in bytes of the cached files."""
+        return self._size
+
+    def __len__(self):
+        return len(self._data)
+
 
 class FileRepository:
     """A class representing a FileRepository associated with a Git repository.
@@ -54,11 +129,13 @@ class FileRepository:
         pathname.parent.mkdir(parents=True, exist_ok=True)
         content = content if content else ""  # avoid `argument must be str, not None` to make it continue
         await awrite(filename=str(pathname), data=content)
+        self._git_repo.invalidate()
+        self.content_cache.set(pathname, pathname.stat(), _universal_newlines(content))
         logger.info(f"save to: {str(pathname)}")
 
         if dependencies is not None:
             dependency_file = await self._git_repo.get_dependency()
-            await dependency_file.update(pathname, set(dependencies))
+            await dependency_file.update(pathname, set(dependencies), persist=DEFERRED)
             logger.info(f"update dependency: {str(pathname)}:{dependencies}")
 
         return Document(root_path=str(self._relative_path), filename=str(filename), content=content)
@@ -103,24 +180,66 @@ class FileRepository:
         doc.content = await aread(path_name)
         return doc
 
+    async def get_many(
+        self, filenames: Iterable[Path | str], max_concurrency: int = DEFAULT_READ_CONCURRENCY, use_cache: bool = True
+    ) -> List[Document | None]:
+        """Read the content of files concurrently.
+
+        The files are read in `max_concurrency` batches, each in a worker thread, so the cost is dominated by the disk
+        rather than by a round trip to the thread pool per file.
+
+        :param filenames: The filenames or paths within the repository.
+        :param max_concurrency: The maximum number of worker threads reading at the same time.
+        :param use_cache: Whether to reuse the contents of files unchanged since last read or saved.
+        :return: The documents in the order of `filenames`, None for the files not found.
+        """
+        filenames = list(filenames)
+        if not filenames:
+            return []
+        batch_size = -(-len(filenames) // max(1, max_concurrency))
+        batches = [filenames[i : i + batch_size] for i in range(0, len(filenames), batch_size)]
+        results = await asyncio.gather(*[asyncio.to_thread(self._read_many, i, use_cache) for i in batches])
+        return [doc for docs in results for doc in docs]
+
+    def _read_many(self, filenames: List[Path | str], use_cache: bool) -> List[Document | None]:
+        docs = []
+        for filename in filenames:
+            path_name = self.workdir / filename
+            try:
+                stat = path_name.stat()
+            except (FileNotFoundError, NotADirectoryError):
+                docs.append(None)
+                continue
+            if not path_name.is_file():
+                docs.append(None)
+                continue
+            content = self.content_cache.get(path_name, stat) if use_cache else None
+            if content is None:
+                raw = path_name.read_bytes()
+                try:
+                    content = raw.decode("utf-8")
+                except UnicodeDecodeError:
+                    content = raw.decode(chardet.detect(raw)["encoding"])
+                content = _universal_newlines(content)
+                if use_cache:
+                    self.content_cache.set(path_name, stat, content)
+            docs.append(Document(root_path=str(self.root_path), filename=str(filename), content=content))
+        return docs
+
     async def get_all(self, filter_ignored=True) -> List[Document]:
         """Get the content of all files in the repository.
 
         :return: List of Document instances representing files.
         """
-        docs = []
         if filter_ignored:
-            for f in self.all_files:
-                doc = await self.get(f)
-                docs.append(doc)
+            filenames = self.all_files
         else:
+            filenames = []
             for root, dirs, files in os.walk(str(self.workdir)):
                 for file in files:
                     file_path = Path(root) / file
-                    relative_path = file_path.relative_to(self.workdir)
-                    doc = await self.get(relative_path)
-                    docs.append(doc)
-        return docs
+                    filenames.append(file_path.relative_to(self.workdir))
+        return await self.get_many(filenames)
 
     @property
     def workdir(self):
@@ -130,6 +249,11 @@ class FileRepository:
         """
         return self._git_repo.workdir / self._relative_path
 
+    @property
+    def content_cache(self) -> FileContentCache:
+        """Return the file content cache shared by the file repositories of the same Git repository."""
+        return self._git_repo.content_cache
+
     @property
     def root_path(self):
         """Return the relative path from git repository root"""
@@ -231,7 +355,9 @@ class FileRepository:
         if not pathname.exists():
             return
         pathname.unlink(missing_ok=True)
+        self._git_repo.invalidate()
+        self.content_cache.discard(pathname)
 
         dependency_file = await self._git_repo.get_dependency()
-        await dependency_file.update(filename=pathname, dependencies=None)
+        await dependency_file.update(filename=pathname, dependencies=None, persist=DEFERRED)
         logger.info(f"remove dependency key: {str(pathname)}")
@@ -8,10 +8,11 @@
 """
 from __future__ import annotations
 
+import os
 import shutil
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from git.repo import Repo
 from git.repo.fun import is_git_dir
@@ -19,7 +20,7 @@ from gitignore_parser import parse_gitignore
 
 from metagpt.logs import logger
 from metagpt.utils.dependency_file import DependencyFile
-from metagpt.utils.file_repository import FileRepository
+from metagpt.utils.file_repository import FileContentCache, FileRepository
 
 
 class ChangeType(Enum):
@@ -40,6 +41,10 @@ class GitRepository:
 
     Attributes:
         _repository (Repo): The GitPython `Repo` object representing the Git repository.
+
+    The status and file lists are computed once and cached until the working directory or the git index changes, as
+    told by the paths, sizes and modification times of their files, which are much cheaper to stat than running git.
+    The gitignore matches are cached until the rules are parsed again.
     """
 
     def __init__(self, local_path=None, auto_init=True):
@@ -50,7 +55,11 @@ class GitRepository:
         """
         self._repository = None
         self._dependency = None
+        self._content_cache = None
         self._gitignore_rules = None
+        self._ignored: Dict[str, bool] = {}  # gitignore matches, valid until the rules are parsed again
+        self._snapshot: Dict[Any, Any] = {}  # status and file lists, valid while `_snapshot_stamp` is unchanged
+        self._snapshot_stamp: Optional[Tuple[int, int]] = None
         if local_path:
             self.open(local_path=local_path, auto_init=auto_init)
 
@@ -61,9 +70,10 @@ class GitRepository:
         :param auto_init: If True, automatically initializes a new Git repository if the provided path is not a Git repository.
         """
         local_path = Path(local_path)
+        self.invalidate()
         if self.is_git_dir(local_path):
             self._repository = Repo(local_path)
-            self._gitignore_rules = parse_gitignore(full_path=str(local_path / ".gitignore"))
+            self._set_gitignore_rules(local_path / ".gitignore")
             return
         if not auto_init:
             return
@@ -83,7 +93,37 @@ class GitRepository:
             writer.write("\n".join(ignores))
         self._repository.index.add([".gitignore"])
         self._repository.index.commit("Add .gitignore")
-        self._gitignore_rules = parse_gitignore(full_path=gitignore_filename)
+        self._set_gitignore_rules(gitignore_filename)
+
+    def _set_gitignore_rules(self, gitignore_filename: Path):
+        self._gitignore_rules = parse_gitignore(full_path=str(gitignore_filename))
+        self._ignored = {}
+
+    def invalidate(self):
+        """Discard the cached status and file lists.
+
+        Called after files in the working directory are changed through this repository, e.g. by `FileRepository`.
+        Files changed by other means are seen only after a call to it, or after the git index changes.
+        """
+        self._snapshot = {}
+        self._snapshot_stamp = None
+
+    def _get_snapshot(self) -> Dict[Any, Any]:
+        """Return the cached status and file lists, discarded first if the git index changed since they were cached,
+        e.g. by a commit or a checkout outside of this repository."""
+        stamp = self._get_index_stamp()
+        if stamp != self._snapshot_stamp:
+            self._snapshot = {}
+            self._snapshot_stamp = stamp
+        return self._snapshot
+
+    def _get_index_stamp(self) -> Optional[Tuple[int, int]]:
+        """Return the modification time and size of the git index."""
+        try:
+            stat = (Path(self._repository.git_dir) / "index").stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     def add_change(self, files: Dict):
         """Add or remove files from the staging area based on the provided changes.
@@ -93,6 +133,7 @@ class GitRepository:
         if not self.is_valid or not files:
             return
 
+        self.invalidate()
         for k, v in files.items():
             self._repository.index.remove(k) if v is ChangeType.DELETED else self._repository.index.add([k])
 
@@ -103,14 +144,18 @@ class GitRepository:
         """
         if self.is_valid:
             self._repository.index.commit(comments)
+            self.invalidate()
 
     def delete_repository(self):
         """Delete the entire repository directory."""
+        if self._dependency:
+            self._dependency.delete_file()
         if self.is_valid:
             try:
                 shutil.rmtree(self._repository.working_dir)
             except Exception as e:
                 logger.exception(f"Failed delete git repo:{self.workdir}, error:{e}")
+            self.invalidate()
 
     @property
     def changed_files(self) -> Dict[str, str]:
@@ -118,10 +163,16 @@ class GitRepository:
 
         :return: A dictionary where keys are file paths and values are change types.
         """
-        files = {i: ChangeType.UNTRACTED for i in self._repository.untracked_files}
-        changed_files = {f.a_path: ChangeType(f.change_type) for f in self._repository.index.diff(None)}
-        files.update(changed_files)
-        return files
+        snapshot = self._get_snapshot()
+        files = snapshot.get("changed_files")
+        if files is None:
+            files = {i: ChangeType.UNTRACTED for i in self._repository.untracked_files}
+            changed_files = {f.a_path: ChangeType(f.change_type) for f in self._repository.index.diff(None)}
+            files.update(changed_files)
+            snapshot["changed_files"] = files
+            # `git status` may refresh the stat data of the index, which changes nothing in the status
+            self._snapshot_stamp = self._get_index_stamp()
+        return dict(files)
 
     @staticmethod
     def is_git_dir(local_path):
@@ -165,8 +216,12 @@ class GitRepository:
 
         :param comments: Comments for the archive commit.
         """
-        logger.info(f"Archive: {list(self.changed_files.keys())}")
-        self.add_change(self.changed_files)
+        if self._dependency:
+            self._dependency.flush()
+        self.invalidate()
+        changed_files = self.changed_files
+        logger.info(f"Archive: {list(changed_files.keys())}")
+        self.add_change(changed_files)
         self.commit(comments)
 
     def new_file_repository(self, relative_path: Path | str = ".") -> FileRepository:
@@ -188,9 +243,16 @@ class GitRepository:
         :return: An instance of DependencyFile.
         """
         if not self._dependency:
-            self._dependency = DependencyFile(workdir=self.workdir)
+            self._dependency = DependencyFile(workdir=self.workdir, on_change=self.invalidate)
         return self._dependency
 
+    @property
+    def content_cache(self) -> FileContentCache:
+        """Get the cache of file contents shared by the file repositories of the Git repository."""
+        if self._content_cache is None:
+            self._content_cache = FileContentCache()
+        return self._content_cache
+
     def rename_root(self, new_dir_name):
         """Rename the root directory of the Git repository.
 
@@ -198,6 +260,8 @@ class GitRepository:
         """
         if self.workdir.name == new_dir_name:
             return
+        if self._dependency:
+            self._dependency.flush()
         new_path = self.workdir.parent / new_dir_name
         if new_path.exists():
             logger.info(f"Delete directory {str(new_path)}")
@@ -218,7 +282,10 @@ class GitRepository:
                 return
         logger.info(f"Rename directory {str(self.workdir)} to {str(new_path)}")
         self._repository = Repo(new_path)
-        self._gitignore_rules = parse_gitignore(full_path=str(new_path / ".gitignore"))
+        self._set_gitignore_rules(new_path / ".gitignore")
+        self.invalidate()
+        self._dependency = None
+        self._content_cache = None
 
     def get_files(self, relative_path: Path | str, root_relative_path: Path | str = None, filter_ignored=True) -> List:
         """
@@ -242,6 +309,14 @@ class GitRepository:
 
         if not root_relative_path:
             root_relative_path = Path(self.workdir) / relative_path
+        key = ("files", str(relative_path), str(root_relative_path), filter_ignored)
+        snapshot = self._get_snapshot()
+        files = snapshot.get(key)
+        if files is None:
+            files = snapshot[key] = self._get_files(relative_path, root_relative_path, filter_ignored)
+        return list(files)
+
+    def _get_files(self, relative_path: Path, root_relative_path: Path | str, filter_ignored: bool) -> List:
         files = []
         try:
             directory_path = Path(self.workdir) / relative_path
@@ -252,8 +327,10 @@ class GitRepository:
                     rpath = file_path.relative_to(root_relative_path)
                     files.append(str(rpath))
                 else:
-                    subfolder_files = self.get_files(
-                        relative_path=file_path, root_relative_path=root_relative_path, filter_ignored=False
+                    subfolder_files = self._get_files(
+                        relative_path=file_path.relative_to(self.workdir),
+                        root_relative_path=root_relative_path,
+                        filter_ignored=False,
                     )
                     files.extend(subfolder_files)
         except Exception as e:
@@ -278,8 +355,11 @@ class GitRepository:
             root_relative_path = self.workdir
         files = []
         for filename in filenames:
-            pathname = root_relative_path / filename
-            if self._gitignore_rules(str(pathname)):
+            pathname = str(Path(root_relative_path) / filename)
+            ignored = self._ignored.get(pathname)
+            if ignored is None:
+                ignored = self._ignored[pathname] = bool(self._gitignore_rules(pathname))
+            if ignored:
                 continue
             files.append(filename)
         return files
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : graph_npz.py
+@Desc    : Compact binary format of graph repository triples.
+    A snapshot is an uncompressed numpy `.npz` file holding an interned string table and an integer edge array:
+    - strings: uint8, the utf-8 encoded strings concatenated
+    - offsets: int64, the start of each string in `strings`, plus the end of the last one
+    - triples: int64 of shape (n, 3), the (subject, predicate, object) indexes into the string table
+    - generation: int64 of shape (1,), a random id of the snapshot
+    Changes made after a snapshot are appended as json lines to a log file next to it, so that saving does not
+    rewrite the whole graph. Each change is tagged with the generation of its snapshot, so that the changes left in the
+    log by a crash between writing a new snapshot and removing the log are not replayed onto the new one.
+"""
+from __future__ import annotations
+
+import json
+import secrets
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+LOG_SUFFIX = ".log"
+INSERT = "+"
+DELETE = "-"
+
+# `np.savez` writes the version 1.0 headers, or 2.0 ones if they are larger than 64KB
+_READ_ARRAY_HEADERS = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+
+
+def write_npz(pathname: str | Path, triples: Iterable[Tuple[str, str, str]]) -> int:
+    """Write the triples as a snapshot, replacing the previous snapshot and its log.
+
+    Returns:
+        The generation of the new snapshot, to pass to `append_log`.
+    """
+    pathname = Path(pathname)
+    index: Dict[str, int] = {}
+    encoded: List[bytes] = []
+    rows = []
+    for triple in triples:
+        row = []
+        for v in triple:
+            ix = index.get(v)
+            if ix is None:
+                ix = index[v] = len(encoded)
+                encoded.append(v.encode("utf-8"))
+            row.append(ix)
+        rows.append(row)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(i) for i in encoded], out=offsets[1:])
+    strings = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    edges = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    generation = secrets.randbits(63)
+
+    pathname.parent.mkdir(parents=True, exist_ok=True)
+    tmp_pathname = pathname.with_name(pathname.name + ".tmp")
+    with open(tmp_pathname, "wb") as writer:
+        np.savez(
+            writer, strings=strings, offsets=offsets, triples=edges, generation=np.array([generation], dtype=np.int64)
+        )
+    tmp_pathname.replace(pathname)
+    log_pathname(pathname).unlink(missing_ok=True)
+    return generation
+
+
+def read_generation(pathname: str | Path) -> int:
+    """Return the generation of a snapshot, 0 if it has none."""
+    with np.load(pathname) as npz:
+        return int(npz["generation"][0]) if "generation" in npz.files else 0
+
+
+def read_npz(pathname: str | Path, mmap: bool = True) -> Iterator[Tuple[str, str, str]]:
+    """Yield the (subject, predicate, object) triples of a snapshot, the changes in its log are read by `read_log`.
+
+    Args:
+        pathname: The snapshot file.
+        mmap: If true, the arrays are memory-mapped instead of read into memory.
+    """
+    arrays = _mmap_npz(pathname) if mmap else dict(np.load(pathname))
+    data = bytes(arrays["strings"])
+    offsets = arrays["offsets"].tolist()
+    table = [data[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+    for s, p, o in arrays["triples"].tolist():
+        yield table[s], table[p], table[o]
+
+
+def append_log(pathname: str | Path, changes: Iterable[Tuple[str, str, str, str]], generation: int):
+    """Append (op, subject, predicate, object) changes to the log of the snapshot of the given generation, op is
+    `INSERT` or `DELETE`."""
+    lines = "".join(json.dumps([generation, *i], ensure_ascii=False) + "\n" for i in changes)
+    if lines:
+        with open(log_pathname(pathname), "a", encoding="utf-8") as writer:
+            writer.write(lines)
+
+
+def read_log(pathname: str | Path, generation: int) -> Iterator[Tuple[str, str, str, str]]:
+    """Yield the (op, subject, predicate, object) changes logged after the snapshot of the given generation, the
+    changes logged against other generations are skipped."""
+    filename = log_pathname(pathname)
+    if not filename.exists():
+        return
+    with open(filename, "r", encoding="utf-8") as reader:
+        for line in reader:
+            if line.strip():
+                record = json.loads(line)
+                if record[0] == generation:
+                    yield tuple(record[1:])
+
+
+def log_pathname(pathname: str | Path) -> Path:
+    pathname = Path(pathname)
+    return pathname.with_name(pathname.name + LOG_SUFFIX)
+
+
+def _mmap_npz(pathname: str | Path) -> Dict[str, np.ndarray]:
+    """Memory-map the arrays of an uncompressed `.npz` file, `np.load` only supports it for `.npy` files."""
+    arrays = {}
+    with zipfile.ZipFile(pathname) as zf, open(pathname, "rb") as reader:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{pathname} is compressed and cannot be memory-mapped")
+            # skip the local file header, its extra field may differ from the central directory's
+            reader.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(reader.read(4), dtype="<u2")
+            reader.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+            version = np.lib.format.read_magic(reader)
+            read_array_header = _READ_ARRAY_HEADERS.get(version)
+            if read_array_header is None:
+                raise ValueError(f"{pathname} has arrays of the unsupported format version {version}")
+            shape, fortran_order, dtype = read_array_header(reader)
+            name = info.filename.removesuffix(".npy")
+            if not np.prod(shape):
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                pathname, dtype=dtype, mode="r", offset=reader.tell(), shape=shape, order="F" if fortran_order else "C"
+            )
+    return arrays
@@ -12,7 +12,7 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from pathlib import Path
-from typing import List
+from typing import Iterable, List
 
 from pydantic import BaseModel
 
@@ -119,6 +119,32 @@ class GraphRepository(ABC):
         """
         pass
 
+    async def insert_many(self, triples: Iterable[SPO]):
+        """Insert a batch of triples into the graph repository.
+
+        Args:
+            triples (Iterable[SPO]): The triples to insert.
+
+        Example:
+            await my_repository.insert_many([SPO(subject="Node1", predicate="connects_to", object_="Node2")])
+        """
+        for i in triples:
+            await self.insert(subject=i.subject, predicate=i.predicate, object_=i.object_)
+
+    async def select_many(self, queries: Iterable[dict]) -> List[List[SPO]]:
+        """Run a batch of `select` queries.
+
+        Args:
+            queries (Iterable[dict]): The keyword arguments of each `select` call.
+
+        Returns:
+            List[List[SPO]]: The selected triples of each query, in the order of the queries.
+
+        Example:
+            rows = await my_repository.select_many([{"subject": "Node1"}, {"object_": "Node2"}])
+        """
+        return [await self.select(**i) for i in queries]
+
     @abstractmethod
     async def delete(self, subject: str = None, predicate: str = None, object_: str = None) -> int:
         """Delete triples from the graph repository based on specified criteria.
@@ -137,6 +163,25 @@ class GraphRepository(ABC):
         """
         pass
 
+    async def delete_namespaces(self, namespaces: Iterable[str]) -> int:
+        """Delete the triples whose subject is one of the namespaces or a name inside it.
+
+        Args:
+            namespaces (Iterable[str]): The namespaces, e.g. a file name.
+
+        Returns:
+            int: The number of triples deleted from the repository.
+
+        Example:
+            deleted_count = await my_repository.delete_namespaces(["a.py"])
+            # Deletes the triples of the subjects `a.py`, `a.py:A`, `a.py:A:run`, etc.
+        """
+        namespaces = set(namespaces)
+        if not namespaces:
+            return 0
+        subjects = {i.subject for i in await self.select() if split_namespace(i.subject)[0] in namespaces}
+        return sum([await self.delete(subject=i) for i in subjects])
+
     @abstractmethod
     async def save(self):
         """Save any changes made to the graph repository.
@@ -4,7 +4,8 @@
 
 import copy
 from enum import Enum
-from typing import Callable, Union
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import regex as re
 from tenacity import RetryCallState, retry, stop_after_attempt, wait_fixed
@@ -21,6 +22,14 @@ class RepairType(Enum):
     JSON = "json format"
 
 
+class RepairFix(NamedTuple):
+    """A fix applied by `repair_llm_output_with_report`."""
+
+    repair_type: RepairType
+    key: Optional[str]
+    detail: str
+
+
 def repair_case_sensitivity(output: str, req_key: str) -> str:
     """
     usually, req_key is the key name of expected json or markdown content, it won't appear in the value part.
@@ -154,6 +163,146 @@ def _repair_llm_raw_output(output: str, req_key: str, repair_type: RepairType =
     return output
 
 
+# a string, or a comment with the whitespace before it, strings do not span lines as in `repair_json_format`
+_JSON_TOKEN = re.compile(r"\"[^\"\n]*\"|'[^'\n]*'|[^\S\n]*(?:#|//)[^\n]*")
+
+
+def _is_tag(req_key: str) -> bool:
+    return req_key.startswith("[") and req_key.endswith("]")
+
+
+def _tag_pair(req_key: str) -> Tuple[str, str]:
+    """`[/req_key]` or `[req_key]` -> (`[req_key]`, `[/req_key]`)"""
+    if "/" in req_key:
+        return req_key.replace("/", ""), req_key
+    return req_key, f"{req_key[0]}/{req_key[1:]}"
+
+
+@lru_cache(maxsize=64)
+def _replace_pattern(sources: Tuple[str, ...]) -> re.Pattern:
+    return re.compile("|".join(re.escape(i) for i in sorted(sources, key=len, reverse=True)))
+
+
+def _repair_keys(output: str, req_keys: List[str], fixes: List[RepairFix]) -> str:
+    """Apply the case sensitivity, required key pair and special character repairs of all the keys.
+
+    The keys are looked up once, and an output which needs no repair is not scanned any further. The missing keys
+    share one lower-cased copy of the output, and their case fixes are applied in one substitution.
+    """
+    missing = [i for i in req_keys if i not in output]
+    tags = [_tag_pair(i) for i in req_keys if _is_tag(i)]
+    if not missing and all(left in output and right in output for left, right in tags):
+        return output
+
+    # case sensitivity: the first differently cased occurrence of a missing key is replaced everywhere
+    replacements: Dict[str, str] = {}
+    if missing:
+        lowered = output.lower()
+        for key in missing:
+            ix = lowered.find(key.lower())
+            if ix >= 0:
+                replacements.setdefault(output[ix : ix + len(key)], key)
+    if replacements:
+        pattern = _replace_pattern(tuple(replacements))
+        output = pattern.sub(lambda m: replacements[m.group()], output)
+        for source, key in replacements.items():
+            fixes.append(RepairFix(RepairType.CS, key, f"{source} -> {key}"))
+
+    for key in missing:
+        if key in output:
+            continue
+        if _is_tag(key) or "/" in key:
+            output = _repair_tag(output, key, fixes)
+    for left_key, right_key in tags:
+        if left_key not in output:  # the missing right keys are repaired above
+            output = _repair_tag(output, left_key, fixes)
+    return output
+
+
+def _repair_tag(output: str, req_key: str, fixes: List[RepairFix]) -> str:
+    if _is_tag(req_key):
+        repaired = repair_required_key_pair_missing(output, req_key)
+        if repaired != output:
+            left_key, right_key = _tag_pair(req_key)
+            fixes.append(RepairFix(RepairType.RKPM, req_key, f"{left_key} ... {right_key}"))
+            return repaired
+    repaired = repair_special_character_missing(output, req_key)
+    if repaired != output:
+        fixes.append(RepairFix(RepairType.SCM, req_key, f"{req_key.replace('/', '')} -> {req_key}"))
+    return repaired
+
+
+def _repair_json(output: str, fixes: List[RepairFix]) -> str:
+    """Apply `repair_json_format`, only the lines with a comment marker are tokenized."""
+    output = output.strip()
+    if output.startswith("[{"):
+        output = output[1:]
+        fixes.append(RepairFix(RepairType.JSON, None, "[{ -> {"))
+    elif output.endswith("}]"):
+        output = output[:-1]
+        fixes.append(RepairFix(RepairType.JSON, None, "}] -> }"))
+    elif output.startswith("{") and output.endswith("]"):
+        output = output[:-1] + "}"
+        fixes.append(RepairFix(RepairType.JSON, None, "{ ... ] -> { ... }"))
+
+    lines = {}  # start -> end of the lines with a comment marker
+    for marker in ["#", "//"]:
+        ix = output.find(marker)
+        while ix >= 0:
+            start = output.rfind("\n", 0, ix) + 1
+            end = output.find("\n", ix)
+            end = len(output) if end < 0 else end
+            lines[start] = end
+            ix = output.find(marker, end)
+    if not lines:
+        return output
+
+    parts, pos, comments = [], 0, 0
+    for start in sorted(lines):
+        end = lines[start]
+        for m in _JSON_TOKEN.finditer(output, start, end):
+            if m.group()[0] not in "\"'":
+                parts.append(output[pos : m.start()])
+                pos = end
+                comments += 1
+                break
+    parts.append(output[pos:])
+    if comments:
+        fixes.append(RepairFix(RepairType.JSON, None, f"{comments} comments removed"))
+    return "".join(parts)
+
+
+def repair_llm_output_with_report(
+    output: str, req_keys: list[str], repair_type: RepairType = None
+) -> Tuple[str, List[RepairFix]]:
+    """Repair the output like `repair_llm_raw_output` and report the fixes.
+
+    Unlike the chain of `_repair_llm_raw_output` calls, which rescans the whole output for each key and repair type,
+    the keys are repaired after a single scan for all of them, and the json format in a single tokenizing scan.
+
+    Args:
+        output: The llm output.
+        req_keys: The keys required in the output, None for the json format repair.
+        repair_type: The only repair to apply, all except the json format repair by default.
+
+    Returns:
+        The repaired output and the fixes applied.
+    """
+    fixes: List[RepairFix] = []
+    keys = [i for i in req_keys if i]
+    if repair_type in [None, RepairType.CS, RepairType.RKPM, RepairType.SCM] and keys:
+        if repair_type:
+            for key in keys:
+                output = _repair_llm_raw_output(output, key, repair_type=repair_type)
+        else:
+            output = _repair_keys(output, keys, fixes)
+    elif repair_type == RepairType.JSON:
+        output = _repair_json(output, fixes)
+    for fix in fixes:
+        logger.info(f"repair_llm_raw_output: {fix.repair_type.value}, {fix.detail}")
+    return output, fixes
+
+
 def repair_llm_raw_output(output: str, req_keys: list[str], repair_type: RepairType = None) -> str:
     """
     in open-source llm model, it usually can't follow the instruction well, the output may be incomplete,
@@ -173,8 +322,7 @@ def repair_llm_raw_output(output: str, req_keys: list[str], repair_type: RepairT
         return output
 
     # do the repairation usually for non-openai models
-    for req_key in req_keys:
-        output = _repair_llm_raw_output(output=output, req_key=req_key, repair_type=repair_type)
+    output, _ = repair_llm_output_with_report(output, req_keys=req_keys, repair_type=repair_type)
     return output
 
 
@@ -301,27 +449,26 @@ def retry_parse_json_text(output: str) -> Union[list, dict]:
 def extract_content_from_output(content: str, right_key: str = "[/CONTENT]"):
     """extract xxx from [CONTENT](xxx)[/CONTENT] using regex pattern"""
 
-    def re_extract_content(cont: str, pattern: str) -> str:
-        matches = re.findall(pattern, cont, re.DOTALL)
-        for match in matches:
-            if match:
-                cont = match
-                break
+    def re_extract_content(cont: str) -> str:
+        # the content between the first [CONTENT] and the last [/CONTENT], as the greedy regex used to match
+        lidx = cont.find("[CONTENT]")
+        ridx = cont.rfind("[/CONTENT]")
+        if 0 <= lidx and lidx + len("[CONTENT]") < ridx:
+            cont = cont[lidx + len("[CONTENT]") : ridx]
         return cont.strip()
 
     # TODO construct the extract pattern with the `right_key`
     raw_content = copy.deepcopy(content)
-    pattern = r"\[CONTENT\]([\s\S]*)\[/CONTENT\]"
-    new_content = re_extract_content(raw_content, pattern)
+    new_content = re_extract_content(raw_content)
 
     if not new_content.startswith("{"):
         # TODO find a more general pattern
         # # for `[CONTENT]xxx[CONTENT]xxxx[/CONTENT] situation
-        logger.warning(f"extract_content try another pattern: {pattern}")
+        logger.warning(f"extract_content try again with the right key: {right_key}")
         if right_key not in new_content:
             raw_content = copy.deepcopy(new_content + "\n" + right_key)
         # # pattern = r"\[CONTENT\](\s*\{.*?\}\s*)\[/CONTENT\]"
-        new_content = re_extract_content(raw_content, pattern)
+        new_content = re_extract_content(raw_content)
     else:
         if right_key in new_content:
             idx = new_content.find(right_key)
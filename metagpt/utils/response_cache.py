@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : response_cache.py
+@Desc    : Content-addressed cache of LLM responses with memory, sqlite and redis backends.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from metagpt.configs.response_cache_config import ResponseCacheConfig, ResponseCacheType
+from metagpt.const import CONFIG_ROOT
+from metagpt.logs import logger
+
+REDIS_KEY_PREFIX = "metagpt:llm_response:"
+
+
+def response_cache_key(model: str, messages: Any, temperature: float, tools: Any = None) -> str:
+    """Return the normalized hash of an LLM request."""
+    payload = {"model": model, "messages": messages, "temperature": temperature, "tools": tools}
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BaseResponseCache(ABC):
+    """Key-value store of serialized LLM responses."""
+
+    def __init__(self, ttl: int = 0, max_size: int = 0):
+        self.ttl = ttl
+        self.max_size = max_size
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str):
+        """Store a response"""
+
+    @abstractmethod
+    async def clear(self):
+        """Remove all cached responses"""
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+
+class MemoryResponseCache(BaseResponseCache):
+    """In-process LRU cache."""
+
+    def __init__(self, ttl: int = 0, max_size: int = 1024):
+        super().__init__(ttl=ttl, max_size=max_size)
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        created, value = item
+        if self._expired(created):
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._data[key] = (time.time(), value)
+        self._data.move_to_end(key)
+        while self.max_size and len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SqliteResponseCache(BaseResponseCache):
+    """On-disk cache shared by processes on the same machine, evicts the least recently used entries."""
+
+    def __init__(self, path: Path, ttl: int = 0, max_size: int = 1024):
+        super().__init__(ttl=ttl, max_size=max_size)
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response (key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS response_accessed ON response (accessed)")
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str):
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value)
+
+    async def clear(self):
+        async with self._lock:
+            await asyncio.to_thread(self._conn.execute, "DELETE FROM response")
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value, created FROM response WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self._expired(created):
+            self._conn.execute("DELETE FROM response WHERE key = ?", (key,))
+            return None
+        self._conn.execute("UPDATE response SET accessed = ? WHERE key = ?", (time.time(), key))
+        return value
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO response (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+        if self.max_size:
+            self._conn.execute(
+                "DELETE FROM response WHERE key IN "
+                "(SELECT key FROM response ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class RedisResponseCache(BaseResponseCache):
+    """Cache shared across machines through `metagpt.utils.redis.Redis`, size is bounded by the redis server."""
+
+    def __init__(self, redis, ttl: int = 0):
+        super().__init__(ttl=ttl)
+        self.redis = redis
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.redis.get(REDIS_KEY_PREFIX + key)
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str):
+        await self.redis.set(REDIS_KEY_PREFIX + key, value, timeout_sec=self.ttl or None)
+
+    async def clear(self):
+        logger.warning("RedisResponseCache.clear is not supported, entries expire by ttl")
+
+
+_RESPONSE_CACHES: dict[str, BaseResponseCache] = {}
+
+
+def get_response_cache(config: ResponseCacheConfig) -> BaseResponseCache:
+    """Return the shared cache instance of `config`, so all LLM instances with the same settings hit the same data."""
+    key = config.model_dump_json()
+    cache = _RESPONSE_CACHES.get(key)
+    if cache is not None:
+        return cache
+
+    if config.api_type == ResponseCacheType.SQLITE:
+        path = config.path or CONFIG_ROOT / "llm_response_cache.db"
+        cache = SqliteResponseCache(path=path, ttl=config.ttl, max_size=config.max_size)
+    elif config.api_type == ResponseCacheType.REDIS:
+        from metagpt.utils.redis import Redis
+
+        if not config.redis:
+            raise ValueError("`response_cache.redis` is required by the redis response cache")
+        cache = RedisResponseCache(Redis(config.redis), ttl=config.ttl)
+    else:
+        cache = MemoryResponseCache(ttl=config.ttl, max_size=config.max_size)
+    _RESPONSE_CACHES[key] = cache
+    return cache
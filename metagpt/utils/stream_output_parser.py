@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : stream_output_parser.py
+@Desc    : Incremental parser of the streamed LLM output of an ActionNode.
+    The chunks are fed as they arrive, and each top-level field is parsed and validated as soon as the text after it
+    shows that it is complete, so that consumers can start on the early fields before the generation finishes. The
+    full output is still parsed once the generation finishes, which is the authoritative result.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from metagpt.logs import logger
+from metagpt.utils.common import OutputParser
+
+CONTENT_TAG = "[CONTENT]"
+CONTENT_END_TAG = "[/CONTENT]"
+_MARKDOWN_DELIMITER = re.compile(r"##|\[CONTENT\]|\[/CONTENT\]")
+_INVALID = object()
+
+
+class StreamOutputParser:
+    """Parse the fields of a json or markdown ActionNode output from the streamed chunks.
+
+    Args:
+        output_class: The model class generated for the output, each field is validated against its annotation.
+        mapping: The output data mapping of the node, used to parse markdown blocks by type.
+        schema: `json` or `markdown`.
+        on_field: Called with the key and the validated value of each field once it is complete.
+    """
+
+    def __init__(
+        self,
+        output_class: Type[BaseModel],
+        mapping: Optional[Dict] = None,
+        schema: str = "json",
+        on_field: Optional[Callable[[str, Any], None]] = None,
+    ):
+        self.output_class = output_class
+        self.mapping = mapping or {}
+        self.schema = schema
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self._adapters: Dict[str, TypeAdapter] = {}
+        self._chunks: List[str] = []
+        self._done = False
+        # json scanner state, the parts of the current key or value are kept until it ends
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_parts: Optional[List[str]] = None
+        self._value_parts: Optional[List[str]] = None
+        # markdown scanner state
+        self._tail = ""  # the end of the last chunk, which may be the beginning of a delimiter
+        self._block_parts: Optional[List[str]] = None
+
+    def feed(self, chunk: str):
+        """Consume the next chunk of the output, each character is scanned once."""
+        self._chunks.append(chunk)
+        if not chunk or self._done:
+            return
+        if self.schema == "json":
+            self._scan_json(chunk)
+        else:
+            self._scan_markdown(chunk)
+
+    @property
+    def text(self) -> str:
+        """The output fed so far."""
+        return "".join(self._chunks)
+
+    def partial(self) -> BaseModel:
+        """Return an instance of the output class holding the fields completed so far, without validating it."""
+        return self.output_class.model_construct(**self.fields)
+
+    def _scan_json(self, chunk: str):
+        start = 0  # the beginning of the part of the chunk in the current key or value
+        for i, c in enumerate(chunk):
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_parts is not None:
+                        self._key_parts.append(chunk[start : i + 1])
+                        self._key = self._loads("".join(self._key_parts))
+                        self._key_parts = None
+                continue
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_parts is None:
+                    self._key_parts, start = [], i
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end_json_value(chunk[start:i])
+                    self._done = True
+                    return
+            elif c == ":" and self._depth == 1 and self._value_parts is None:
+                self._value_parts, start = [], i + 1
+            elif c == "," and self._depth == 1:
+                self._end_json_value(chunk[start:i])
+        parts = self._key_parts if self._key_parts is not None else self._value_parts
+        if parts is not None:
+            parts.append(chunk[start:])
+
+    def _end_json_value(self, tail: str):
+        key, parts = self._key, self._value_parts
+        self._key, self._value_parts = None, None
+        if not isinstance(key, str) or parts is None:
+            return
+        parts.append(tail)
+        value = self._loads("".join(parts))
+        if value is not _INVALID:
+            self._complete(key, value)
+
+    def _scan_markdown(self, chunk: str):
+        text = self._tail + chunk
+        start = 0
+        for match in _MARKDOWN_DELIMITER.finditer(text):
+            if self._block_parts is not None:
+                self._block_parts.append(text[start : match.start()])
+            start = match.end()
+            delimiter = match.group()
+            if delimiter == CONTENT_TAG:
+                self._block_parts = None
+                continue
+            self._end_markdown_block()
+            if delimiter == CONTENT_END_TAG:
+                self._done = True
+                return
+            self._block_parts = []
+        # keep back what may be the beginning of a delimiter split across chunks
+        end = max(start, len(text) - len(CONTENT_END_TAG) + 1)
+        if self._block_parts is not None:
+            self._block_parts.append(text[start:end])
+        self._tail = text[end:]
+
+    def _end_markdown_block(self):
+        parts, self._block_parts = self._block_parts, None
+        if parts is None:
+            return
+        block = "".join(parts)
+        if "\n" not in block.strip(" "):
+            return
+        title = block.split("\n", 1)[0].strip().removesuffix(":").strip()
+        if title not in self.output_class.model_fields:
+            return
+        parsed = OutputParser.parse_data_with_mapping("##" + block, {title: self.mapping.get(title)})
+        if title in parsed:
+            self._complete(title, parsed[title])
+
+    def _complete(self, key: str, value: Any):
+        field = self.output_class.model_fields.get(key)
+        if field is None:
+            return
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            adapter = self._adapters[key] = TypeAdapter(field.annotation)
+        try:
+            value = adapter.validate_python(value)
+        except ValidationError as e:
+            logger.debug(f"Streamed field {key} is invalid, wait for the full output: {e}")
+            return
+        self.fields[key] = value
+        if self.on_field:
+            self.on_field(key, value)
+
+    @staticmethod
+    def _loads(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return _INVALID
@@ -10,6 +10,11 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
 import tiktoken
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionChunk
@@ -375,13 +380,66 @@ SPARK_TOKENS = {
 }
 
 
-def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
-    """Return the number of tokens used by a list of messages."""
+TOKEN_COUNT_CACHE_SIZE = 4096
+# Shorter texts are encoded directly, hashing them costs about as much as encoding
+TOKEN_COUNT_CACHE_MIN_LENGTH = 256
+
+_token_count_cache: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+_token_count_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of the model, resolved once per model."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens_batch(texts: list[str], model: str = "gpt-3.5-turbo-0125") -> list[int]:
+    """Return the number of tokens of each text.
+
+    The same system prompts and context blocks are counted again and again, so the counts of long texts are kept in
+    an LRU cache keyed by the content hash.
+    """
+    encoding = get_encoding(model)
+    counts = [0] * len(texts)
+    pending: dict[int, str] = {}  # index of text: text to encode
+    keys: dict[int, tuple[str, bytes]] = {}
+    with _token_count_cache_lock:
+        for i, text in enumerate(texts):
+            if len(text) >= TOKEN_COUNT_CACHE_MIN_LENGTH:
+                key = (encoding.name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+                count = _token_count_cache.get(key)
+                if count is not None:
+                    _token_count_cache.move_to_end(key)
+                    counts[i] = count
+                    continue
+                keys[i] = key
+            pending[i] = text
+
+    # `encoding.encode_batch` starts a thread pool per call, which costs more than it saves for a few messages
+    pending_counts = {i: len(encoding.encode(text)) for i, text in pending.items()}
+    with _token_count_cache_lock:
+        for i, count in pending_counts.items():
+            counts[i] = count
+            if i in keys:
+                _token_count_cache[keys[i]] = counts[i]
+        while len(_token_count_cache) > TOKEN_COUNT_CACHE_SIZE:
+            _token_count_cache.popitem(last=False)
+    return counts
+
+
+def clear_token_count_cache():
+    """Remove all cached token counts"""
+    with _token_count_cache_lock:
+        _token_count_cache.clear()
+
+
+def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
+    """Return the number of tokens used by a list of messages."""
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -436,6 +494,7 @@ def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
             f"for information on how messages are converted to tokens."
         )
     num_tokens = 0
+    contents = []
     for message in messages:
         num_tokens += tokens_per_message
         for key, value in message.items():
@@ -445,9 +504,10 @@ def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
                 for item in value:
                     if isinstance(item, dict) and item.get("type") in ["text"]:
                         content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
+            contents.append(content)
             if key == "name":
                 num_tokens += tokens_per_name
+    num_tokens += sum(count_tokens_batch(contents, model))
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
@@ -463,12 +523,7 @@ def count_output_tokens(string: str, model: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+    return count_tokens_batch([string], model)[0]
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
@@ -5,6 +5,8 @@
 @Author  : alexanderwu
 @File    : test_action_node.py
 """
+import asyncio
+import json
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -15,6 +17,7 @@ from metagpt.actions import Action
 from metagpt.actions.action_node import ActionNode, ReviewMode, ReviseMode
 from metagpt.environment import Environment
 from metagpt.llm import LLM
+from metagpt.logs import log_llm_stream
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.team import Team
@@ -98,6 +101,78 @@ async def test_action_node_two_layer():
     assert "579" in answer2.content
 
 
+@pytest.mark.asyncio
+async def test_action_node_complex_fill_concurrently(mocker):
+    running = 0
+    max_running = 0
+
+    async def mock_aask(self, prompt, *args, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        key = next(f"key{i}" for i in range(10) if f'"key{i}"' in prompt)
+        return f"[CONTENT]{json.dumps({key: key})}[/CONTENT]"
+
+    def new_root() -> ActionNode:
+        nodes = [ActionNode(key=f"key{i}", expected_type=str, instruction="", example="") for i in range(10)]
+        return ActionNode.from_children(key="root", nodes=nodes)
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_aask)
+    root = new_root()
+
+    await root.fill(context="", llm=LLM(), schema="json", strgy="complex", max_concurrency=4)
+    assert max_running == 4
+    assert root.instruct_content.model_dump() == {f"key{i}": f"key{i}" for i in range(10)}
+    assert list(root.instruct_content.model_dump()) == [f"key{i}" for i in range(10)]
+
+    # the fills of several nodes with the same llm share its limit
+    running = max_running = 0
+    llm = LLM()
+    llm.config = llm.config.model_copy(update={"max_concurrency": 3})
+    await asyncio.gather(*[new_root().fill(context="", llm=llm, schema="json", strgy="complex") for _ in range(2)])
+    assert max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_action_node_fill_streaming(mocker):
+    output = '[CONTENT]\n{"Language": "en_us", "Requirement Pool": [["P0", "a"]], "Anything UNCLEAR": ""}\n[/CONTENT]'
+    streamed = []
+
+    async def mock_aask(self, prompt, *args, stream=None, **kwargs):
+        assert stream
+        for i in range(0, len(output), 7):
+            log_llm_stream(output[i : i + 7])
+            streamed.append(output[i : i + 7])
+            await asyncio.sleep(0)
+        return output
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_aask)
+    nodes = [
+        ActionNode(key="Language", expected_type=str, instruction="", example=""),
+        ActionNode(key="Requirement Pool", expected_type=List[List[str]], instruction="", example=""),
+        ActionNode(key="Anything UNCLEAR", expected_type=str, instruction="", example=""),
+    ]
+    node = ActionNode.from_children(key="root", nodes=nodes)
+    fields = []
+
+    def on_field(key, value):
+        assert getattr(node, "instruct_content", None) is None
+        fields.append((key, value, len(streamed)))
+
+    await node.fill(context="", llm=LLM(), schema="json", on_field=on_field)
+
+    assert [(k, v) for k, v, _ in fields] == [
+        ("Language", "en_us"),
+        ("Requirement Pool", [["P0", "a"]]),
+        ("Anything UNCLEAR", ""),
+    ]
+    # the early fields were available before the generation finished
+    assert fields[0][2] < len(streamed) - 1
+    assert node.instruct_content.model_dump() == {k: v for k, v, _ in fields}
+
+
 @pytest.mark.asyncio
 async def test_action_node_review():
     key = "Project Name"
@@ -243,6 +318,33 @@ def test_create_model_class_with_mapping():
     assert value == ["game.py", "app.py", "static/css/styles.css", "static/js/script.js", "templates/index.html"]
 
 
+def test_action_node_compiled_cache(mocker):
+    node_a = ActionNode(key="reasoning", expected_type=str, instruction="reasoning step by step", example="")
+    node_b = ActionNode(key="answer", expected_type=str, instruction="the final answer", example="")
+    root = ActionNode.from_children(key="detail answer", nodes=[node_a, node_b])
+
+    prompt = root.compile(context="123", schema="json", mode="auto")
+    output_class = root.create_class()
+    mapping = root.get_mapping(mode="auto")
+    spy = mocker.spy(ActionNode, "_compile_f")
+    assert root.compile(context="123", schema="json", mode="auto") == prompt
+    assert root.create_class() is output_class
+    assert root.get_mapping(mode="auto") == mapping
+    assert spy.call_count == 0
+
+    # the cached mapping is not modified through the returned copies
+    mapping.pop("answer")
+    assert "answer" in root.get_mapping(mode="auto")
+
+    node_b.instruction = "the final answer in number"
+    assert "the final answer in number" in root.compile(context="123", schema="json", mode="auto")
+    assert root.get_mapping(mode="auto")["answer"][1].description == "the final answer in number"
+    assert root.create_class().model_fields["answer"].description == "the final answer in number"
+
+    root.add_child(ActionNode(key="unit", expected_type=str, instruction="the unit", example=""))
+    assert "unit" in root.create_class().model_fields
+
+
 @pytest.mark.asyncio
 async def test_action_node_with_image(mocker):
     # add a mock to update model in unittest, due to the gloabl MockLLM
@@ -4,7 +4,10 @@
 
 from typing import List
 
+from pydantic import Field
+
 from metagpt.actions.action_node import ActionNode
+from metagpt.actions.action_outcls_registry import mapping_key
 
 
 def test_action_outcls_registry():
@@ -44,3 +47,18 @@ def test_action_outcls_registry():
     outcls6 = ActionNode.create_model_class(class_name, out_mapping)
     outinst6 = outcls6(**out_data2)
     assert outinst5 == outinst6
+
+
+def test_mapping_key():
+    mapping = {"field": (List[str], Field(default=["a"], description="desc")), "nested": {"field1": (str, ...)}}
+    same = {"nested": {"field1": (str, ...)}, "field": (list[str], Field(default=["a"], description="desc"))}
+    assert mapping_key(mapping) == mapping_key(same)
+    assert hash(mapping_key(mapping))
+
+    other = {"field": (List[str], Field(default=["a"], description="other")), "nested": {"field1": (str, ...)}}
+    assert mapping_key(mapping) != mapping_key(other)
+
+    for kwargs in [{"examples": [["b"]]}, {"title": "Field"}, {"json_schema_extra": {"x": 1}}]:
+        field = Field(default=["a"], description="desc", **kwargs)
+        other = {"field": (List[str], field), "nested": {"field1": (str, ...)}}
+        assert mapping_key(mapping) != mapping_key(other)
@@ -2,12 +2,16 @@
 # -*- coding: utf-8 -*-
 # @Desc   : the unittest of ExtEnv&Env
 
+import json
 from typing import Any, Optional
 
 import pytest
 
+from metagpt.actions import Action, UserRequirement
+from metagpt.actions.fix_bug import FixBug
 from metagpt.environment.api.env_api import EnvAPIAbstract
 from metagpt.environment.base_env import (
+    EnvHistory,
     Environment,
     env_read_api_registry,
     env_write_api_registry,
@@ -15,6 +19,8 @@ from metagpt.environment.base_env import (
     mark_as_writeable,
 )
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
+from metagpt.roles import Role
+from metagpt.schema import Message
 
 
 class ForTestEnv(Environment):
@@ -69,3 +75,136 @@ async def test_ext_env():
 
     assert await env.read_from_api("read_api_no_param") == 15
     assert await env.read_from_api(EnvAPIAbstract(api_name="read_api", kwargs={"a": 5, "b": 5})) == 10
+
+
+class ActionWrite(Action):
+    async def run(self, messages: list[Message]) -> str:
+        return "written"
+
+
+class ActionReview(Action):
+    async def run(self, messages: list[Message]) -> str:
+        return "reviewed"
+
+
+class CountingRole(Role):
+    run_count: int = 0
+
+    async def run(self, with_message=None):
+        self.run_count += 1
+        return await super().run(with_message)
+
+
+@pytest.mark.asyncio
+async def test_env_event_driven():
+    writer = CountingRole(name="Writer", profile="Writer")
+    writer.set_actions([ActionWrite])
+    writer._watch([UserRequirement])
+    reviewer = CountingRole(name="Reviewer", profile="Reviewer")
+    reviewer.set_actions([ActionReview])
+    reviewer._watch([ActionWrite])
+    idle_roles = [CountingRole(name=f"Idle{i}", profile=f"Idle{i}") for i in range(20)]
+    for role in idle_roles:
+        role.set_actions([ActionReview])
+        role._watch([FixBug])
+
+    env = Environment(event_driven=True)
+    env.add_roles([writer, reviewer, *idle_roles])
+    await env.run()  # every role runs once after being added
+    assert env.is_idle
+
+    env.publish_message(Message(content="write something", cause_by=UserRequirement))
+    assert not env.is_idle
+    rounds = 0
+    while not env.is_idle:
+        await env.run()
+        rounds += 1
+
+    assert rounds == 2
+    assert writer.run_count == 2
+    assert reviewer.run_count == 2
+    assert all(role.run_count == 1 for role in idle_roles)
+    assert reviewer.rc.memory.get_by_action(ActionWrite)[0].content == "written"
+
+    # unwatched messages stay in the buffer until the role is woken up
+    assert not idle_roles[0].rc.msg_buffer.empty()
+    env.publish_message(Message(content="fix it", cause_by=FixBug, send_to=idle_roles[0].name))
+    await env.run()
+    assert idle_roles[0].run_count == 2
+    contents = [i.content for i in idle_roles[0].rc.memory.get()]
+    assert contents[:4] == ["write something", "written", "reviewed", "fix it"]
+
+
+class ProfileRole(CountingRole):
+    def is_interested(self, message: Message) -> bool:
+        return self.profile in message.send_to
+
+
+class EveryRoundRole(CountingRole):
+    run_every_round = True
+
+
+@pytest.mark.asyncio
+async def test_env_event_driven_custom_filter():
+    player = ProfileRole(name="Alice", profile="Player", addresses={"Alice", "Player"})
+    player.set_actions([ActionReview])
+    ticker = EveryRoundRole(name="Ticker", profile="Ticker")
+    ticker.set_actions([ActionReview])
+    env = Environment(event_driven=True)
+    env.add_roles([player, ticker])
+    await env.run()
+    assert env.is_idle
+
+    env.publish_message(Message(content="your turn", send_to="Player"))
+    assert not env.is_idle
+    await env.run()
+    assert player.run_count == 2
+    assert player.rc.memory.get()[-1].content == "reviewed"
+    assert ticker.run_count == 2
+    await env.run()
+    assert ticker.run_count == 3
+
+
+def test_env_routing_index():
+    alice = Role(name="Alice", profile="Alice")
+    bob = Role(name="Bob", profile="Bob")
+    env = Environment()
+    env.add_roles([alice, bob])
+
+    env.publish_message(Message(content="to alice", send_to="Alice"))
+    assert [i.content for i in alice.rc.msg_buffer.pop_all()] == ["to alice"]
+    assert bob.rc.msg_buffer.empty()
+
+    env.publish_message(Message(content="to all"))
+    assert alice.rc.msg_buffer.pop_all()[0].content == "to all"
+    assert bob.rc.msg_buffer.pop_all()[0].content == "to all"
+
+    env.publish_message(Message(content="to both", send_to={"Alice", "Bob", "Nobody"}))
+    assert len(alice.rc.msg_buffer.pop_all()) == 1
+    assert len(bob.rc.msg_buffer.pop_all()) == 1
+
+    alice.set_addresses({"Reviewer"})  # old addresses are unsubscribed
+    env.publish_message(Message(content="to alice", send_to="Alice"))
+    assert alice.rc.msg_buffer.empty()
+    env.publish_message(Message(content="to reviewer", send_to="Reviewer"))
+    assert alice.rc.msg_buffer.pop_all()[0].content == "to reviewer"
+
+
+def test_env_history(tmp_path):
+    history_path = tmp_path / "history.txt"
+    env = Environment(history=EnvHistory(maxlen=2), history_path=history_path)
+    for i in range(3):
+        env.publish_message(Message(content=f"msg {i}"))
+    env.publish_message(Message(content="line 1\nline 2"))
+
+    assert env.history == "\nuser: msg 2\nuser: line 1\nline 2"
+    assert len(env.history) == len(str(env.history))
+    env.archive(auto_archive=False)  # closes the history file
+    lines = history_path.read_text().splitlines()
+    assert [json.loads(i) for i in lines] == ["user: msg 0", "user: msg 1", "user: msg 2", "user: line 1\nline 2"]
+
+    data = env.model_dump()
+    assert data["history"] == ["user: msg 2", "user: line 1\nline 2"]
+    assert "history_path" not in data
+    assert Environment(**data).history.records == env.history.records
+    assert list(Environment(history="\nuser: msg 1\nuser: msg 2").history.records) == ["user: msg 1", "user: msg 2"]
@@ -55,3 +55,60 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_index():
+    memory = Memory()
+
+    message1 = Message(content="test message1", role="user1", sent_from="a", send_to={"b"})
+    message2 = Message(content="test message2", role="user2", sent_from="b", send_to={"a", "c"})
+    memory.add_batch([message1, message2, message1])
+    assert memory.count() == 2
+    assert memory.contains(message1)
+    assert memory.get_by_sent_from("a") == [message1]
+    assert memory.get_by_send_to("a") == [message2]
+    assert memory.get_by_send_to("d") == []
+
+    message3 = Message(content="test message3", role="user1")
+    assert memory.find_news([message1, message3]) == [message3]
+    assert memory.find_news([message1, message2, message3], k=1) == [message1, message3]
+
+    memory.delete(message1)
+    assert not memory.contains(message1)
+    assert memory.get_by_role("user1") == []
+    assert memory.get_by_send_to("b") == []
+    assert memory.get_by_action(UserRequirement) == [message2]
+
+
+def test_memory_index_after_deserialize():
+    memory = Memory()
+    message1 = Message(content="test message1", role="user1")
+    message2 = Message(content="test message2", role="user2")
+    memory.add_batch([message1, message2])
+
+    data = memory.model_dump()
+    assert set(data.keys()) == {"storage", "index", "ignore_id"}
+
+    new_memory = Memory(**data)
+    assert new_memory.count() == 2
+    assert new_memory.contains(message1)
+    assert [i.id for i in new_memory.get_by_role("user2")] == [message2.id]
+    new_memory.add(message1)
+    assert new_memory.count() == 2
+
+    # the index is rebuilt for the storage loaded without it
+    new_memory = Memory(storage=data["storage"])
+    assert not new_memory.get_by_action(UserRequirement)
+    new_memory.rebuild_index()
+    assert new_memory.get_by_action(UserRequirement) == new_memory.storage
+    new_memory.delete(new_memory.storage[-1])
+    assert [i.id for i in new_memory.get_by_action(UserRequirement)] == [message1.id]
+
+
+def test_memory_ignore_id():
+    memory = Memory(ignore_id=True)
+    memory.add(Message(content="test message1", role="user1"))
+    memory.add(Message(content="test message1", role="user1"))
+    memory.add(Message(content="test message2", role="user1"))
+    assert memory.count() == 2
+    assert len(memory.get_by_role("user1")) == 2
@@ -14,6 +14,7 @@ from metagpt.actions import UserRequirement, WritePRD
 from metagpt.actions.action_node import ActionNode
 from metagpt.const import DATA_PATH
 from metagpt.memory.memory_storage import MemoryStorage
+from metagpt.rag.embeddings import LocalEmbedding
 from metagpt.schema import Message
 from tests.metagpt.memory.mock_text_embed import (
     mock_openai_aembed_document,
@@ -99,3 +100,22 @@ async def test_actionout_message(mocker):
 
     memory_storage.clean()
     assert memory_storage.is_initialized is False
+
+
+@pytest.mark.asyncio
+async def test_local_embedding_messages():
+    role_id = "UTUser3(Local)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+
+    memory_storage = MemoryStorage(embedding=LocalEmbedding())
+    memory_storage.recover_memory(role_id)
+
+    messages = [Message(role="User", content=i["text"], cause_by=UserRequirement) for i in text_embed_arr[:4]]
+    memory_storage.add_batch(messages)
+
+    new_messages = await memory_storage.search_similar(messages[2])
+    assert [i.content for i in new_messages] == [messages[2].content]
+    new_messages = await memory_storage.search_similar(Message(role="User", content="Deploy the web server"))
+    assert len(new_messages) == 0
+
+    memory_storage.clean()
@@ -0,0 +1,79 @@
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from metagpt.configs.embedding_config import EmbeddingConfig
+from metagpt.rag.embeddings.cached import (
+    CachedEmbedding,
+    EmbeddingCache,
+    embedding_model_key,
+    wrap_embedding,
+)
+
+
+class CountingEmbedding(MockEmbedding):
+    calls: list = []
+
+    def _get_text_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(i)), 1.0] for i in texts]
+
+    async def _aget_text_embeddings(self, texts):
+        return self._get_text_embeddings(texts)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embedding_cache.db")
+    yield cache
+    cache.close()
+
+
+def new_embedding(cache, batch_size=2):
+    return CachedEmbedding(CountingEmbedding(embed_dim=2, embed_batch_size=batch_size, calls=[]), cache=cache)
+
+
+def test_cached_embedding(cache):
+    embedding = new_embedding(cache)
+    texts = ["a", "bb", "a", "ccc", "dddd"]
+
+    assert embedding.get_text_embedding_batch(texts) == [[float(len(i)), 1.0] for i in texts]
+    assert sorted(sum(embedding.embed_model.calls, [])) == ["a", "bb", "ccc", "dddd"]  # deduplicated
+    assert all(len(i) <= 2 for i in embedding.embed_model.calls)
+    assert (embedding.hits, embedding.misses) == (1, 4)
+
+    # the cache is shared by the instances of the same model
+    embedding = new_embedding(cache)
+    assert embedding.get_text_embedding_batch(texts + ["eeeee"]) == [[float(len(i)), 1.0] for i in texts + ["eeeee"]]
+    assert embedding.embed_model.calls == [["eeeee"]]
+    assert embedding.get_text_embedding("bb") == [2.0, 1.0]
+    assert (embedding.hits, embedding.misses) == (6, 1)
+
+    # other models miss
+    assert embedding_model_key(embedding.embed_model) != embedding_model_key(MockEmbedding(embed_dim=2))
+    assert not cache.get_many(embedding_model_key(MockEmbedding(embed_dim=2)), ["a"])
+
+
+@pytest.mark.asyncio
+async def test_cached_embedding_async(cache):
+    embedding = new_embedding(cache)
+    texts = [str(i) * 3 for i in range(7)]
+
+    assert await embedding.aget_text_embedding_batch(texts) == [[3.0, 1.0]] * 7
+    assert len(embedding.embed_model.calls) == 4
+    assert await embedding.aget_text_embedding_batch(texts) == [[3.0, 1.0]] * 7
+    assert len(embedding.embed_model.calls) == 4
+
+
+def test_wrap_embedding(tmp_path):
+    embed_model = MockEmbedding(embed_dim=2)
+    assert wrap_embedding(embed_model, EmbeddingConfig()) is embed_model
+
+    config = EmbeddingConfig(cache=True, cache_path=str(tmp_path / "cache.db"), max_concurrency=2)
+    wrapped = wrap_embedding(embed_model, config)
+    assert isinstance(wrapped, CachedEmbedding)
+    assert wrapped.embed_model is embed_model
+    assert wrapped.max_concurrency == 2
+    assert wrap_embedding(wrapped, config) is wrapped
+
+    with pytest.raises(TypeError):
+        wrap_embedding(embed_model, EmbeddingConfig.model_construct(cache=True, cache_path=object()))
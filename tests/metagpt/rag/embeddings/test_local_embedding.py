@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from metagpt.rag.embeddings.local import LocalEmbedding
+
+
+def cosine(a, b) -> float:
+    return float(np.dot(a, b))
+
+
+def test_hashing_embedding():
+    embedding = LocalEmbedding(dimensions=256, num_workers=2)
+    texts = ["Write a cli snake game", "Write a game of cli snake", "Write a 2048 web game", "Battle City"]
+
+    vectors = embedding.get_text_embedding_batch(texts)
+    assert np.array(vectors).shape == (4, 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert cosine(vectors[0], vectors[1]) > cosine(vectors[0], vectors[2]) > cosine(vectors[0], vectors[3])
+
+    # deterministic, and the same in a batch split across threads as alone
+    assert np.allclose(LocalEmbedding(dimensions=256).get_text_embedding(texts[2]), vectors[2])
+    assert np.allclose(embedding.get_query_embedding(texts[3]), vectors[3])
+    assert embedding.get_text_embedding("") == [0.0] * 256
+
+
+@pytest.mark.asyncio
+async def test_hashing_embedding_async():
+    embedding = LocalEmbedding()
+    texts = [f"text {i}" for i in range(10)]
+    assert np.allclose(await embedding.aget_text_embedding_batch(texts), embedding.get_text_embedding_batch(texts))
+    assert len(await embedding.aget_query_embedding("text")) == 512
+
+
+def test_onnx_embedding(mocker, tmp_path):
+    class Encoding:
+        def __init__(self, ids):
+            self.ids = ids + [0] * (3 - len(ids))
+            self.attention_mask = [1] * len(ids) + [0] * (3 - len(ids))
+            self.type_ids = [0] * 3
+
+    class Input:
+        name = "input_ids"
+
+    session = mocker.MagicMock()
+    session.get_inputs.return_value = [Input()]
+    session.get_outputs.return_value = [mocker.MagicMock(shape=["batch", "sequence", 2])]
+    session.run.side_effect = lambda _, feeds: [np.stack([feeds["input_ids"], np.ones((2, 3))], axis=-1).astype(float)]
+    tokenizer = mocker.MagicMock()
+    tokenizer.encode_batch.return_value = [Encoding([3, 4]), Encoding([1, 2, 6])]
+    mocker.patch("onnxruntime.InferenceSession", return_value=session)
+    mocker.patch("tokenizers.Tokenizer.from_file", return_value=tokenizer)
+
+    embedding = LocalEmbedding(model_name=str(tmp_path))
+    assert embedding.dimensions == 2
+    vectors = embedding.get_text_embedding_batch(["a b", "c d e"])
+
+    # the padding is excluded from the mean pooling
+    expected = np.array([[3.5, 1.0], [3.0, 1.0]])
+    assert np.allclose(vectors, expected / np.linalg.norm(expected, axis=1, keepdims=True))
+    assert "token_type_ids" not in session.run.call_args.args[1]
+
+
+def test_onnx_embedding_pooled_output(mocker, tmp_path):
+    class Encoding:
+        ids = [1, 2]
+        attention_mask = [1, 1]
+        type_ids = [0, 0]
+
+    session = mocker.MagicMock()
+    session.get_inputs.return_value = []
+    session.get_outputs.return_value = [mocker.MagicMock(shape=["batch", "dimensions"])]
+    session.run.side_effect = lambda _, feeds: [np.tile([3.0, 4.0, 0.0], (len(feeds["input_ids"]), 1))]
+    tokenizer = mocker.MagicMock()
+    tokenizer.encode_batch.side_effect = lambda texts: [Encoding() for _ in texts]
+    mocker.patch("onnxruntime.InferenceSession", return_value=session)
+    mocker.patch("tokenizers.Tokenizer.from_file", return_value=tokenizer)
+
+    embedding = LocalEmbedding(model_name=str(tmp_path))
+    # the symbolic output dimension is found by embedding a text
+    assert embedding.dimensions == 3
+    assert np.allclose(embedding.get_text_embedding_batch(["a", "b"]), [[0.6, 0.8, 0.0]] * 2)
@@ -1,4 +1,5 @@
 import json
+import os
 
 import pytest
 from llama_index.core import VectorStoreIndex
@@ -7,10 +8,16 @@ from llama_index.core.llms import MockLLM
 from llama_index.core.schema import Document, NodeWithScore, TextNode
 
 from metagpt.rag.engines import SimpleEngine
+from metagpt.rag.ingestion import IngestionManifest
 from metagpt.rag.parsers import OmniParse
 from metagpt.rag.retrievers import SimpleHybridRetriever
 from metagpt.rag.retrievers.base import ModifiableRAGRetriever, PersistableRAGRetriever
-from metagpt.rag.schema import BM25RetrieverConfig, ObjectNode
+from metagpt.rag.schema import (
+    BM25RetrieverConfig,
+    FAISSIndexConfig,
+    FAISSRetrieverConfig,
+    ObjectNode,
+)
 
 
 class TestSimpleEngine:
@@ -241,6 +248,71 @@ class TestSimpleEngine:
             assert isinstance(node, TextNode)
             assert "is_obj" in node.metadata
 
+    def test_sync_docs(self, mocker, tmp_path, mock_llm):
+        # Setup
+        class CountingEmbedding(MockEmbedding):
+            texts: list = []
+
+            def _get_text_embeddings(self, texts):
+                self.texts.extend(texts)
+                return [[float(len(i)), 1.0] for i in texts]
+
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        for i in range(5):
+            (docs / f"doc{i}.txt").write_text(f"document {i}")
+        persist_dir = tmp_path / "index"
+        embedding = CountingEmbedding(embed_dim=2, texts=[])
+
+        def load_engine():
+            return SimpleEngine.from_index(
+                FAISSIndexConfig(persist_path=persist_dir),
+                embed_model=embedding,
+                llm=mock_llm,
+                retriever_configs=[FAISSRetrieverConfig(dimensions=2, similarity_top_k=10)],
+            )
+
+        def ingested_files(engine):
+            return sorted(os.path.basename(i.metadata["file_path"]) for i in engine.retrieve("document"))
+
+        # Exec: crash after persisting the second batch
+        engine = SimpleEngine.from_objs(
+            retriever_configs=[FAISSRetrieverConfig(dimensions=2, similarity_top_k=10)],
+            embed_model=embedding,
+            llm=mock_llm,
+        )
+        commit = IngestionManifest.commit
+
+        def crash_on_second_commit(manifest, keys):
+            if any(i.done for i in manifest.files.values()):
+                raise RuntimeError("crash")
+            commit(manifest, keys)
+
+        mocker.patch.object(IngestionManifest, "commit", crash_on_second_commit)
+        with pytest.raises(RuntimeError):
+            engine.sync_docs(persist_dir, input_dir=str(docs), batch_size=2)
+        mocker.stopall()
+
+        # Assert: resume from the pending batch
+        plan = load_engine().sync_docs(persist_dir, input_dir=str(docs), batch_size=2)
+        assert [os.path.basename(i) for i in plan.files] == ["doc2.txt", "doc3.txt", "doc4.txt"]
+        assert len(plan.stale_node_ids) == 2
+
+        engine = load_engine()
+        assert ingested_files(engine) == [f"doc{i}.txt" for i in range(5)]
+
+        # Exec: change, delete and add files
+        embedding.texts.clear()
+        (docs / "doc1.txt").write_text("document 1 changed")
+        (docs / "doc2.txt").unlink()
+        (docs / "doc5.txt").write_text("document 5")
+        plan = engine.sync_docs(persist_dir, input_dir=str(docs))
+
+        # Assert: only the new and changed files are embedded
+        assert len(embedding.texts) == 2
+        assert len(plan.unchanged) == 3 and len(plan.removed) == 1
+        assert ingested_files(load_engine()) == ["doc0.txt", "doc1.txt", "doc3.txt", "doc4.txt", "doc5.txt"]
+
     def test_persist_successfully(self, mocker):
         # Mock
         mock_retriever = mocker.MagicMock(spec=PersistableRAGRetriever)
@@ -11,8 +11,11 @@ class TestRAGEmbeddingFactory:
         self.embedding_factory = RAGEmbeddingFactory()
 
     @pytest.fixture
-    def mock_config(self, mocker):
-        return mocker.patch("metagpt.rag.factories.embedding.config")
+    def mock_config(self, mocker, tmp_path):
+        mock_config = mocker.patch("metagpt.rag.factories.embedding.config")
+        mock_config.embedding.cache = False
+        mock_config.embedding.cache_path = str(tmp_path / "embedding_cache.db")
+        return mock_config
 
     @staticmethod
     def mock_openai_embedding(mocker):
@@ -30,6 +33,10 @@ class TestRAGEmbeddingFactory:
     def mock_ollama_embedding(mocker):
         return mocker.patch("metagpt.rag.factories.embedding.OllamaEmbedding")
 
+    @staticmethod
+    def mock_local_embedding(mocker):
+        return mocker.patch("metagpt.rag.factories.embedding.LocalEmbedding")
+
     @pytest.mark.parametrize(
         ("mock_func", "embedding_type"),
         [
@@ -39,6 +46,7 @@ class TestRAGEmbeddingFactory:
             (mock_azure_embedding, EmbeddingType.AZURE),
             (mock_gemini_embedding, EmbeddingType.GEMINI),
             (mock_ollama_embedding, EmbeddingType.OLLAMA),
+            (mock_local_embedding, EmbeddingType.LOCAL),
         ],
     )
     def test_get_rag_embedding(self, mock_func, embedding_type, mocker):
@@ -104,3 +112,16 @@ class TestRAGEmbeddingFactory:
     def test_raise_for_key(self):
         with pytest.raises(ValueError):
             self.embedding_factory._raise_for_key("key")
+
+    def test_get_rag_embedding_cached(self, mocker, mock_config):
+        # Mock
+        self.mock_openai_embedding(mocker)
+        mock_wrap = mocker.patch("metagpt.rag.factories.embedding.wrap_embedding")
+
+        # Exec
+        embedding = self.embedding_factory.get_rag_embedding(EmbeddingType.OPENAI)
+
+        # Assert
+        mock_wrap.assert_called_once()
+        assert mock_wrap.call_args.args[1] is mock_config.embedding
+        assert embedding is mock_wrap.return_value
@@ -6,18 +6,22 @@ from llama_index.core.schema import TextNode
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.vector_stores.elasticsearch import ElasticsearchStore
 
+from metagpt.config2 import config
+from metagpt.configs.embedding_config import EmbeddingType
+from metagpt.rag.embeddings import LocalEmbedding
 from metagpt.rag.factories.retriever import RetrieverFactory
 from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
 from metagpt.rag.retrievers.chroma_retriever import ChromaRetriever
 from metagpt.rag.retrievers.es_retriever import ElasticsearchRetriever
 from metagpt.rag.retrievers.faiss_retriever import FAISSRetriever
-from metagpt.rag.retrievers.hybrid_retriever import SimpleHybridRetriever
+from metagpt.rag.retrievers.hybrid_retriever import FusionMode, SimpleHybridRetriever
 from metagpt.rag.schema import (
     BM25RetrieverConfig,
     ChromaRetrieverConfig,
     ElasticsearchRetrieverConfig,
     ElasticsearchStoreConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
 
 
@@ -62,6 +66,27 @@ class TestRetrieverFactory:
 
         assert isinstance(retriever, FAISSRetriever)
 
+    def test_get_retriever_with_faiss_config_local_embedding(self, mocker, mock_nodes):
+        mocker.patch.object(config.embedding, "api_type", EmbeddingType.LOCAL)
+        mocker.patch.object(config.embedding, "dimensions", None)
+        faiss_config = FAISSRetrieverConfig()
+        assert faiss_config.dimensions == 0
+
+        retriever = self.retriever_factory.get_retriever(
+            configs=[faiss_config], nodes=mock_nodes, embed_model=LocalEmbedding(dimensions=64)
+        )
+
+        assert retriever._vector_store.client.d == 64
+
+    def test_get_retriever_with_faiss_config_unknown_dimensions(self, mocker, mock_nodes, mock_embedding):
+        mocker.patch.object(config.embedding, "api_type", EmbeddingType.LOCAL)
+        mocker.patch.object(config.embedding, "dimensions", None)
+
+        with pytest.raises(ValueError):
+            self.retriever_factory.get_retriever(
+                configs=[FAISSRetrieverConfig()], nodes=mock_nodes, embed_model=mock_embedding
+            )
+
     def test_get_retriever_with_bm25_config(self, mocker, mock_nodes):
         mock_config = BM25RetrieverConfig()
         mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
@@ -81,6 +106,22 @@ class TestRetrieverFactory:
 
         assert isinstance(retriever, SimpleHybridRetriever)
 
+    def test_get_retriever_with_hybrid_config(self, mocker, mock_nodes, mock_embedding):
+        mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
+        hybrid_config = HybridRetrieverConfig(mode=FusionMode.RECIPROCAL_RANK, weights=[0.3, 0.7], timeout=2)
+
+        retriever = self.retriever_factory.get_retriever(
+            configs=[FAISSRetrieverConfig(dimensions=1), BM25RetrieverConfig(), hybrid_config],
+            nodes=mock_nodes,
+            embed_model=mock_embedding,
+        )
+
+        assert isinstance(retriever, SimpleHybridRetriever)
+        assert len(retriever.retrievers) == 2
+        assert retriever.mode == FusionMode.RECIPROCAL_RANK
+        assert retriever.weights == [0.3, 0.7]
+        assert retriever.timeout == 2
+
     def test_get_retriever_with_chroma_config(self, mocker, mock_chroma_vector_store, mock_embedding):
         mock_config = ChromaRetrieverConfig(persist_path="/path/to/chroma", collection_name="test_collection")
         mock_chromadb = mocker.patch("metagpt.rag.factories.retriever.chromadb.PersistentClient")
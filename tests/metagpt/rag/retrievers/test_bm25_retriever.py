@@ -1,8 +1,15 @@
+import numpy as np
 import pytest
-from llama_index.core import VectorStoreIndex
-from llama_index.core.schema import Node
+from llama_index.core import StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import Node, TextNode
+from rank_bm25 import BM25Okapi
 
-from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
+from metagpt.rag.retrievers.bm25_retriever import (
+    BM25_PERSIST_FILENAME,
+    DynamicBM25Retriever,
+    IncrementalBM25,
+)
 
 
 class TestDynamicBM25Retriever:
@@ -10,16 +17,17 @@ class TestDynamicBM25Retriever:
     def setup(self, mocker):
         self.doc1 = mocker.MagicMock(spec=Node)
         self.doc1.get_content.return_value = "Document content 1"
+        self.doc1.node_id = "1"
         self.doc2 = mocker.MagicMock(spec=Node)
         self.doc2.get_content.return_value = "Document content 2"
+        self.doc2.node_id = "2"
         self.mock_nodes = [self.doc1, self.doc2]
 
         index = mocker.MagicMock(spec=VectorStoreIndex)
         index.storage_context.persist.return_value = "ok"
 
         mock_nodes = []
-        mock_tokenizer = mocker.MagicMock()
-        self.mock_bm25okapi = mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
+        mock_tokenizer = mocker.MagicMock(side_effect=lambda text: text.lower().split())
 
         self.retriever = DynamicBM25Retriever(nodes=mock_nodes, tokenizer=mock_tokenizer, index=index)
 
@@ -29,9 +37,106 @@ class TestDynamicBM25Retriever:
 
         # Assert
         assert len(self.retriever._nodes) == len(self.mock_nodes)
-        assert len(self.retriever._corpus) == len(self.mock_nodes)
-        self.retriever._tokenizer.assert_called()
-        self.mock_bm25okapi.assert_called()
+        assert len(self.retriever.bm25) == len(self.mock_nodes)
+        assert self.retriever._tokenizer.call_count == len(self.mock_nodes)
+        self.retriever._index.insert_nodes.assert_called_once()
 
-    def test_persist(self):
-        self.retriever.persist("")
+        # only the new nodes are tokenized
+        self.retriever._tokenizer.reset_mock()
+        self.retriever.add_nodes([TextNode(id_="3", text="Document 3")])
+        assert self.retriever._tokenizer.call_count == 1
+
+    def test_delete_nodes(self, mocker):
+        mock_delete_index_nodes = mocker.patch("metagpt.rag.retrievers.bm25_retriever.delete_index_nodes")
+        self.retriever.add_nodes(self.mock_nodes)
+
+        self.retriever.delete_nodes(["1"])
+
+        assert len(self.retriever.bm25) == 1
+        mock_delete_index_nodes.assert_called_once_with(self.retriever._index, ["1"])
+
+    def test_persist(self, tmp_path):
+        self.retriever.persist(str(tmp_path))
+        self.retriever._index.storage_context.persist.assert_called_once()
+        assert (tmp_path / BM25_PERSIST_FILENAME).exists()
+
+
+def new_nodes(count: int, start: int = 0) -> list[TextNode]:
+    words = ["apple", "banana", "cherry", "date", "elder", "fig", "grape"]
+    return [
+        TextNode(id_=str(i), text=" ".join(words[j % len(words)] for j in range(i % 5, i % 5 + i % 7 + 1)))
+        for i in range(start, start + count)
+    ]
+
+
+def test_incremental_bm25_matches_bm25okapi():
+    corpus = [i.get_content().split() for i in new_nodes(50)]
+    bm25 = IncrementalBM25()
+    for tokens in corpus:
+        bm25.add(tokens)
+    query = ["apple", "fig", "fig", "unknown"]
+    assert np.allclose(bm25.get_scores(query), BM25Okapi(corpus).get_scores(query))
+
+    for i in range(0, 50, 4):
+        bm25.delete(i, corpus[i])
+    live = [tokens for i, tokens in enumerate(corpus) if i % 4]
+    scores = bm25.get_scores(query)
+    assert np.isneginf(scores[::4]).all()
+    assert np.allclose(scores[np.isfinite(scores)], BM25Okapi(live).get_scores(query))
+
+    assert bm25.compact().tolist() == [i for i in range(50) if i % 4]
+    assert np.allclose(bm25.get_scores(query), BM25Okapi(live).get_scores(query))
+
+
+@pytest.mark.asyncio
+async def test_dynamic_bm25_retriever(tmp_path):
+    nodes = new_nodes(20)
+    retriever = DynamicBM25Retriever(nodes=nodes[:10], similarity_top_k=3)
+    retriever.add_nodes(nodes[10:])
+
+    expected = BM25Okapi([retriever._tokenizer(i.get_content()) for i in nodes])
+    scores = expected.get_scores(retriever._tokenizer("grape fig"))
+    want = sorted(range(20), key=lambda i: scores[i], reverse=True)[:3]
+    results = await retriever.aretrieve("grape fig")
+    assert [i.node.node_id for i in results] == [str(i) for i in want]
+
+    retriever.delete_nodes([str(want[0])])
+    results = await retriever.aretrieve("grape fig")
+    assert str(want[0]) not in [i.node.node_id for i in results]
+
+    # the persisted index is loaded for the same nodes, without tokenizing them
+    retriever.persist(str(tmp_path))
+    live = [i for i in nodes if i.node_id != str(want[0])]
+    loaded = DynamicBM25Retriever(nodes=live, similarity_top_k=3, persist_path=tmp_path, tokenizer=lambda x: 1 / 0)
+    assert len(loaded.bm25) == 19
+    assert np.allclose(loaded.bm25.get_scores(["grape"]), retriever.bm25.get_scores(["grape"]))
+
+    rebuilt = DynamicBM25Retriever(nodes=live[1:], persist_path=tmp_path)
+    assert len(rebuilt.bm25) == 18
+
+    # a node with the same id but new content is not matched by the persisted index
+    edited = [*live[:5], TextNode(id_=live[5].node_id, text="kiwi kiwi"), *live[6:]]
+    rebuilt = DynamicBM25Retriever(nodes=edited, similarity_top_k=1, persist_path=tmp_path)
+    assert (await rebuilt.aretrieve("kiwi"))[0].node.node_id == live[5].node_id
+
+
+def test_dynamic_bm25_retriever_delete_nodes_from_index(tmp_path):
+    nodes = new_nodes(6)
+    embed_model = MockEmbedding(embed_dim=4)
+    index = VectorStoreIndex(nodes, embed_model=embed_model)
+    retriever = DynamicBM25Retriever(nodes=list(nodes), index=index, similarity_top_k=6)
+
+    retriever.delete_nodes(["1", "4"])
+
+    live = ["0", "2", "3", "5"]
+    assert sorted(index.docstore.docs) == live
+    assert sorted(index.index_struct.nodes_dict.values()) == live
+    assert sorted(i.node.node_id for i in retriever.retrieve("apple banana")) == live
+    assert sorted(i.node.node_id for i in index.as_retriever(similarity_top_k=6).retrieve("apple")) == live
+
+    # the deletion is persisted with the index
+    retriever.persist(str(tmp_path))
+    storage_context = StorageContext.from_defaults(persist_dir=str(tmp_path))
+    loaded = load_index_from_storage(storage_context, embed_model=embed_model)
+    assert sorted(loaded.docstore.docs) == live
+    assert sorted(loaded.index_struct.nodes_dict.values()) == live
@@ -23,3 +23,42 @@ class TestFAISSRetriever:
         self.retriever.persist("")
 
         self.mock_index.storage_context.persist.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_delete_nodes():
+    import faiss
+    from llama_index.core import StorageContext, VectorStoreIndex
+    from llama_index.core.embeddings import MockEmbedding
+    from llama_index.core.schema import TextNode
+    from llama_index.vector_stores.faiss import FaissVectorStore
+
+    class LengthEmbedding(MockEmbedding):
+        def _get_text_embedding(self, text):
+            return [float(len(text)), 1.0]
+
+        def _get_query_embedding(self, query):
+            return self._get_text_embedding(query)
+
+    nodes = [TextNode(id_=str(i), text="x" * (i + 1)) for i in range(6)]
+    storage_context = StorageContext.from_defaults(vector_store=FaissVectorStore(faiss_index=faiss.IndexFlatL2(2)))
+    index = VectorStoreIndex(nodes, storage_context=storage_context, embed_model=LengthEmbedding(embed_dim=2))
+    retriever = FAISSRetriever(index, similarity_top_k=3)
+
+    retriever.delete_nodes(["0", "1"])
+
+    # the closest nodes are deleted, the next ones fill the top k
+    results = await retriever.aretrieve("x")
+    assert [i.node.node_id for i in results] == ["2", "3", "4"]
+    assert "0" not in index.docstore.docs
+
+    # the index is rebuilt once half of its vectors are deleted
+    retriever.delete_nodes(["3"])
+    assert index.vector_store.client.ntotal == 3
+    assert index.index_struct.nodes_dict == {"0": "2", "1": "4", "2": "5"}
+    results = await retriever.aretrieve("x")
+    assert [i.node.node_id for i in results] == ["2", "4", "5"]
+
+    retriever.add_nodes([TextNode(id_="6", text="x")])
+    results = await retriever.aretrieve("x")
+    assert [i.node.node_id for i in results] == ["6", "2", "4"]
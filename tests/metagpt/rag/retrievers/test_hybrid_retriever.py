@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 from llama_index.core.schema import NodeWithScore, TextNode
 
-from metagpt.rag.retrievers import SimpleHybridRetriever
+from metagpt.rag.retrievers import FusionMode, SimpleHybridRetriever
+from metagpt.rag.retrievers.base import DeletableRAGRetriever, ModifiableRAGRetriever
 
 
 class TestSimpleHybridRetriever:
@@ -48,10 +51,76 @@ class TestSimpleHybridRetriever:
         node_scores = {node.node.node_id: node.score for node in results}
         assert node_scores["2"] == 0.95
 
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    @pytest.fixture
+    def slow_retrievers(self, mocker, calls):
+        def new_retriever(delay, ids):
+            async def aretrieve(query, **kwargs):
+                calls.append(("start", ids[0][0]))
+                await asyncio.sleep(delay)
+                calls.append(("end", ids[0][0]))
+                return [NodeWithScore(node=TextNode(id_=i, text=f"text {i}"), score=score) for i, score in ids]
+
+            retriever = mocker.MagicMock()
+            retriever.aretrieve = aretrieve
+            return retriever
+
+        return [
+            new_retriever(0.2, [("1", 10.0), ("2", 5.0), ("3", 0.0)]),
+            new_retriever(0.2, [("3", 0.9), ("2", 0.8)]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_concurrently(self, slow_retrievers, calls):
+        hybrid_retriever = SimpleHybridRetriever(*slow_retrievers)
+
+        results = await hybrid_retriever.aretrieve("test query")
+        # both retrievers are started before either of them returns
+        assert [i[0] for i in calls] == ["start", "start", "end", "end"]
+        assert [n.node.node_id for n in results] == ["1", "2", "3"]
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_reciprocal_rank(self, slow_retrievers):
+        hybrid_retriever = SimpleHybridRetriever(*slow_retrievers, mode=FusionMode.RECIPROCAL_RANK, rrf_k=1)
+
+        results = await hybrid_retriever.aretrieve("test query")
+        assert [n.node.node_id for n in results] == ["3", "2", "1"]
+        assert results[0].score == pytest.approx(1 / 4 + 1 / 2)
+        assert results[1].score == pytest.approx(1 / 3 + 1 / 3)
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_weighted_score(self, slow_retrievers):
+        hybrid_retriever = SimpleHybridRetriever(*slow_retrievers, mode=FusionMode.WEIGHTED_SCORE, weights=[0.3, 0.7])
+
+        results = await hybrid_retriever.aretrieve("test query")
+        assert [n.node.node_id for n in results] == ["3", "1", "2"]
+        assert results[0].score == pytest.approx(0.7)
+        assert results[1].score == pytest.approx(0.3)
+        assert results[2].score == pytest.approx(0.3 * 0.5)
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_timeout(self, slow_retrievers):
+        hybrid_retriever = SimpleHybridRetriever(*slow_retrievers, timeout=0.1)
+
+        assert await hybrid_retriever.aretrieve("test query") == []
+
+    def test_weights_mismatch(self, mock_retriever):
+        with pytest.raises(ValueError):
+            SimpleHybridRetriever(mock_retriever, weights=[1.0, 2.0])
+
     def test_add_nodes(self, mock_hybrid_retriever: SimpleHybridRetriever, mock_node):
         mock_hybrid_retriever.add_nodes([mock_node])
         mock_hybrid_retriever.retrievers[0].add_nodes.assert_called_once()
 
+    def test_delete_nodes(self, mocker):
+        deletable = mocker.MagicMock(spec=DeletableRAGRetriever)
+        modifiable = mocker.MagicMock(spec=ModifiableRAGRetriever)
+        SimpleHybridRetriever(deletable, modifiable).delete_nodes(["node_id"])
+        deletable.delete_nodes.assert_called_once_with(["node_id"])
+
     def test_persist(self, mock_hybrid_retriever: SimpleHybridRetriever):
         mock_hybrid_retriever.persist("")
         mock_hybrid_retriever.retrievers[0].persist.assert_called_once()
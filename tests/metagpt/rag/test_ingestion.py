@@ -0,0 +1,50 @@
+import os
+
+from metagpt.rag.ingestion import INGESTION_MANIFEST_FILENAME, IngestionManifest
+
+
+def test_ingestion_manifest(tmp_path):
+    files = [tmp_path / f"doc{i}.txt" for i in range(3)]
+    for i, file in enumerate(files):
+        file.write_text(f"doc {i}")
+    keys = [str(i.resolve()) for i in files]
+
+    manifest = IngestionManifest.load(tmp_path / "index")
+    plan = manifest.plan(files)
+    assert plan.files == keys and not plan.stale_node_ids
+
+    manifest.begin({keys[0]: ["a"], keys[1]: ["b", "c"], keys[2]: ["d"]})
+    manifest.commit(keys[:2])
+    assert (tmp_path / "index" / INGESTION_MANIFEST_FILENAME).exists()
+
+    # the pending file is ingested again, after its nodes are removed
+    manifest = IngestionManifest.load(tmp_path / "index")
+    plan = manifest.plan(files)
+    assert (plan.files, plan.stale_node_ids, plan.unchanged) == ([keys[2]], ["d"], keys[:2])
+    manifest.commit([keys[2]])
+
+    # touched files are compared by hash, changed and deleted files are replaced and removed
+    os.utime(files[0], (0, 1))
+    files[1].write_text("doc 1 changed")
+    files[2].unlink()
+    plan = manifest.plan(files[:2])
+    assert (plan.files, plan.stale_node_ids, plan.removed) == ([keys[1]], ["b", "c", "d"], [keys[2]])
+    assert plan.unchanged == [keys[0]]
+    assert manifest.files[keys[0]].mtime == 1
+
+
+def test_ingestion_manifest_change_during_ingestion(tmp_path):
+    file = tmp_path / "doc.txt"
+    file.write_text("doc")
+    key = str(file.resolve())
+
+    manifest = IngestionManifest.load(tmp_path / "index")
+    assert manifest.plan([file]).files == [key]
+    # the file changes after it is planned, while it is parsed
+    file.write_text("doc changed")
+    os.utime(file, (0, 1))
+    manifest.begin({key: ["a"]})
+    manifest.commit([key])
+
+    plan = manifest.plan([file])
+    assert (plan.files, plan.stale_node_ids) == ([key], ["a"])
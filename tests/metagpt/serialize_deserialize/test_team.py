@@ -8,11 +8,13 @@ from pathlib import Path
 
 import pytest
 
+from metagpt.actions import UserRequirement
 from metagpt.context import Context
 from metagpt.logs import logger
 from metagpt.roles import Architect, ProductManager, ProjectManager
-from metagpt.team import Team
-from metagpt.utils.common import write_json_file
+from metagpt.schema import Message
+from metagpt.team import MEMORY_JOURNAL_DIR, Team
+from metagpt.utils.common import read_json_file, write_json_file
 from tests.metagpt.serialize_deserialize.test_serdeser_base import (
     ActionOK,
     RoleA,
@@ -163,5 +165,42 @@ async def test_context(context):
     assert company.env.context.cost_manager.max_budget == context.cost_manager.max_budget
 
 
+def test_team_memory_journal(context, tmp_path):
+    company = Team(context=context)
+    role_c = RoleC()
+    company.hire([role_c])
+    memory = role_c.rc.memory
+    for i in range(3):
+        memory.add(Message(content=f"msg{i}", cause_by=ActionOK))
+
+    company.serialize(tmp_path)
+    team_info = read_json_file(tmp_path / "team.json")
+    assert "storage" not in team_info["env"]["roles"][role_c.profile]["rc"]["memory"]
+    journal = tmp_path / MEMORY_JOURNAL_DIR / team_info["memory_journals"][role_c.profile]
+    lines = journal.read_text().splitlines()
+    assert len(lines) == 3
+
+    # only the new messages are appended
+    memory.add(Message(content="msg3", cause_by=UserRequirement))
+    company.serialize(tmp_path)
+    assert journal.read_text().splitlines()[:3] == lines
+    assert len(journal.read_text().splitlines()) == 4
+
+    new_company = Team.deserialize(tmp_path)
+    new_memory = new_company.env.get_role(role_c.profile).rc.memory
+    assert new_memory == memory
+    assert new_memory.get_by_action(ActionOK) == memory.get_by_action(ActionOK)
+
+    # the recovered team keeps appending, and rewrites the journal once the history changes
+    new_memory.add(Message(content="msg4"))
+    new_company.serialize(tmp_path)
+    assert len(journal.read_text().splitlines()) == 5
+    new_memory.delete(new_memory.storage[0])
+    new_company.serialize(tmp_path)
+    assert len(journal.read_text().splitlines()) == 4
+    assert not list(journal.parent.glob("*.tmp"))  # the rewrite replaced the journal
+    assert Team.deserialize(tmp_path).env.get_role(role_c.profile).rc.memory == new_memory
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
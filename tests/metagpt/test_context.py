@@ -5,8 +5,12 @@
 @Author  : alexanderwu
 @File    : test_context.py
 """
+import pytest
+
 from metagpt.configs.llm_config import LLMType
 from metagpt.context import AttrDict, Context
+from metagpt.provider import llm_provider_registry
+from metagpt.utils.cost_manager import CostManager
 
 
 def test_attr_dict_1():
@@ -71,3 +75,54 @@ def test_context_3():
     # assert ctx.llm() is not None
     # assert "gpt" in ctx.llm().model
     pass
+
+
+def test_context_llm_cache():
+    ctx = Context()
+    llm1 = ctx.llm()
+    llm2 = ctx.llm()
+    assert llm1 is not llm2
+    assert llm1.aclient is llm2.aclient
+    assert llm1.cost_manager is ctx.cost_manager
+
+    llm1.system_prompt = "You are a test assistant."
+    assert llm2.system_prompt != llm1.system_prompt
+    llm1.config.temperature = 0.9
+    assert llm2.config.temperature != llm1.config.temperature
+
+    ctx.cost_manager = CostManager()
+    assert ctx.llm().cost_manager is ctx.cost_manager
+
+    llm_config = ctx.config.llm.model_copy(update={"model": "gpt-4-turbo"})
+    llm3 = ctx.llm_with_cost_manager_from_llm_config(llm_config)
+    assert llm3.aclient is not llm1.aclient
+    assert llm3.model == "gpt-4-turbo"
+
+    assert ctx._llm_cache.evict(llm_config, ctx.cost_manager) is not None
+    assert ctx.llm_with_cost_manager_from_llm_config(llm_config).aclient is not llm3.aclient
+
+
+@pytest.mark.asyncio
+async def test_context_close_llm():
+    ctx = Context()
+    llm = ctx.llm()
+    await ctx.close_llm()
+    assert llm.aclient.is_closed()
+    assert ctx.llm().aclient is not llm.aclient
+
+
+@pytest.mark.asyncio
+async def test_context_llm_cache_semaphore():
+    ctx = Context()
+    llm1 = ctx.llm()
+    llm2 = ctx.llm()
+    assert llm1.semaphore is llm1.semaphore
+    assert llm2.semaphore is not llm1.semaphore
+
+
+def test_context_llm_cache_overhead(mocker):
+    spy = mocker.spy(llm_provider_registry, "create_llm_instance")
+    ctx = Context()
+    for _ in range(50):
+        ctx.llm()
+    assert spy.call_count == 1
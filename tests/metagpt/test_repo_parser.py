@@ -27,6 +27,77 @@ def test_error():
     assert rsp == []
 
 
+def test_repo_parser_cache(tmp_path, mocker):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text("class A:\n    def run(self):\n        pass\n")
+    (src / "b.py").write_text("def b():\n    pass\n")
+    (src / "c.py").write_text("C = 1\n")
+    cache_path = tmp_path / "symbols.json"
+
+    repo_parser = RepoParser(base_directory=src, cache_path=cache_path)
+    symbols = repo_parser.generate_symbols()
+    assert sorted(repo_parser.changed_files) == ["a.py", "b.py", "c.py"]
+    assert cache_path.exists()
+
+    (src / "b.py").write_text("def b2():\n    pass\n")
+    (src / "c.py").unlink()
+    spy = mocker.spy(RepoParser, "_parse_code")
+    repo_parser = RepoParser(base_directory=src, cache_path=cache_path)
+    new_symbols = repo_parser.generate_symbols()
+    assert spy.call_count == 1
+    assert repo_parser.changed_files == ["b.py"]
+    assert repo_parser.removed_files == ["c.py"]
+    assert {i.file: i for i in new_symbols}["a.py"] == {i.file: i for i in symbols}["a.py"]
+    assert {i.file: i for i in new_symbols}["b.py"].functions == ["b2"]
+
+    repo_parser.generate_symbols()
+    assert spy.call_count == 1
+    assert not repo_parser.changed_files
+
+    # a cache that is not saved yet leaves the changes to the next run
+    (src / "a.py").write_text("class A2:\n    pass\n")
+    repo_parser = RepoParser(base_directory=src, cache_path=cache_path, autosave_cache=False)
+    repo_parser.generate_symbols()
+    assert repo_parser.changed_files == ["a.py"]
+    repo_parser = RepoParser(base_directory=src, cache_path=cache_path, autosave_cache=False)
+    repo_parser.generate_symbols()
+    assert repo_parser.changed_files == ["a.py"]
+    repo_parser.save_cache()
+    repo_parser = RepoParser(base_directory=src, cache_path=cache_path)
+    repo_parser.generate_symbols()
+    assert not repo_parser.changed_files
+
+
+def test_repo_parser_parallel():
+    path = METAGPT_ROOT / "metagpt" / "actions"
+    serial = RepoParser(base_directory=path).generate_symbols()
+    parallel = RepoParser(base_directory=path, max_workers=2).generate_symbols()
+    assert len(serial) > 32
+    assert [i.model_dump() for i in parallel] == [i.model_dump() for i in serial]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_class_views_cache(tmp_path, mocker):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "__init__.py").write_text("")
+    (src / "a.py").write_text("class A:\n    pass\n")
+    run = mocker.patch("metagpt.repo_parser.subprocess.run", return_value=mocker.Mock(returncode=0))
+
+    repo_parser = RepoParser(base_directory=src, cache_path=tmp_path / "symbols.json")
+    await repo_parser.rebuild_class_views()
+    assert repo_parser.class_views_changed
+    await repo_parser.rebuild_class_views()
+    assert not repo_parser.class_views_changed
+    assert run.call_count == 1
+
+    (src / "a.py").write_text("class A:\n    b: int = 0\n")
+    await repo_parser.rebuild_class_views()
+    assert repo_parser.class_views_changed
+    assert run.call_count == 2
+
+
 @pytest.mark.parametrize(
     ("v", "name", "type_", "default_", "compositions"),
     [
@@ -9,6 +9,7 @@
 """
 
 import json
+import time
 
 import pytest
 
@@ -31,6 +32,10 @@ from metagpt.schema import (
     UserMessage,
 )
 from metagpt.utils.common import any_to_str
+from metagpt.utils.serialize import (
+    actionoutout_schema_to_mapping,
+    actionoutput_mapping_to_str,
+)
 
 
 def test_messages():
@@ -140,6 +145,60 @@ async def test_message_queue():
     assert new_mq.pop_all() == mq.pop_all()
 
 
+@pytest.mark.asyncio
+async def test_message_queue_snapshot():
+    out_mapping = {"field3": (str, ...), "field4": (list[str], ...)}
+    ic_obj = ActionNode.create_model_class("code", out_mapping)
+    mq = MessageQueue()
+    for i in range(10):
+        ic = ic_obj(field3=f"value{i}", field4=["a", "b"])
+        mq.push(Message(content=str(i), instruct_content=ic, role="engineer", cause_by=WriteCode))
+
+    assert [i.content for i in mq.snapshot()] == [str(i) for i in range(10)]
+    start = time.perf_counter()
+    val = await mq.dump()
+    assert time.perf_counter() - start < 0.5  # no waiting for the queue to drain
+    assert len(mq.snapshot()) == 10
+
+    for i, m in zip(json.loads(val), mq.snapshot()):
+        # same output as the generic pydantic path
+        schema = m.instruct_content.model_json_schema()
+        assert json.loads(i)["instruct_content"] == {
+            "class": schema["title"],
+            "mapping": actionoutput_mapping_to_str(actionoutout_schema_to_mapping(schema)),
+            "value": m.instruct_content.model_dump(),
+        }
+    new_mq = MessageQueue.load(val)
+    assert [i.dump() for i in new_mq.pop_all()] == [i.dump() for i in mq.pop_all()]
+
+    for i in "abc":
+        mq.push(Message(content=i))
+    assert mq.pop().content == "a"
+    assert [i.content for i in mq.snapshot()] == ["b", "c"]
+    assert [i.content for i in mq.pop_all()] == ["b", "c"]
+
+
+def test_message_interned_fields():
+    m1 = Message(content="a", cause_by=WriteCode, send_to={"Alice", "Bob"})
+    m2 = Message(content="b", cause_by=WriteCode, send_to=["Bob", "Alice"])
+    assert isinstance(m1.send_to, set)
+    assert m1.send_to == m2.send_to
+    assert m1.send_to is not m2.send_to
+    assert m1.cause_by is m2.cause_by
+    assert all(i is j for i, j in zip(sorted(m1.send_to), sorted(m2.send_to)))
+
+    m2.sent_from = "Alice"
+    m2.send_to = "Carol"
+    assert m2.send_to == {"Carol"}
+    assert m1.send_to == {"Alice", "Bob"}
+    m1.send_to.add("Carol")
+    assert m2.send_to == {"Carol"}
+
+    m3 = Message.load(m1.dump())
+    assert m3.cause_by is m1.cause_by
+    assert m3 == m1
+
+
 @pytest.mark.parametrize(
     ("file_list", "want"),
     [
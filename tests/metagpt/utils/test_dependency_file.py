@@ -8,13 +8,14 @@
 """
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from typing import Optional, Set, Union
 
 import pytest
 from pydantic import BaseModel
 
-from metagpt.utils.dependency_file import DependencyFile
+from metagpt.utils.dependency_file import DEFERRED, DependencyFile
 
 
 @pytest.mark.asyncio
@@ -61,5 +62,54 @@ async def test_dependency_file():
     assert not file.exists
 
 
+@pytest.mark.asyncio
+async def test_dependency_file_write_behind(tmp_path, mocker):
+    file = DependencyFile(workdir=tmp_path, flush_delay=0.1)
+    spy = mocker.spy(file, "_replace")
+    for i in range(100):
+        dependencies = {tmp_path / "docs/a.md", f"src/{i - 1}.py"}
+        await file.update(filename=tmp_path / f"src/{i}.py", dependencies=dependencies, persist=DEFERRED)
+    assert not file.exists
+    assert await file.get(tmp_path / "src/1.py") == {"docs/a.md", "src/0.py"}
+    assert await file.get_dependents("docs/a.md") == {f"src/{i}.py" for i in range(100)}
+    assert await file.get_dependents(tmp_path / "src/1.py") == {"src/2.py"}
+
+    await asyncio.sleep(0.2)
+    assert file.exists
+    assert spy.call_count == 1
+
+    await file.update(filename="src/2.py", dependencies=None, persist=DEFERRED)
+    assert await file.get_dependents("src/1.py") == set()
+    file.flush()
+    assert spy.call_count == 2
+
+    # changes made by others are loaded
+    other = DependencyFile(workdir=tmp_path)
+    await other.update(filename="src/2.py", dependencies={"src/x.py"})
+    assert await file.get("src/2.py") == {"src/x.py"}
+    assert await file.get_dependents("src/x.py") == {"src/2.py"}
+
+    # pending changes are merged into the changes made by others meanwhile
+    await file.update(filename="src/3.py", dependencies={"src/y.py"}, persist=DEFERRED)
+    await other.update(filename="src/4.py", dependencies={"src/z.py"})
+    file.flush()
+    other = DependencyFile(workdir=tmp_path)
+    await other.load()
+    assert await other.get("src/2.py") == {"src/x.py"}
+    assert await other.get("src/3.py") == {"src/y.py"}
+    assert await other.get("src/4.py") == {"src/z.py"}
+
+
+def test_dependency_file_flush_at_loop_shutdown(tmp_path):
+    file = DependencyFile(workdir=tmp_path, flush_delay=60)
+
+    async def update():
+        await file.update(filename="a.py", dependencies={"b.py"}, persist=DEFERRED)
+
+    asyncio.run(update())
+    assert file.exists
+    assert "a.py" in (tmp_path / ".dependencies.json").read_text()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
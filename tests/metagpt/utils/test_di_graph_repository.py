@@ -7,6 +7,7 @@
 @Desc    : Unit tests for di_graph_repository.py
 """
 
+import json
 from pathlib import Path
 
 import pytest
@@ -14,8 +15,9 @@ from pydantic import BaseModel
 
 from metagpt.const import DEFAULT_WORKSPACE_ROOT
 from metagpt.repo_parser import RepoParser
+from metagpt.utils import graph_npz
 from metagpt.utils.di_graph_repository import DiGraphRepository
-from metagpt.utils.graph_repository import GraphRepository
+from metagpt.utils.graph_repository import SPO, GraphRepository
 
 
 @pytest.mark.asyncio
@@ -41,6 +43,105 @@ async def test_di_graph_repository():
     graph.pathname.unlink()
 
 
+@pytest.mark.asyncio
+async def test_di_graph_repository_index():
+    graph = DiGraphRepository(name="test", root=Path(__file__).parent)
+    await graph.insert_many(
+        [
+            SPO(subject="a.py", predicate="is", object_="source_code"),
+            SPO(subject="a.py:A", predicate="is", object_="class"),
+            SPO(subject="a.py:B", predicate="is", object_="class"),
+            SPO(subject="a.py", predicate="has_class", object_="a.py:A"),
+            SPO(subject="a.py", predicate="has_class", object_="a.py:B"),
+        ]
+    )
+
+    def keys(rows):
+        return sorted((i.subject, i.predicate, i.object_) for i in rows)
+
+    assert keys(await graph.select(subject="a.py")) == [
+        ("a.py", "has_class", "a.py:A"),
+        ("a.py", "has_class", "a.py:B"),
+        ("a.py", "is", "source_code"),
+    ]
+    assert keys(await graph.select(predicate="is", object_="class")) == [
+        ("a.py:A", "is", "class"),
+        ("a.py:B", "is", "class"),
+    ]
+    assert len(await graph.select(predicate="has_class")) == 2
+    assert keys(await graph.select(object_="a.py:A")) == [("a.py", "has_class", "a.py:A")]
+    assert len(await graph.select()) == 5
+    rows = await graph.select_many([{"subject": "a.py:A"}, {"predicate": "not_exist"}])
+    assert [len(i) for i in rows] == [1, 0]
+
+    # a DiGraph keeps one edge between two nodes, the new predicate replaces the old one
+    await graph.insert(subject="a.py:A", predicate="is_not", object_="class")
+    assert len(await graph.select(predicate="is", object_="class")) == 1
+    assert len(await graph.select(predicate="is_not")) == 1
+
+    assert await graph.delete(predicate="has_class") == 2
+    assert not await graph.select(subject="a.py", predicate="has_class")
+    assert await graph.delete(subject="a.py:B", object_="class") == 1
+    assert await graph.delete(subject="not_exist") == 0
+
+    new_graph = DiGraphRepository(name="test", root=Path(__file__).parent).load_json(graph.json())
+    assert keys(await new_graph.select(predicate="is")) == keys(await graph.select(predicate="is"))
+
+    await graph.insert_many(
+        [
+            SPO(subject="a.py", predicate="has_class", object_="a.py:A"),
+            SPO(subject="a.py:A:run", predicate="is", object_="class_method"),
+            SPO(subject="a.pyc", predicate="is", object_="binary"),
+        ]
+    )
+    assert await graph.delete_namespaces(["a.py"]) == 4
+    assert keys(await graph.select()) == [("a.pyc", "is", "binary")]
+
+
+@pytest.mark.asyncio
+async def test_di_graph_repository_npz(tmp_path):
+    def keys(rows):
+        return sorted((i.subject, i.predicate, i.object_) for i in rows)
+
+    graph = DiGraphRepository(name="test", root=tmp_path, format="npz")
+    await graph.insert_many(
+        [SPO(subject=f"s{i}", predicate="是" if i % 2 else "is", object_=f"o{i % 3}") for i in range(10)]
+    )
+    await graph.save()
+    assert graph.pathname == tmp_path / "test.npz"
+    assert graph.pathname.exists()
+    assert not graph_npz.log_pathname(graph.pathname).exists()
+
+    new_graph = await DiGraphRepository.load_from(graph.pathname)
+    assert new_graph.format == "npz"
+    assert keys(await new_graph.select()) == keys(await graph.select())
+    assert keys(await new_graph.select(predicate="是")) == keys(await graph.select(predicate="是"))
+
+    # small changes are appended to the log
+    snapshot = graph.pathname.read_bytes()
+    await new_graph.insert(subject="s0", predicate="was", object_="o9")
+    await new_graph.delete(subject="s1")
+    await new_graph.save()
+    assert graph.pathname.read_bytes() == snapshot
+    assert len(graph_npz.log_pathname(graph.pathname).read_text().splitlines()) == 2
+    loaded = DiGraphRepository(name="test", root=tmp_path, format="npz").load_npz(graph.pathname, mmap=False)
+    assert keys(await loaded.select()) == keys(await new_graph.select())
+    assert await loaded.select(subject="s1") == []
+    assert keys(await loaded.select(subject="s0")) == [("s0", "is", "o0"), ("s0", "was", "o9")]
+
+    # compaction rewrites the snapshot and removes the log
+    await loaded.save(compact=True)
+    assert not graph_npz.log_pathname(graph.pathname).exists()
+    reloaded = await DiGraphRepository.load_from(graph.pathname)
+    assert keys(await reloaded.select()) == keys(await new_graph.select())
+    assert json.loads(reloaded.json())
+
+    # changes logged against an older snapshot, e.g. left by a crash before the log was removed, are not replayed
+    graph_npz.append_log(graph.pathname, [(graph_npz.DELETE, "s0", "was", "o9")], loaded._generation + 1)
+    reloaded = await DiGraphRepository.load_from(graph.pathname)
+    assert keys(await reloaded.select()) == keys(await new_graph.select())
+
+
 @pytest.mark.asyncio
 async def test_js_parser():
     class Input(BaseModel):
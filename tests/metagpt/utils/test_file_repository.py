@@ -11,6 +11,7 @@ from pathlib import Path
 
 import pytest
 
+from metagpt.utils.file_repository import FileContentCache
 from metagpt.utils.git_repository import ChangeType, GitRepository
 from tests.metagpt.utils.test_git_repository import mock_file
 
@@ -53,5 +54,62 @@ async def test_file_repo():
     git_repo.delete_repository()
 
 
+@pytest.mark.asyncio
+async def test_file_repo_get_many(mocker):
+    local_path = Path(__file__).parent / "file_repo_git_many"
+    if local_path.exists():
+        shutil.rmtree(local_path)
+
+    git_repo = GitRepository(local_path=local_path, auto_init=True)
+    file_repo = git_repo.new_file_repository("src")
+    for i in range(20):
+        await file_repo.save(f"{i}.txt", f"line {i}\r\n")
+    (file_repo.workdir / "d").mkdir()
+
+    filenames = [f"{i}.txt" for i in range(20)] + ["not_exist.txt", "d"]
+    spy = mocker.spy(Path, "read_bytes")
+    docs = await file_repo.get_many(filenames, max_concurrency=3)
+    assert [i.filename for i in docs[:20]] == filenames[:20]
+    assert [i.content for i in docs[:20]] == [f"line {i}\n" for i in range(20)]
+    assert docs[20:] == [None, None]
+    assert spy.call_count == 0  # saved contents are cached
+    assert [i.content for i in docs[:20]] == [(await file_repo.get(i)).content for i in filenames[:20]]
+
+    # modified files are read again
+    (file_repo.workdir / "1.txt").write_text("changed")
+    docs = await git_repo.new_file_repository("src").get_many(["0.txt", "1.txt"])
+    assert [i.content for i in docs] == ["line 0\n", "changed"]
+    assert spy.call_count == 1
+    docs = await file_repo.get_many(["0.txt", "1.txt"], use_cache=False)
+    assert spy.call_count == 3
+
+    docs = await file_repo.get_all()
+    assert len(docs) == 20
+
+    git_repo.delete_repository()
+
+
+def test_file_content_cache(tmp_path):
+    cache = FileContentCache(max_size=10, max_file_size=6)
+    for i in range(4):
+        pathname = tmp_path / f"{i}.txt"
+        pathname.write_text("a" * (i + 3))
+        cache.set(pathname, pathname.stat(), pathname.read_text())
+    # the least recently used files are evicted to keep the total size under 10 bytes
+    assert len(cache) == 1
+    assert cache.size == 6
+    assert cache.get(tmp_path / "3.txt", (tmp_path / "3.txt").stat()) == "aaaaaa"
+
+    pathname = tmp_path / "big.txt"
+    pathname.write_text("a" * 7)
+    cache.set(pathname, pathname.stat(), pathname.read_text())
+    assert cache.get(pathname, pathname.stat()) is None
+    assert cache.size == 6
+
+    (tmp_path / "3.txt").write_text("b")
+    assert cache.get(tmp_path / "3.txt", (tmp_path / "3.txt").stat()) is None
+    assert cache.size == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
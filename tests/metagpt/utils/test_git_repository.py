@@ -11,6 +11,7 @@ import shutil
 from pathlib import Path
 
 import pytest
+from git.repo import Repo
 
 from metagpt.utils.common import awrite
 from metagpt.utils.git_repository import GitRepository
@@ -34,6 +35,7 @@ async def mock_repo(local_path) -> (GitRepository, Path):
     subdir = local_path / "subdir"
     subdir.mkdir(parents=True, exist_ok=True)
     await mock_file(subdir / "c.txt")
+    repo.invalidate()  # written without FileRepository
     return repo, subdir
 
 
@@ -52,6 +54,7 @@ async def test_git():
     rmfile = local_path / "b.txt"
     rmfile.unlink()
     assert repo.status
+    repo.invalidate()
 
     assert len(repo.changed_files) == 3
     repo.add_change(repo.changed_files)
@@ -106,6 +109,45 @@ async def test_dependency_file():
     assert not dependancy_file.exists
 
 
+@pytest.mark.asyncio
+async def test_git_status_cache(mocker):
+    local_path = Path(__file__).parent / "git5"
+    repo, subdir = await mock_repo(local_path)
+    spy = mocker.spy(Repo, "_get_untracked_files")
+    get_files = mocker.spy(repo, "_get_files")
+
+    assert len(repo.changed_files) == 3
+    assert len(repo.changed_files) == 3
+    assert set(repo.get_files(relative_path="subdir")) == {"c.txt"}
+    assert set(repo.get_files(relative_path="subdir")) == {"c.txt"}
+    assert spy.call_count == 1
+    assert get_files.call_count == 1
+
+    # writes through FileRepository start a new snapshot
+    file_repo = repo.new_file_repository("subdir")
+    await file_repo.save("d.txt", content="d")
+    assert len(repo.changed_files) == 4
+    assert set(file_repo.all_files) == {"c.txt", "d.txt"}
+    assert file_repo.get_change_dir_files(".") == file_repo.get_change_dir_files(".")
+    assert spy.call_count == 2
+    await file_repo.delete("d.txt")
+    assert set(file_repo.all_files) == {"c.txt"}
+
+    # files written by other means are seen after invalidate()
+    assert len(repo.changed_files) == 3
+    (subdir / "e.txt").write_text("e")
+    assert len(repo.changed_files) == 3
+    repo.invalidate()
+    assert len(repo.changed_files) == 4
+    assert set(file_repo.all_files) == {"c.txt", "e.txt"}
+    assert spy.call_count == 4
+
+    repo.archive()
+    assert not repo.changed_files
+
+    repo.delete_repository()
+
+
 @pytest.mark.asyncio
 async def test_git_open():
     local_path = Path(__file__).parent / "git3"
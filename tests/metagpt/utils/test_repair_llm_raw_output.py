@@ -386,3 +386,40 @@ def test_extract_content_from_output():
     assert output.startswith('{\n"Implementation approach"') and output.endswith(
         '"Anything UNCLEAR": "The requirement is clear to me."\n}'
     )
+
+
+def test_repair_llm_output_with_report():
+    from metagpt.utils.repair_llm_raw_output import (
+        RepairType,
+        _repair_llm_raw_output,
+        repair_llm_output_with_report,
+    )
+
+    req_keys = ["Original Requirements", "Anything UNCLEAR", "[/CONTENT]"]
+    outputs = [
+        '[CONTENT]\n{"original requirements": "a", "Anything unclear": "b"}\n[CONTENT]',
+        '[content]\n{"Original Requirements": "a", "Anything UNCLEAR": "b"}\n[/content]',
+        '{"Original Requirements": "a"}',
+        '[CONTENT] tag\n[CONTENT]\n{"Original Requirements": "a"}\nxxx\n',
+        '[CONTENT]\n{"Original Requirements": "a", "Anything UNCLEAR": "b"}\n[/CONTENT]',
+    ]
+    for output in outputs:
+        chained = output
+        for key in req_keys:
+            chained = _repair_llm_raw_output(chained, key)
+        repaired, fixes = repair_llm_output_with_report(output, req_keys)
+        assert repaired == chained
+        assert bool(fixes) == (output != chained)
+
+    _, fixes = repair_llm_output_with_report(outputs[0], req_keys)
+    assert [(i.repair_type, i.key) for i in fixes] == [
+        (RepairType.CS, "Original Requirements"),
+        (RepairType.CS, "Anything UNCLEAR"),
+        (RepairType.SCM, "[/CONTENT]"),
+    ]
+
+    output, fixes = repair_llm_output_with_report(
+        '{"a": "b # c", // d\n"e": \'f // g\'  # h\n}]', req_keys=[None], repair_type=RepairType.JSON
+    )
+    assert output == '{"a": "b # c",\n"e": \'f // g\'\n}'
+    assert [i.detail for i in fixes] == ["}] -> }", "2 comments removed"]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_response_cache.py
+"""
+import time
+
+import pytest
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.configs.response_cache_config import (
+    ResponseCacheConfig,
+    ResponseCacheType,
+)
+from metagpt.provider.base_llm import BaseLLM
+from metagpt.utils.response_cache import (
+    MemoryResponseCache,
+    SqliteResponseCache,
+    get_response_cache,
+    response_cache_key,
+)
+
+
+class CountingLLM(BaseLLM):
+    def __init__(self, config: LLMConfig):
+        self.config = config
+        self.calls = 0
+
+    async def _achat_completion(self, messages: list[dict], timeout=3):
+        self.calls += 1
+        return {"choices": [{"message": {"content": f"answer {self.calls}"}}]}
+
+    async def acompletion(self, messages: list[dict], timeout=3):
+        return await self._achat_completion(messages, timeout=timeout)
+
+    async def _achat_completion_stream(self, messages: list[dict], timeout: int = 3) -> str:
+        rsp = await self._achat_completion(messages, timeout=timeout)
+        return self.get_choice_text(rsp)
+
+
+def test_response_cache_key():
+    messages = [{"role": "user", "content": "hello"}]
+    key = response_cache_key("gpt-4", messages, 0.0)
+    assert key == response_cache_key("gpt-4", [{"content": "hello", "role": "user"}], 0.0)
+    assert key != response_cache_key("gpt-3.5-turbo", messages, 0.0)
+    assert key != response_cache_key("gpt-4", messages, 0.5)
+    assert key != response_cache_key("gpt-4", messages, 0.0, tools={"tools": []})
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache(mocker):
+    cache = MemoryResponseCache(ttl=10, max_size=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")  # evicts the least recently used "b"
+    assert await cache.get("b") is None
+    assert len(cache) == 2
+
+    now = time.time()
+    mocker.patch("metagpt.utils.response_cache.time.time", return_value=now + 11)
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_response_cache(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = SqliteResponseCache(path=path, max_size=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.set("c", "3")
+    assert await cache.get("a") is None
+    assert await cache.get("c") == "3"
+    cache.close()
+
+    cache = SqliteResponseCache(path=path, max_size=2)
+    assert await cache.get("b") == "2"
+    await cache.clear()
+    assert await cache.get("b") is None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_llm_response_cache(tmp_path, mocker):
+    cache_config = ResponseCacheConfig(api_type=ResponseCacheType.SQLITE, path=str(tmp_path / "llm.db"))
+    config = LLMConfig(api_key="mock_api_key", model="gpt-4", response_cache=cache_config)
+    messages = [{"role": "user", "content": "hello"}]
+
+    llm = CountingLLM(config)
+    assert await llm.acompletion_text(messages, stream=False) == "answer 1"
+    assert await llm.acompletion_text(messages, stream=True) == "answer 1"
+    assert llm.calls == 1
+    assert await llm.acompletion_text([{"role": "user", "content": "hi"}]) == "answer 2"
+
+    # `stream` is resolved from the signature, a positional one is logged and a positional timeout is not
+    log_stream = mocker.patch("metagpt.provider.base_llm.log_llm_stream")
+    assert await llm.acompletion_text(messages, True) == "answer 1"
+    assert log_stream.call_count == 2
+    log_stream.reset_mock()
+    assert await llm.acompletion_text(messages, False, 3) == "answer 1"
+    log_stream.assert_not_called()
+
+    # a new instance, e.g. a retry after crash, replays the cached response
+    llm = CountingLLM(config)
+    assert await llm.acompletion_text(messages) == "answer 1"
+    assert llm.calls == 0
+    assert get_response_cache(cache_config) is llm.response_cache
+
+    assert CountingLLM(LLMConfig(api_key="mock_api_key")).response_cache is None
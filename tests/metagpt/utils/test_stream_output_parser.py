@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_stream_output_parser.py
+@Desc    : Unit tests for stream_output_parser.py
+"""
+from typing import List
+
+import pytest
+
+from metagpt.actions.action_node import ActionNode
+from metagpt.utils.stream_output_parser import StreamOutputParser
+
+MAPPING = {"Title": (str, ...), "Count": (int, ...), "File list": (List[str], ...)}
+
+
+def feed(parser: StreamOutputParser, text: str, size: int = 3) -> list:
+    seen = []
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+        seen.append(dict(parser.fields))
+    return seen
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_stream_json(size):
+    output_class = ActionNode.create_model_class("test", MAPPING)
+    fields = []
+    parser = StreamOutputParser(output_class, MAPPING, schema="json", on_field=lambda k, v: fields.append((k, v)))
+    text = '[CONTENT]\n```json\n{"Title": "a, \\"b\\" {c}", "Count": "3", "Unknown": 1, "File list": ["x.py", "y.py"]}\n```\n[/CONTENT]'
+    seen = feed(parser, text, size)
+
+    assert fields == [("Title", 'a, "b" {c}'), ("Count", 3), ("File list", ["x.py", "y.py"])]
+    if size < len(text):
+        assert {"Title": 'a, "b" {c}'} in seen
+    assert parser.partial().model_dump() == dict(fields)
+    assert parser.text == text
+
+
+def test_stream_json_invalid_field():
+    output_class = ActionNode.create_model_class("test", MAPPING)
+    parser = StreamOutputParser(output_class, MAPPING, schema="json")
+    feed(parser, '{"Title": "a", "Count": "many", "File list": [}')
+    assert parser.fields == {"Title": "a"}
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_stream_markdown(size):
+    output_class = ActionNode.create_model_class("test", MAPPING)
+    parser = StreamOutputParser(output_class, MAPPING, schema="markdown")
+    text = "[CONTENT]\n## Title:\nhello\n\n## Count\n3\n## File list\n```python\n[\n    \"x.py\",\n]\n```\n[/CONTENT]"
+    seen = feed(parser, text, size)
+
+    assert parser.fields == {"Title": "hello", "Count": 3, "File list": ["x.py"]}
+    if size < len(text):
+        assert {"Title": "hello"} in seen
+    assert parser.text == text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
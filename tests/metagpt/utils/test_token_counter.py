@@ -5,9 +5,20 @@
 @Author  : alexanderwu
 @File    : test_token_counter.py
 """
+import time
+
 import pytest
+import tiktoken
 
-from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+from metagpt.actions.write_code import PROMPT_TEMPLATE
+from metagpt.const import METAGPT_ROOT
+from metagpt.logs import logger
+from metagpt.utils.token_counter import (
+    clear_token_count_cache,
+    count_input_tokens,
+    count_output_tokens,
+    count_tokens_batch,
+)
 
 
 def test_count_message_tokens():
@@ -69,5 +80,51 @@ def test_count_string_tokens_gpt_4():
     assert count_output_tokens(string, model="gpt-4-0314") == 4
 
 
+def test_count_tokens_batch():
+    long_text = "Hello, world! " * 100
+    clear_token_count_cache()
+    counts = count_tokens_batch(["Hello, world!", long_text, ""], model="gpt-4-0314")
+    assert counts == [4, count_output_tokens(long_text, model="gpt-4-0314"), 0]
+    assert count_tokens_batch([long_text], model="gpt-4-0314") == counts[1:2]
+
+
+def test_count_tokens_overhead():
+    """Per LLM call, the prompt is counted by `_get_max_tokens` and `_calc_usage`, the same design and code
+    are sent again for every file by WriteCode."""
+    code = (METAGPT_ROOT / "metagpt/actions/action_node.py").read_text()
+    prompt = PROMPT_TEMPLATE.format(
+        design=(METAGPT_ROOT / "metagpt/actions/design_api_an.py").read_text(),
+        task=(METAGPT_ROOT / "metagpt/actions/project_management_an.py").read_text(),
+        code=code,
+        logs="",
+        summary_log="",
+        feedback="",
+        filename="action_node.py",
+    )
+    messages = [{"role": "system", "content": "You are a professional engineer"}, {"role": "user", "content": prompt}]
+    model = "gpt-4-turbo"
+    n = 10
+
+    def count_uncached():
+        encoding = tiktoken.encoding_for_model(model)
+        return sum(len(encoding.encode(v)) for m in messages for v in m.values()) + 3 * len(messages) + 3
+
+    start = time.perf_counter()
+    for _ in range(n):
+        expected = count_uncached()
+        count_uncached()
+    uncached = (time.perf_counter() - start) / n
+
+    clear_token_count_cache()
+    start = time.perf_counter()
+    for _ in range(n):
+        assert count_input_tokens(messages, model) == expected
+        count_input_tokens(messages, model)
+    cached = (time.perf_counter() - start) / n
+
+    logger.info(f"token counting overhead per LLM call: uncached {uncached * 1e3:.2f}ms, cached {cached * 1e3:.2f}ms")
+    assert cached < uncached
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])